@@ -0,0 +1,204 @@
+import itertools
+import os
+import threading
+import zlib
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Account, AccountBalanceShard
+
+# Balance shards for hot accounts.
+# Every posting to an account updates its row, so postings to one busy account queue up behind each
+# other's row lock. A sharded account takes postings on one of its N shard rows instead, chosen by hash of
+# the posting worker or round-robin, so up to N postings can hold a lock at once. The account's balance is
+# its own balance plus the sum of its shards, and compaction periodically folds the shards back in.
+
+SHARD_STRATEGIES = ('hash', 'round_robin')
+DEFAULT_SHARD_STRATEGY = 'hash'
+
+MAX_SHARDS = 256
+
+ZERO = Decimal('0.00')
+
+_round_robin = itertools.count()
+
+
+def shard_strategy():
+    strategy = getattr(settings, 'BALANCE_SHARD_STRATEGY', DEFAULT_SHARD_STRATEGY)
+    if strategy not in SHARD_STRATEGIES:
+        raise ValueError(f'BALANCE_SHARD_STRATEGY must be one of {", ".join(SHARD_STRATEGIES)}, not {strategy!r}')
+    return strategy
+
+
+def choose_shard(account_id, shard_count, strategy=None):
+    """
+    The shard a posting to the account goes to. 'hash' pins each worker thread to one shard, so workers
+    only contend when there are more of them than shards; 'round_robin' rotates through the shards
+    """
+    if (strategy or shard_strategy()) == 'round_robin':
+        return next(_round_robin) % shard_count
+
+    worker = f'{account_id}:{os.getpid()}:{threading.get_ident()}'
+    return zlib.crc32(worker.encode()) % shard_count
+
+
+def post_balance_deltas(deltas, shard_counts=None, strategy=None):
+    """
+    Add each delta in a mapping of account id to amount to the account's balance, or to one of its shards
+    when the account is sharded. Call inside the atomic block that records what the deltas are for.
+    shard_counts maps account id to balance_shards and is read from the database when not given.
+    """
+    deltas = {account_id: delta for account_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    if shard_counts is None:
+        shard_counts = dict(Account.objects.filter(id__in=list(deltas)).values_list('id', 'balance_shards'))
+
+    now = timezone.now()
+    # Accounts are updated in id order, so concurrent batches take their row locks in the same order
+    for account_id in sorted(deltas):
+        shard_count = shard_counts.get(account_id)
+        # A shard removed since the count was read matches no row, and the delta goes to the account instead
+        if shard_count and AccountBalanceShard.objects.filter(
+            account_id=account_id, shard=choose_shard(account_id, shard_count, strategy)
+        ).update(balance=F('balance') + deltas[account_id]):
+            continue
+
+        Account.objects.filter(id=account_id).update(
+            balance=F('balance') + deltas[account_id], last_updated=now, version=F('version') + 1
+        )
+
+
+def transaction_posting(instance):
+    """
+    What a transaction has posted to the balances, as a (credit_from id, debit_to id, amount) posting:
+    its amount, moved between its accounts once it is CLEARED. None while it is not CLEARED
+    """
+    if instance.status != instance.Status.CLEARED:
+        return None
+
+    return instance.credit_from_id, instance.debit_to_id, instance.amount
+
+
+def post_transactions(postings, reversed_postings=(), shard_counts=None):
+    """
+    Move the amount of each posting from its credit_from account to its debit_to account, and move back the
+    amount of each of reversed_postings, in a single pass over the accounts. None postings are skipped.
+    Call inside the atomic block that changes the transactions.
+    """
+    deltas = defaultdict(Decimal)
+    for sign, items in ((1, postings), (-1, reversed_postings)):
+        for posting in items:
+            if posting is None:
+                continue
+            credit_from_id, debit_to_id, amount = posting
+            deltas[credit_from_id] -= sign * amount
+            deltas[debit_to_id] += sign * amount
+
+    post_balance_deltas(deltas, shard_counts)
+
+
+def post_transaction(instance, previous_posting=None, deleted=False):
+    """
+    Bring the balances in line with a transaction that was created, changed or deleted: take back what it
+    posted before the change (transaction_posting of it as it was read) and post what it accounts for now.
+    Changing the status, amount or accounts of a CLEARED transaction moves the difference.
+    """
+    post_transactions([] if deleted else [transaction_posting(instance)], [previous_posting])
+
+
+def shard_totals(account_ids):
+    """The sum of the shards of each of the given accounts that has any"""
+    return dict(
+        AccountBalanceShard.objects.filter(account_id__in=account_ids).values('account_id')
+        .annotate(total=Sum('balance')).values_list('account_id', 'total')
+    )
+
+
+def total_balance(account):
+    """The account's balance including its shards"""
+    if not account.balance_shards:
+        return account.balance
+
+    return account.balance + shard_totals([account.id]).get(account.id, ZERO)
+
+
+def total_balance_expression():
+    """SQL expression of an account's balance including its shards, for annotating account querysets"""
+    shards = AccountBalanceShard.objects.filter(account=OuterRef('pk')).values('account').annotate(total=Sum('balance'))
+    return Coalesce(
+        F('balance') + Subquery(shards.values('total')), F('balance'),
+        output_field=DecimalField(max_digits=19, decimal_places=2)
+    )
+
+
+def balance_to_base(account, validated_data):
+    """
+    Turn a balance written through the API, which is the total, into the account's own part by taking off
+    the shards. Postings that land on the shards meanwhile are kept rather than overwritten.
+    """
+    if 'balance' in validated_data and account.balance_shards:
+        validated_data['balance'] -= total_balance(account) - account.balance
+
+
+def compact_account(account_id):
+    """
+    Fold an account's shards into its balance, returning the amount moved. Each shard is reduced by the
+    amount read rather than set to zero, so postings made while compacting are not lost.
+    """
+    with transaction.atomic():
+        shards = list(
+            AccountBalanceShard.objects.filter(account_id=account_id).exclude(balance=0).values_list('id', 'balance')
+        )
+        if not shards:
+            return ZERO
+
+        for shard_id, balance in shards:
+            AccountBalanceShard.objects.filter(id=shard_id).update(balance=F('balance') - balance)
+
+        moved = sum(balance for _, balance in shards)
+        # The version is bumped, so an update computed against the shards read before compacting conflicts
+        Account.objects.filter(id=account_id).update(
+            balance=F('balance') + moved, last_updated=timezone.now(), version=F('version') + 1
+        )
+
+    return moved
+
+
+def compact_shards(account_ids=None):
+    """Compact every sharded account, or only the given ones, returning the amount moved per account"""
+    accounts = Account.objects.filter(balance_shards__gt=0)
+    if account_ids is not None:
+        accounts = accounts.filter(id__in=account_ids)
+
+    return {account_id: compact_account(account_id) for account_id in accounts.order_by('id').values_list('id', flat=True)}
+
+
+def shard_account(account_id, shard_count):
+    """
+    Split an account's postings over shard_count shards, or stop sharding it with 0. Changing the number of
+    shards compacts the account first, so the shards that are removed are empty.
+    """
+    if not 0 <= shard_count <= MAX_SHARDS:
+        raise ValueError(f'The number of shards must be between 0 and {MAX_SHARDS}')
+
+    with transaction.atomic():
+        account = Account.objects.select_for_update().get(id=account_id)
+        compact_account(account_id)
+
+        AccountBalanceShard.objects.filter(account_id=account_id, shard__gte=shard_count).delete()
+        AccountBalanceShard.objects.bulk_create(
+            [AccountBalanceShard(account_id=account_id, shard=shard) for shard in range(shard_count)],
+            ignore_conflicts=True
+        )
+        Account.objects.filter(id=account_id).update(balance_shards=shard_count, version=F('version') + 1)
+
+    account.refresh_from_db()
+    return account
@@ -0,0 +1,24 @@
+from payments.utils.utils_columnar import Column, queryset_chunks, DECIMAL, DICTIONARY, INT, STRING, TIMESTAMP, DEFAULT_CHUNK_SIZE
+
+from .balances import total_balance_expression
+from .models import Account
+
+BALANCE_SCALE = Account._meta.get_field('balance').decimal_places
+
+ACCOUNT_COLUMNS = [
+    Column('id', INT),
+    Column('account_guid', STRING),
+    Column('account_name', STRING),
+    Column('status', DICTIONARY),
+    Column('currency', DICTIONARY),
+    # Including the balance shards
+    Column('balance', DECIMAL, scale=BALANCE_SCALE, source='total_balance'),
+    Column('opening_balance', DECIMAL, scale=BALANCE_SCALE),
+    Column('created_on', TIMESTAMP),
+    Column('last_updated', TIMESTAMP),
+]
+
+
+def account_chunks(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Chunks of every account"""
+    return queryset_chunks(Account.objects.annotate(total_balance=total_balance_expression()), ACCOUNT_COLUMNS, chunk_size)
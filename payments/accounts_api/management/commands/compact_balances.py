@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts_api.balances import compact_shards
+
+
+class Command(BaseCommand):
+    help = 'Folds the balance shards of sharded accounts back into the account balances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account', type=int, action='append', dest='accounts', help='Only compact this account, can be repeated')
+        parser.add_argument('--loop', action='store_true', help='Keep running, compacting periodically')
+        parser.add_argument('--interval', type=float, default=60.0, help='Seconds to wait between compactions when running with --loop')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                moved = compact_shards(options['accounts'])
+                self.report(moved)
+
+                if not options['loop']:
+                    break
+
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def report(self, moved):
+        """Write how many accounts were compacted and how many had shard balances to fold in"""
+        changed = sum(1 for amount in moved.values() if amount)
+        self.stdout.write(f'Compacted {len(moved)} sharded accounts, {changed} with postings to fold in')
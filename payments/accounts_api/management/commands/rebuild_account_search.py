@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts_api.search import rebuild_search_index, search_index_enabled
+
+
+class Command(BaseCommand):
+    help = 'Repopulates the account name search index from the accounts table'
+
+    def handle(self, *args, **options):
+        if not search_index_enabled():
+            self.stdout.write('There is no search index on this database, account search scans the accounts table')
+            return
+
+        self.stdout.write(f'Indexed {rebuild_search_index()} account names')
@@ -0,0 +1,80 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from accounts_api.reconciliation import Checkpoint, partitions, reconcile_partition, DEFAULT_PARTITION_SIZE
+from payments.utils.utils_metrics import ThroughputMetrics
+
+
+class Command(BaseCommand):
+    help = (
+        'Checks every account balance against its opening balance and cleared transactions, writing the '
+        'mismatches as JSON lines. Interrupted runs resume from the checkpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of worker processes, 1 runs in this process')
+        parser.add_argument('--partition-size', type=int, default=DEFAULT_PARTITION_SIZE, help='Number of account ids checked per partition')
+        parser.add_argument('--checkpoint', default=None, help='Checkpoint file, RECONCILE_CHECKPOINT_PATH by default')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and check every partition again')
+        parser.add_argument('--output', default=None, help='Append the mismatches to this file instead of writing them to stdout')
+
+    def handle(self, *args, **options):
+        if options['partition_size'] < 1:
+            raise CommandError('--partition-size must be at least 1')
+
+        checkpoint_path = options['checkpoint'] or getattr(settings, 'RECONCILE_CHECKPOINT_PATH', None)
+        if options['restart'] and checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        try:
+            checkpoint = Checkpoint.load(checkpoint_path, options['partition_size'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        pending = [partition for partition in partitions(options['partition_size']) if partition[0] not in checkpoint.completed]
+        if checkpoint.completed:
+            self.stderr.write(f'Resuming from {checkpoint_path}, {len(checkpoint.completed)} partitions already checked')
+
+        output = open(options['output'], 'a') if options['output'] else self.stdout
+        metrics = ThroughputMetrics()
+        try:
+            for start, checked, mismatches in self.reconcile(pending, options['workers']):
+                for mismatch in mismatches:
+                    output.write(json.dumps(mismatch) + '\n')
+                output.flush()
+
+                checkpoint.record(start, checked, len(mismatches))
+                metrics.record_batch(checked, len(mismatches))
+        finally:
+            if options['output']:
+                output.close()
+            self.report(metrics, checkpoint)
+
+        checkpoint.remove()
+
+    def reconcile(self, pending, workers):
+        """Check the pending partitions, yielding (start, accounts checked, mismatches) as each one finishes"""
+        if workers <= 1:
+            for start, end in pending:
+                yield start, *reconcile_partition(start, end)
+            return
+
+        # The workers open their own connections, so none are inherited from this process
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            futures = {pool.submit(reconcile_partition, start, end): start for start, end in pending}
+            for future in as_completed(futures):
+                yield futures[future], *future.result()
+
+    def report(self, metrics, checkpoint):
+        """Write the progress of this run and the totals since the checkpoint was started"""
+        self.stderr.write(
+            f'Reconciled {metrics.processed} accounts in {metrics.batches} partitions, {metrics.rate:.1f} accounts/s. '
+            f'{checkpoint.mismatched} mismatches in {checkpoint.checked} accounts checked in total'
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts_api.balances import shard_account, MAX_SHARDS
+from accounts_api.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Spreads the balance postings of a hot account over a number of balance shards, or stops sharding it with 0'
+
+    def add_arguments(self, parser):
+        parser.add_argument('account_id', type=int, help='Id of the account to shard')
+        parser.add_argument('shards', type=int, help=f'Number of shards, up to {MAX_SHARDS}, or 0 to stop sharding')
+
+    def handle(self, *args, **options):
+        try:
+            account = shard_account(options['account_id'], options['shards'])
+        except Account.DoesNotExist:
+            raise CommandError(f"Account {options['account_id']} does not exist")
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        if account.balance_shards:
+            self.stdout.write(f'Account {account.id} now posts to {account.balance_shards} balance shards')
+        else:
+            self.stdout.write(f'Account {account.id} is no longer sharded')
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:24
+
+import uuid
+from django.db import migrations, models
+
+
+def regenerate_duplicate_guids(apps, schema_editor):
+    """
+    Adding account_guid gave every existing row the same default value,
+    so give each duplicate a fresh GUID before the unique index is created
+    """
+    Account = apps.get_model('accounts_api', 'Account')
+    seen = set()
+    for account in Account.objects.order_by('id').only('id', 'account_guid'):
+        if account.account_guid in seen:
+            account.account_guid = uuid.uuid4()
+            account.save(update_fields=['account_guid'])
+        seen.add(account.account_guid)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts_api', '0008_rename_base_currency_account_currency'),
+    ]
+
+    operations = [
+        migrations.RunPython(regenerate_duplicate_guids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='account',
+            name='account_guid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
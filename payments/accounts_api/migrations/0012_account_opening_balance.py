@@ -0,0 +1,46 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:43
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def infer_opening_balances(apps, schema_editor):
+    """
+    Existing accounts have no record of their balance before their cleared transactions,
+    so take the current balance less the net of those transactions as the opening balance
+    """
+    Account = apps.get_model('accounts_api', 'Account')
+    AccountBalanceShard = apps.get_model('accounts_api', 'AccountBalanceShard')
+    output_field = DecimalField(max_digits=19, decimal_places=2)
+
+    def total(model, account_field, amount_field, **filters):
+        rows = model.objects.filter(**{account_field: OuterRef('pk')}, **filters).order_by().values(account_field)
+        return Coalesce(Subquery(rows.annotate(total=Sum(amount_field)).values('total')), Value(0), output_field=output_field)
+
+    balance = F('balance') + total(AccountBalanceShard, 'account', 'balance')
+    for model_name in ('Transaction', 'ArchivedTransaction'):
+        model = apps.get_model('transactions_api', model_name)
+        balance = (
+            balance - total(model, 'debit_to', 'amount', status='CLEARED')
+            + total(model, 'credit_from', 'amount', status='CLEARED')
+        )
+
+    Account.objects.update(opening_balance=balance)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts_api', '0011_account_balance_shards'),
+        ('transactions_api', '0009_transaction_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='opening_balance',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=19, null=True),
+        ),
+        migrations.RunPython(infer_opening_balances, migrations.RunPython.noop),
+    ]
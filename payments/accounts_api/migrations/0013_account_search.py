@@ -0,0 +1,43 @@
+# Generated by Django 5.0.4 on 2026-10-19 16:05
+
+from django.db import migrations, transaction
+from django.db.utils import OperationalError
+
+SEARCH_TABLE = 'accounts_api_account_search'
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the FTS5 table behind account search and fill it with the existing names. Only SQLite builds
+    with FTS5 and its trigram tokenizer get one, search falls back to LIKE queries everywhere else
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(account_name, tokenize='trigram')")
+    except OperationalError:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {SEARCH_TABLE} (rowid, account_name) SELECT id, account_name FROM accounts_api_account')
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts_api', '0012_account_opening_balance'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
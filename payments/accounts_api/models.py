@@ -7,12 +7,40 @@ class Account(models.Model):
         ACTIVE = "ACTIVE"
         INACTIVE = "INACTIVE"
 
-    account_guid = models.UUIDField(default=uuid.uuid4, editable=False)
+    account_guid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     account_name = models.CharField(max_length=100)
     status = models.CharField(max_length=8, choices=Status, default=Status.ACTIVE)
     created_on = models.DateTimeField(auto_now_add=True)
     status_valid_from = models.DateTimeField(default=timezone.now)
     status_valid_to = models.DateTimeField( null=True, blank=True)
     balance = models.DecimalField(max_digits=19, decimal_places=2)
+    # Balance before any cleared transaction, the starting point of the reconcile command
+    opening_balance = models.DecimalField(max_digits=19, decimal_places=2, null=True, blank=True)
     currency = models.CharField(max_length=3)
-    last_updated = models.DateTimeField(auto_now=True)
\ No newline at end of file
+    last_updated = models.DateTimeField(auto_now=True)
+    # Incremented by every write, see payments.utils.utils_concurrency
+    version = models.PositiveIntegerField(default=1)
+    # Number of balance shards postings are spread over, 0 when the account is not sharded.
+    # See accounts_api.balances
+    balance_shards = models.PositiveSmallIntegerField(default=0)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.opening_balance is None:
+            self.opening_balance = self.balance
+        super().save(*args, **kwargs)
+
+class AccountBalanceShard(models.Model):
+    """
+    Part of a hot account's balance. Postings to a sharded account add to one of its shards instead of the
+    account row, and the account's balance is its own balance plus the sum of its shards until compaction
+    folds the shards back in
+    """
+
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='shards')
+    shard = models.PositiveSmallIntegerField()
+    balance = models.DecimalField(max_digits=19, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'shard'], name='unique_account_balance_shard'),
+        ]
@@ -0,0 +1,145 @@
+import json
+import os
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from transactions_api.models import ArchivedTransaction, Transaction
+
+from .balances import total_balance_expression
+from .models import Account
+
+# Reconciliation of account balances against the ledger.
+# An account's expected balance is its opening balance plus the CLEARED transactions debited to it, less
+# those credited from it, across the hot and archive tables. Accounts are checked in id range partitions:
+# each reads the partition's accounts with their actual balance in one query, and the ledger totals of the
+# whole partition with one grouped query per side of the ledger and table, joined in Python.
+
+DEFAULT_PARTITION_SIZE = 10_000
+
+CENT = Decimal('0.01')
+
+SIDES = ('credit_from', 'debit_to')
+
+
+def ledger_totals(start, end):
+    """
+    The CLEARED amounts credited from and debited to each account with an id in [start, end), keyed by
+    (side, account id), with one grouped query per side and table rather than a subquery per account
+    """
+    totals = defaultdict(Decimal)
+    for model in (Transaction, ArchivedTransaction):
+        for side in SIDES:
+            rows = (
+                model.objects.filter(**{f'{side}__gte': start, f'{side}__lt': end}, status=Transaction.Status.CLEARED)
+                .order_by().values(side).annotate(total=Sum('amount'))
+            )
+            for row in rows:
+                totals[side, row[side]] += row['total']
+
+    return totals
+
+
+def partitions(partition_size=DEFAULT_PARTITION_SIZE):
+    """
+    The (start, end) id ranges covering every account, end exclusive. Ranges are aligned on multiples of
+    partition_size, so an account stays in the same range, and a checkpoint stays valid, as accounts are added
+    or deleted at either end
+    """
+    ids = Account.objects.order_by('id').values_list('id', flat=True)
+    first, last = ids.first(), ids.last()
+    if first is None:
+        return []
+
+    return [
+        (index * partition_size, (index + 1) * partition_size)
+        for index in range(first // partition_size, last // partition_size + 1)
+    ]
+
+
+def reconcile_partition(start, end):
+    """
+    Compare the balance of each account with an id in [start, end) against the ledger, returning the number of
+    accounts checked and a mismatch dict per account whose balance including its shards differs
+    """
+    accounts = Account.objects.filter(id__gte=start, id__lt=end).order_by('id').values(
+        'id', 'account_guid', 'currency', 'opening_balance', actual=total_balance_expression()
+    )
+    totals = ledger_totals(start, end)
+
+    checked = 0
+    mismatches = []
+    for account in accounts:
+        checked += 1
+        expected = (account['opening_balance'] or Decimal(0)) + totals['debit_to', account['id']] - totals['credit_from', account['id']]
+        # SQLite sums decimals as floats, so compare in whole minor units
+        actual = account['actual'].quantize(CENT)
+        expected = expected.quantize(CENT)
+        if actual != expected:
+            mismatches.append({
+                'account_id': account['id'],
+                'account_guid': str(account['account_guid']),
+                'currency': account['currency'],
+                'balance': str(actual),
+                'expected_balance': str(expected),
+                'difference': str(actual - expected)
+            })
+
+    return checked, mismatches
+
+
+class Checkpoint:
+    """
+    Progress of a reconcile run, written after every partition so an interrupted run resumes where it stopped.
+    The file is replaced atomically, so a crash mid-write leaves the previous checkpoint.
+    """
+
+    def __init__(self, path, partition_size):
+        self.path = path
+        self.partition_size = partition_size
+        self.completed = set()
+        self.checked = 0
+        self.mismatched = 0
+
+    @classmethod
+    def load(cls, path, partition_size):
+        """Read the checkpoint at path, or start a new one if there is none"""
+        checkpoint = cls(path, partition_size)
+        if path is None or not os.path.exists(path):
+            return checkpoint
+
+        with open(path) as checkpoint_file:
+            data = json.load(checkpoint_file)
+
+        if data['partition_size'] != partition_size:
+            raise ValueError(
+                f"Checkpoint {path} was written with --partition-size {data['partition_size']}, "
+                f'resume with the same size or start again with --restart'
+            )
+
+        checkpoint.completed = set(data['completed'])
+        checkpoint.checked = data['checked']
+        checkpoint.mismatched = data['mismatched']
+        return checkpoint
+
+    def record(self, start, checked, mismatched):
+        self.completed.add(start)
+        self.checked += checked
+        self.mismatched += mismatched
+        if self.path is None:
+            return
+
+        temporary_path = f'{self.path}.tmp'
+        with open(temporary_path, 'w') as checkpoint_file:
+            json.dump({
+                'partition_size': self.partition_size,
+                'completed': sorted(self.completed),
+                'checked': self.checked,
+                'mismatched': self.mismatched
+            }, checkpoint_file)
+        os.replace(temporary_path, self.path)
+
+    def remove(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
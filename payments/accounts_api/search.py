@@ -0,0 +1,165 @@
+from django.db import connection
+from django.db.models import Q
+
+from .balances import total_balance_expression
+from .models import Account
+
+# Search over account names.
+# On SQLite with FTS5, account names are copied into an FTS5 table using the trigram tokenizer, kept in sync
+# by the signals in accounts_api.signals and the account views. Any substring of three or more characters
+# is then an index lookup, and names sharing trigrams with a misspelt query are found the same way.
+# Other backends, or SQLite builds without FTS5, fall back to LIKE queries that scan the table.
+# Either way a capped set of candidates is read and ranked in Python: names starting with the query first,
+# then names with a word starting with it, then names containing it, then the closest fuzzy matches.
+
+SEARCH_TABLE = 'accounts_api_account_search'
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Candidates read from the index per result asked for, before ranking
+CANDIDATES_PER_RESULT = 10
+# Share of trigrams a fuzzy match must have in common with the query
+MIN_SIMILARITY = 0.3
+
+PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(4)
+
+# Whether each database has the index, so the tables are only listed once per database
+_index_enabled = {}
+
+
+def search_index_enabled():
+    """Whether the FTS5 table exists, which the migration only creates on SQLite builds with FTS5"""
+    if connection.vendor != 'sqlite':
+        return False
+
+    database = connection.settings_dict['NAME']
+    if database not in _index_enabled:
+        _index_enabled[database] = SEARCH_TABLE in connection.introspection.table_names()
+
+    return _index_enabled[database]
+
+
+def index_accounts(accounts):
+    """Write the names of the accounts to the search index, replacing their old entries"""
+    if not search_index_enabled():
+        return
+
+    rows = [(account.pk, account.account_name) for account in accounts]
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(pk,) for pk, _ in rows])
+        cursor.executemany(f'INSERT INTO {SEARCH_TABLE} (rowid, account_name) VALUES (%s, %s)', rows)
+
+
+def unindex_accounts(account_ids):
+    if not search_index_enabled():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(pk,) for pk in account_ids])
+
+
+def rebuild_search_index():
+    """Repopulate the search index from the accounts table, returning the number of names indexed"""
+    if not search_index_enabled():
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(f'INSERT INTO {SEARCH_TABLE} (rowid, account_name) SELECT id, account_name FROM accounts_api_account')
+        return cursor.rowcount
+
+
+def trigrams(text):
+    """The trigrams of each word of the text, padded so word starts and ends count, as pg_trgm does"""
+    grams = set()
+    for word in text.casefold().split():
+        padded = f'  {word} '
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+
+    return grams
+
+
+def similarity(query_trigrams, name):
+    name_trigrams = trigrams(name)
+    if not query_trigrams or not name_trigrams:
+        return 0.0
+
+    return len(query_trigrams & name_trigrams) / len(query_trigrams | name_trigrams)
+
+
+def match_tier(query, name):
+    name = name.casefold()
+    if name.startswith(query):
+        return PREFIX
+    if f' {query}' in f' {" ".join(name.split())}':
+        return WORD_PREFIX
+    if query in name:
+        return SUBSTRING
+    return FUZZY
+
+
+def _fts_match(expression, candidates):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, account_name FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank LIMIT %s',
+            [expression, candidates]
+        )
+        return cursor.fetchall()
+
+
+def _quoted(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def index_candidates(query, candidates):
+    """(id, name) pairs from the FTS5 index containing the query, or sharing trigrams with it"""
+    if len(query) < 3:
+        # The trigram tokenizer cannot match fewer than three characters
+        return scan_candidates(query, candidates)
+
+    rows = _fts_match(_quoted(query), candidates)
+    if len(rows) < candidates:
+        grams = {query[index:index + 3] for index in range(len(query) - 2)}
+        rows += _fts_match(' OR '.join(_quoted(gram) for gram in sorted(grams)), candidates)
+
+    return rows
+
+
+def scan_candidates(query, candidates):
+    """(id, name) pairs found with LIKE queries, for backends without the index"""
+    names = Account.objects.order_by().values_list('id', 'account_name')
+    rows = list(names.filter(account_name__istartswith=query)[:candidates])
+    if len(rows) < candidates:
+        rows += names.filter(account_name__icontains=query)[:candidates]
+    if len(rows) < candidates and len(query) >= 3:
+        fuzzy = Q()
+        for index in range(len(query) - 2):
+            fuzzy |= Q(account_name__icontains=query[index:index + 3])
+        rows += names.filter(fuzzy)[:candidates]
+
+    return rows
+
+
+def search_accounts(query, limit=DEFAULT_LIMIT):
+    """The accounts whose names best match the query, best first, at most limit of them"""
+    query = ' '.join(query.casefold().split())
+    if not query:
+        return []
+
+    candidates = limit * CANDIDATES_PER_RESULT
+    rows = index_candidates(query, candidates) if search_index_enabled() else scan_candidates(query, candidates)
+
+    query_trigrams = trigrams(query)
+    ranked = {}
+    for account_id, name in rows:
+        if account_id in ranked:
+            continue
+        tier = match_tier(query, name)
+        score = similarity(query_trigrams, name)
+        if tier == FUZZY and score < MIN_SIMILARITY:
+            continue
+        ranked[account_id] = (tier, -score, len(name), account_id)
+
+    account_ids = sorted(ranked, key=ranked.get)[:limit]
+    accounts = Account.objects.annotate(total_balance=total_balance_expression()).in_bulk(account_ids)
+    return [accounts[account_id] for account_id in account_ids if account_id in accounts]
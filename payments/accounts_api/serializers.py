@@ -1,18 +1,99 @@
+from collections.abc import Mapping
+
 from rest_framework import serializers
 from djoser.serializers import UserCreateSerializer as BaseUserCreateSerializer, UserSerializer as BaseUserSerializer
 
+from .balances import total_balance
+from .search import DEFAULT_LIMIT, MAX_LIMIT
 from .models import Account
-from payments.utils.utils_serializers import validate_currency
+from payments.utils.utils_serializers import validate_currency, validate_amount_for_currency, BULK_UPDATE_MAX_SIZE, BATCH_LOOKUP_MAX_SIZE
 
 
 class AccountSerializer(serializers.ModelSerializer):
     currency = serializers.CharField(validators=[validate_currency])
+    converted_balance = serializers.DecimalField(max_digits=19, decimal_places=2, read_only=True)
 
     class Meta:
         model = Account
-        fields = ["account_guid", "created_on", "account_name", "status", "last_updated", "balance", "currency", "status_valid_to"]
+        fields = ["account_guid", "created_on", "account_name", "status", "last_updated", "balance", "currency", "status_valid_to", "converted_balance", "version"]
+
+        read_only_fields = ["account_guid", "last_updated", "created_on", "version"]
+
+    def validate(self, attrs):
+        """Check the balance fits the minor units of the account currency"""
+        return validate_amount_for_currency(attrs, self.instance, 'balance')
+
+    def to_representation(self, instance):
+        """Report the balance of a sharded account including its shards"""
+        data = super().to_representation(instance)
+        if 'balance' in data and instance.balance_shards:
+            balance = getattr(instance, 'total_balance', None)
+            data['balance'] = self.fields['balance'].to_representation(balance if balance is not None else total_balance(instance))
+
+        return data
+
+
+class AccountBulkUpdateListSerializer(serializers.ListSerializer):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_length', BULK_UPDATE_MAX_SIZE)
+        kwargs.setdefault('allow_empty', False)
+        super().__init__(*args, **kwargs)
+
+    def validate(self, attrs):
+        """Check that each account id appears only once in the batch"""
+        ids = [item['id'] for item in attrs]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Each account id can only be updated once per request')
+
+        return attrs
+
+
+class AccountBulkUpdateSerializer(AccountSerializer):
+    id = serializers.IntegerField()
+    # Optional, the update is rejected if the account has moved on from this version
+    version = serializers.IntegerField(required=False)
+
+    class Meta(AccountSerializer.Meta):
+        fields = ["id", "account_name", "status", "balance", "currency", "status_valid_to", "version"]
+        list_serializer_class = AccountBulkUpdateListSerializer
+
+    def validate(self, attrs):
+        """Check the account id is provided, even when the update is partial"""
+        if 'id' not in attrs:
+            raise serializers.ValidationError({'id': 'This field is required.'})
+
+        return super().validate(attrs)
+
+
+class AccountGuidLookupResultSerializer(serializers.Serializer):
+    results = serializers.DictField(child=AccountSerializer())
+    missing = serializers.ListField(child=serializers.UUIDField())
+
+
+class AccountBatchSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=BATCH_LOOKUP_MAX_SIZE)
+
+    def to_internal_value(self, data):
+        """Accept the ids as a comma separated string, as sent in the query string"""
+        # Anything but an object is left for the base class to reject
+        if isinstance(data, Mapping) and isinstance(data.get('ids'), str):
+            data = {'ids': [value for value in data['ids'].split(',') if value.strip()]}
+
+        return super().to_internal_value(data)
+
+
+class AccountBatchResultSerializer(serializers.Serializer):
+    results = serializers.DictField(child=AccountSerializer())
+    missing = serializers.ListField(child=serializers.IntegerField())
+
+
+class AccountSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_LIMIT, default=DEFAULT_LIMIT)
+
 
-        read_only_fields = ["account_guid", "last_updated", "created_on"]
+class AccountSearchResultSerializer(serializers.Serializer):
+    results = AccountSerializer(many=True)
 
 
 class UserCreateSerializer(BaseUserCreateSerializer):
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Account
+from .search import index_accounts, unindex_accounts
+
+
+@receiver(post_save, sender=Account)
+def index_account(sender, instance, update_fields=None, **kwargs):
+    """Keep the account's name in the search index"""
+    if update_fields is None or 'account_name' in update_fields:
+        index_accounts([instance])
+
+
+@receiver(post_delete, sender=Account)
+def unindex_account(sender, instance, **kwargs):
+    unindex_accounts([instance.pk])
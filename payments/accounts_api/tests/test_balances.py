@@ -0,0 +1,105 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts_api.balances import choose_shard, compact_shards, post_balance_deltas, shard_account, total_balance
+from accounts_api.models import Account, AccountBalanceShard
+from transactions_api.clearing import ClearingEngine
+from transactions_api.models import Transaction
+
+
+class AccountBalanceShardTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hot_account = Account.objects.create(account_name='Settlement Account', status=Account.Status.ACTIVE, balance=1000.00, currency='GBP')
+        cls.account = Account.objects.create(account_name='Test Account 1', status=Account.Status.ACTIVE, balance=500.00, currency='GBP')
+
+    def balance(self, account):
+        return total_balance(Account.objects.get(id=account.id))
+
+    def test_shard_account_creates_shards(self):
+        "Testing sharding an account creates its shard rows and bumps its version"
+        account = shard_account(self.hot_account.id, 4)
+
+        self.assertEqual(account.balance_shards, 4)
+        self.assertEqual(account.version, 2)
+        self.assertEqual(sorted(account.shards.values_list('shard', flat=True)), [0, 1, 2, 3])
+
+    def test_postings_to_sharded_account_leave_account_row_alone(self):
+        "Testing postings to a sharded account go to its shards and reads return the summed balance"
+        shard_account(self.hot_account.id, 4)
+
+        for _ in range(8):
+            post_balance_deltas({self.hot_account.id: Decimal('10.00'), self.account.id: Decimal('-10.00')}, strategy='round_robin')
+
+        hot_account = Account.objects.get(id=self.hot_account.id)
+        self.assertEqual(hot_account.balance, Decimal('1000.00'))
+        self.assertEqual(hot_account.version, 2)
+        self.assertEqual(set(hot_account.shards.values_list('balance', flat=True)), {Decimal('20.00')})
+        self.assertEqual(self.balance(self.hot_account), Decimal('1080.00'))
+        self.assertEqual(self.balance(self.account), Decimal('420.00'))
+
+    def test_hash_strategy_pins_worker_to_a_shard(self):
+        "Testing the hash strategy sends a worker's postings to the same shard"
+        shards = {choose_shard(self.hot_account.id, 8, 'hash') for _ in range(10)}
+
+        self.assertEqual(len(shards), 1)
+        self.assertLess(shards.pop(), 8)
+
+    def test_compaction_folds_shards_into_balance(self):
+        "Testing compaction moves the shard balances into the account without changing the total"
+        shard_account(self.hot_account.id, 2)
+        post_balance_deltas({self.hot_account.id: Decimal('25.00')}, strategy='round_robin')
+        post_balance_deltas({self.hot_account.id: Decimal('-5.00')}, strategy='round_robin')
+
+        moved = compact_shards()
+
+        hot_account = Account.objects.get(id=self.hot_account.id)
+        self.assertEqual(moved, {self.hot_account.id: Decimal('20.00')})
+        self.assertEqual(hot_account.balance, Decimal('1020.00'))
+        self.assertFalse(hot_account.shards.exclude(balance=0).exists())
+        self.assertEqual(self.balance(self.hot_account), Decimal('1020.00'))
+
+    def test_unsharding_keeps_balance(self):
+        "Testing reducing the number of shards compacts first and removes the extra shards"
+        shard_account(self.hot_account.id, 4)
+        for _ in range(4):
+            post_balance_deltas({self.hot_account.id: Decimal('1.00')}, strategy='round_robin')
+
+        account = shard_account(self.hot_account.id, 0)
+
+        self.assertEqual(account.balance_shards, 0)
+        self.assertEqual(account.balance, Decimal('1004.00'))
+        self.assertFalse(AccountBalanceShard.objects.exists())
+
+    def test_posting_to_removed_shard_goes_to_account(self):
+        "Testing a posting made with a stale shard count still reaches the balance"
+        post_balance_deltas({self.hot_account.id: Decimal('3.00')}, shard_counts={self.hot_account.id: 4})
+
+        self.assertEqual(Account.objects.get(id=self.hot_account.id).balance, Decimal('1003.00'))
+
+    def test_clearing_posts_to_shards(self):
+        "Testing the clearing engine posts cleared amounts to the balances and shards"
+        shard_account(self.hot_account.id, 4)
+        for _ in range(3):
+            Transaction.objects.create(credit_from=self.account, debit_to=self.hot_account, amount=100.00, currency='GBP')
+
+        ClearingEngine(batch_size=1).run()
+
+        self.assertEqual(self.balance(self.hot_account), Decimal('1300.00'))
+        self.assertEqual(Account.objects.get(id=self.hot_account.id).balance, Decimal('1000.00'))
+        self.assertEqual(self.balance(self.account), Decimal('200.00'))
+
+    def test_balance_commands(self):
+        "Testing the shard_account and compact_balances commands"
+        out = StringIO()
+
+        call_command('shard_account', self.hot_account.id, 2, stdout=out)
+        post_balance_deltas({self.hot_account.id: Decimal('7.00')})
+        call_command('compact_balances', stdout=out)
+
+        self.assertIn(f'Account {self.hot_account.id} now posts to 2 balance shards', out.getvalue())
+        self.assertIn('Compacted 1 sharded accounts, 1 with postings to fold in', out.getvalue())
+        self.assertEqual(Account.objects.get(id=self.hot_account.id).balance, Decimal('1007.00'))
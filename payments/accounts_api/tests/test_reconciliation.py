@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from accounts_api.balances import post_balance_deltas, shard_account
+from accounts_api.models import Account
+from accounts_api.reconciliation import partitions, reconcile_partition
+from transactions_api.archival import archive_transactions
+from transactions_api.clearing import ClearingEngine
+from transactions_api.models import Transaction
+from payments.utils.utils_test import BaseAPITestCase
+
+
+class ReconciliationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.accounts = [
+            Account.objects.create(account_name=f'Test Account {number}', status=Account.Status.ACTIVE, balance=1000.00, currency='GBP')
+            for number in range(1, 6)
+        ]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, 'checkpoint.json')
+
+    def reconcile(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('reconcile', '--workers', '1', '--partition-size', '2', '--checkpoint', self.checkpoint, *args, stdout=out, stderr=err)
+        return [json.loads(line) for line in out.getvalue().splitlines()], err.getvalue()
+
+    def test_opening_balance_defaults_to_balance(self):
+        "Testing a new account's opening balance is its balance when created"
+        self.assertEqual(self.accounts[0].opening_balance, 1000.00)
+
+    def test_cleared_transactions_reconcile(self):
+        "Testing balances posted by clearing, including archived transactions and shards, match the ledger"
+        shard_account(self.accounts[1].id, 2)
+        for _ in range(3):
+            Transaction.objects.create(credit_from=self.accounts[0], debit_to=self.accounts[1], amount=12.34, currency='GBP')
+        Transaction.objects.create(credit_from=self.accounts[2], debit_to=self.accounts[3], amount=50.00, currency='GBP')
+        ClearingEngine().run()
+        Transaction.objects.update(transaction_date='2020-01-01T00:00:00Z')
+        self.assertEqual(archive_transactions(), 4)
+
+        mismatches, summary = self.reconcile()
+
+        self.assertEqual(mismatches, [])
+        self.assertIn(f'Reconciled 5 accounts in {len(partitions(2))} partitions', summary)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_partitions_are_aligned_on_partition_size(self):
+        "Testing partitions are keyed on id // partition size, whatever the lowest account id"
+        self.accounts[0].delete()
+        first, last = self.accounts[1].id, self.accounts[4].id
+
+        ranges = partitions(3)
+
+        self.assertEqual(ranges[0], (first // 3 * 3, first // 3 * 3 + 3))
+        self.assertEqual(ranges[-1], (last // 3 * 3, last // 3 * 3 + 3))
+        self.assertTrue(all(start % 3 == 0 and end == start + 3 for start, end in ranges))
+
+    def test_mismatches_are_reported(self):
+        "Testing accounts whose balance moved without a cleared transaction are reported with the difference"
+        post_balance_deltas({self.accounts[4].id: Decimal('-0.01')})
+
+        checked, mismatches = reconcile_partition(self.accounts[4].id, self.accounts[4].id + 1)
+
+        self.assertEqual(checked, 1)
+        self.assertEqual(mismatches, [{
+            'account_id': self.accounts[4].id,
+            'account_guid': str(self.accounts[4].account_guid),
+            'currency': 'GBP',
+            'balance': '999.99',
+            'expected_balance': '1000.00',
+            'difference': '-0.01'
+        }])
+
+    def test_resumes_from_checkpoint(self):
+        "Testing partitions recorded in the checkpoint are skipped and the totals carried over"
+        ranges = partitions(2)
+        first, end = ranges[0]
+        in_first = Account.objects.filter(id__gte=first, id__lt=end).count()
+        post_balance_deltas({self.accounts[0].id: Decimal('5.00'), self.accounts[4].id: Decimal('5.00')})
+        with open(self.checkpoint, 'w') as checkpoint_file:
+            json.dump({'partition_size': 2, 'completed': [first], 'checked': in_first, 'mismatched': 1}, checkpoint_file)
+
+        mismatches, summary = self.reconcile()
+
+        self.assertEqual([mismatch['account_id'] for mismatch in mismatches], [self.accounts[4].id])
+        self.assertIn('1 partitions already checked', summary)
+        self.assertIn(f'Reconciled {5 - in_first} accounts in {len(ranges) - 1} partitions', summary)
+        self.assertIn('2 mismatches in 5 accounts checked in total', summary)
+
+    def test_checkpoint_partition_size_must_match(self):
+        "Testing a checkpoint written with another partition size is refused unless restarting"
+        with open(self.checkpoint, 'w') as checkpoint_file:
+            json.dump({'partition_size': 100, 'completed': [1], 'checked': 5, 'mismatched': 0}, checkpoint_file)
+
+        with self.assertRaises(CommandError):
+            self.reconcile()
+
+        _, summary = self.reconcile('--restart')
+        self.assertIn(f'Reconciled 5 accounts in {len(partitions(2))} partitions', summary)
+
+
+class ReconciliationAPITest(BaseAPITestCase):
+
+    def test_transactions_cleared_through_the_api_reconcile(self):
+        """Tests balances changed by creating, updating and deleting CLEARED transactions through the API match the ledger"""
+        data = {
+            "transaction_type": "CREDIT",
+            "credit_from": 1,
+            "debit_to": 2,
+            "amount": 125.00,
+            "currency": "CAD",
+            "transaction_date": "2024-05-11",
+            "status": "CLEARED"
+        }
+        for _ in range(3):
+            self.assertEqual(self.client.post(reverse('transactions-list'), data=data).status_code, status.HTTP_201_CREATED)
+        data['status'] = 'UNCLEARED'
+        self.assertEqual(self.client.post(reverse('transactions-list'), data=data).status_code, status.HTTP_201_CREATED)
+        changed, uncleared, deleted, cleared = Transaction.objects.order_by('id').values_list('id', flat=True)
+
+        self.client.patch(reverse('transactions-detail', args=[changed]), data={'amount': '99.50', 'debit_to': 1, 'credit_from': 2})
+        self.client.patch(reverse('transactions-detail', args=[uncleared]), data={'status': 'UNCLEARED'})
+        self.client.delete(reverse('transactions-detail', args=[deleted]))
+        self.client.patch(reverse('transactions-detail', args=[cleared]), data={'status': 'CLEARED'})
+
+        checked, mismatches = reconcile_partition(0, 100)
+
+        self.assertEqual(checked, 2)
+        self.assertEqual(mismatches, [])
+        self.assertNotEqual(Account.objects.get(id=1).balance, Account.objects.get(id=1).opening_balance)
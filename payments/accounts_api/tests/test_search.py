@@ -0,0 +1,79 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from accounts_api import search
+from accounts_api.models import Account
+from accounts_api.search import search_accounts, search_index_enabled, SEARCH_TABLE
+
+
+class AccountSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        names = ['Acme Holdings', 'Northern Acme Ltd', 'Bacmesh Trading', 'Acne Clinic', 'Harbour Freight', 'Ac']
+        cls.accounts = {
+            name: Account.objects.create(account_name=name, status=Account.Status.ACTIVE, balance=100.00, currency='GBP')
+            for name in names
+        }
+
+    def names(self, query, limit=search.DEFAULT_LIMIT):
+        return [account.account_name for account in search_accounts(query, limit)]
+
+    def test_index_created(self):
+        "Testing the migration creates the FTS5 index on SQLite"
+        self.assertTrue(search_index_enabled())
+
+    def test_ranking(self):
+        "Testing prefix matches rank before word prefix, substring and fuzzy matches"
+        self.assertEqual(self.names('acme'), ['Acme Holdings', 'Northern Acme Ltd', 'Bacmesh Trading'])
+
+    def test_case_and_spacing(self):
+        "Testing the search ignores case and repeated whitespace"
+        self.assertEqual(self.names('  NORTHERN   acme '), ['Northern Acme Ltd'])
+
+    def test_short_query(self):
+        "Testing queries shorter than a trigram still match by prefix"
+        names = self.names('ac')
+
+        self.assertEqual(names[0], 'Ac')
+        self.assertEqual(set(names[1:3]), {'Acme Holdings', 'Acne Clinic'})
+        self.assertEqual(names[3], 'Northern Acme Ltd')
+
+    def test_limit(self):
+        "Testing no more than limit results are returned"
+        self.assertEqual(self.names('acme', limit=2), ['Acme Holdings', 'Northern Acme Ltd'])
+
+    def test_fuzzy_match(self):
+        "Testing a misspelt name is still found"
+        self.assertEqual(self.names('harbor freight'), ['Harbour Freight'])
+        self.assertEqual(self.names('acme holdngs'), ['Acme Holdings'])
+
+    def test_index_follows_changes(self):
+        "Testing renamed and deleted accounts are updated in the index"
+        account = self.accounts['Harbour Freight']
+        account.account_name = 'Southern Shipping'
+        account.save()
+        self.accounts['Acne Clinic'].delete()
+
+        self.assertEqual(self.names('southern'), ['Southern Shipping'])
+        self.assertEqual(self.names('harbour freight'), [])
+        self.assertEqual(self.names('acne'), [])
+
+    def test_scan_fallback(self):
+        "Testing the LIKE fallback ranks the same way without the index"
+        with mock.patch('accounts_api.search.search_index_enabled', return_value=False):
+            self.assertEqual(self.names('acme'), ['Acme Holdings', 'Northern Acme Ltd', 'Bacmesh Trading'])
+
+    def test_rebuild_command(self):
+        "Testing the rebuild_account_search command repopulates the index"
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        output = StringIO()
+
+        call_command('rebuild_account_search', stdout=output)
+
+        self.assertIn('Indexed 6 account names', output.getvalue())
+        self.assertEqual(self.names('holdings'), ['Acme Holdings'])
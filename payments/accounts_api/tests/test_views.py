@@ -1,9 +1,20 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
 from rest_framework import status
 from django.urls import reverse
+from django.utils import timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from accounts_api.balances import post_balance_deltas, shard_account
 from accounts_api.models import Account
 from accounts_api.serializers import AccountSerializer
+from transactions_api.archival import archive_transactions
+from transactions_api.models import Transaction
 
+from payments.utils.utils_columnar import read_columnar_json
 from payments.utils.utils_test import BaseAPITestCase, validate_response_headers
 
 class AccountBaseAPITestCase(BaseAPITestCase):
@@ -293,6 +304,28 @@ class TestAccountDetailView(BaseAPITestCase):
             Account.objects.get(id=self.test_account_one.id)    
 
 
+    def test_delete_account_refused_with_cleared_transactions(self):
+        """Tests DELETE request is refused with 409 while the account has CLEARED transactions, so no balance is left without its postings"""
+
+        Transaction.objects.create(
+            credit_from=self.test_account_one, debit_to=self.test_account_two, amount=50.00, currency='CAD', status=Transaction.Status.UNCLEARED
+        )
+        Transaction.objects.create(
+            credit_from=self.test_account_two, debit_to=self.test_account_one, amount=25.00, currency='USD',
+            status=Transaction.Status.CLEARED, transaction_date=timezone.now() - timedelta(days=400)
+        )
+        archive_transactions()
+
+        response = self.client.delete(reverse('accounts-detail', args=[self.test_account_one.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertTrue(Account.objects.filter(id=self.test_account_one.id).exists())
+        self.assertEqual(Transaction.objects.count(), 1)
+
+        Transaction.objects.all().delete()
+        self.assertEqual(self.client.delete(reverse('accounts-detail', args=[self.test_account_one.id])).status_code, status.HTTP_409_CONFLICT)
+
+
     def test_delete_account_correct_headers(self):
         """Tests DELETE request for a given account id has the correct headers"""
 
@@ -311,4 +344,538 @@ class TestAccountDetailView(BaseAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
         # Verify account still in db
-        self.assertTrue(Account.objects.filter(id=self.test_account_two.id).exists())
\ No newline at end of file
+        self.assertTrue(Account.objects.filter(id=self.test_account_two.id).exists())
+
+    def test_partial_update_single_account_successful(self):
+        """Tests PATCH request updates only the provided fields for a given account id"""
+
+        response = self.client.patch(reverse('accounts-detail', args=[self.test_account_two.id]), data={'status': 'INACTIVE'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        account_db_record = Account.objects.get(id=self.test_account_two.id)
+        expected_data = AccountSerializer(account_db_record).data
+
+        self.assertEqual(response.data, expected_data)
+        self.assertEqual(account_db_record.status, Account.Status.INACTIVE)
+        self.assertEqual(account_db_record.currency, 'USD')
+
+
+    def test_partial_update_writes_only_changed_columns(self):
+        """Tests PATCH request issues an UPDATE restricted to the changed fields"""
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(reverse('accounts-detail', args=[self.test_account_two.id]), data={'status': 'INACTIVE', 'currency': 'USD'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"status"', updates[0])
+        self.assertNotIn('"currency"', updates[0])
+        self.assertNotIn('"account_name"', updates[0])
+
+
+    def test_partial_update_skips_write_when_nothing_changed(self):
+        """Tests PATCH request does not write to the database when no values change"""
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(reverse('accounts-detail', args=[self.test_account_one.id]), data={'status': 'ACTIVE'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any(query['sql'].startswith('UPDATE') for query in queries))
+
+
+    def test_partial_update_unsuccessful_invalid_data(self):
+        """Tests PATCH request is unsuccessful when the currency provided is invalid"""
+
+        response = self.client.patch(reverse('accounts-detail', args=[self.test_account_one.id]), data={'currency': 'JPAN'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Account.objects.get(id=self.test_account_one.id).currency, 'CAD')
+
+
+    def test_partial_update_invalid_account(self):
+        """Tests PATCH request is unsuccessful using an account id that doesn't exist"""
+
+        response = self.client.patch(reverse('accounts-detail', args=[19]), data={'status': 'INACTIVE'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+
+class TestAccountBulkUpdateView(BaseAPITestCase):
+
+    def test_bulk_update_accounts_successful(self):
+        """Tests PATCH request updates every account in the batch"""
+
+        data = [
+            {'id': self.test_account_one.id, 'status': 'INACTIVE', 'status_valid_to': '2024-06-12T00:00:00Z'},
+            {'id': self.test_account_two.id, 'status': 'INACTIVE'}
+        ]
+
+        response = self.client.patch(reverse('accounts-bulk-update'), data=data)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Account.objects.filter(status=Account.Status.INACTIVE).count(), 2)
+
+        # Check response against db
+        accounts_in_db = Account.objects.filter(id__in=[self.test_account_one.id, self.test_account_two.id]).order_by('id')
+        expected_accounts = AccountSerializer(accounts_in_db, many=True).data
+
+        self.assertEqual(response.data, expected_accounts)
+
+
+    def test_bulk_update_leaves_other_fields_unchanged(self):
+        """Tests PATCH request only writes the fields provided for each account"""
+
+        data = [{'id': self.test_account_two.id, 'balance': '1000.00'}]
+
+        response = self.client.patch(reverse('accounts-bulk-update'), data=data)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        account_db_record = Account.objects.get(id=self.test_account_two.id)
+
+        self.assertEqual(str(account_db_record.balance), '1000.00')
+        self.assertEqual(account_db_record.account_name, 'Test Account 2')
+        self.assertEqual(account_db_record.currency, 'USD')
+
+
+    def test_bulk_update_fails_when_account_does_not_exist(self):
+        """Tests PATCH request does not update any account when one of the ids does not exist"""
+
+        data = [
+            {'id': self.test_account_one.id, 'status': 'INACTIVE'},
+            {'id': 19, 'status': 'INACTIVE'}
+        ]
+
+        response = self.client.patch(reverse('accounts-bulk-update'), data=data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['ids'], [19])
+        self.assertEqual(Account.objects.filter(status=Account.Status.INACTIVE).count(), 0)
+
+
+    def test_bulk_update_fails_with_invalid_data(self):
+        """Tests PATCH request is unsuccessful when an item is invalid or missing its id"""
+
+        response = self.client.patch(reverse('accounts-bulk-update'), data=[{'status': 'INACTIVE'}])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.patch(reverse('accounts-bulk-update'), data=[{'id': self.test_account_one.id, 'currency': 'JPAN'}])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Account.objects.get(id=self.test_account_one.id).currency, 'CAD')
+
+
+    def test_bulk_update_fails_with_duplicate_ids(self):
+        """Tests PATCH request is unsuccessful when the same account id appears twice"""
+
+        data = [
+            {'id': self.test_account_one.id, 'status': 'INACTIVE'},
+            {'id': self.test_account_one.id, 'status': 'ACTIVE'}
+        ]
+
+        response = self.client.patch(reverse('accounts-bulk-update'), data=data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_bulk_update_unsuccessful_no_authentication(self):
+        """Tests PATCH request is unsuccessful when there are no credentials provided"""
+
+        self.client.credentials()
+
+        response = self.client.patch(reverse('accounts-bulk-update'), data=[{'id': self.test_account_one.id, 'status': 'INACTIVE'}])
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TestAccountTransactionsView(AccountBaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.test_account_three = Account.objects.create(
+            account_name='Test Account 3', status=Account.Status.ACTIVE, balance=5000.00, currency='CAD'
+        )
+        now = timezone.now()
+        cls.archived = Transaction.objects.create(
+            credit_from=cls.test_account_one, debit_to=cls.test_account_two, amount=10.00, currency='CAD',
+            status=Transaction.Status.CLEARED, transaction_date=now - timedelta(days=400)
+        )
+        archive_transactions()
+        cls.credit = Transaction.objects.create(
+            credit_from=cls.test_account_one, debit_to=cls.test_account_two, amount=20.00, currency='CAD', transaction_date=now - timedelta(days=3)
+        )
+        cls.debit = Transaction.objects.create(
+            credit_from=cls.test_account_two, debit_to=cls.test_account_one, amount=30.00, currency='CAD', transaction_date=now - timedelta(days=2)
+        )
+        cls.self_transfer = Transaction.objects.create(
+            credit_from=cls.test_account_one, debit_to=cls.test_account_one, amount=40.00, currency='CAD', transaction_date=now - timedelta(days=1)
+        )
+        cls.unrelated = Transaction.objects.create(
+            credit_from=cls.test_account_two, debit_to=cls.test_account_three, amount=50.00, currency='CAD', transaction_date=now
+        )
+
+    def get_guids(self, response):
+        return [item['transaction_guid'] for item in response.data['results']]
+
+
+    def test_pages_through_account_transactions(self):
+        """Tests GET request pages through the account's transactions newest first, including the archive"""
+
+        url = reverse('accounts-transactions', kwargs={'id': self.test_account_one.id})
+        guids = []
+        cursor = None
+        while True:
+            params = {'limit': 2, 'cursor': cursor} if cursor else {'limit': 2}
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            guids += self.get_guids(response)
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+
+        expected = [self.self_transfer, self.debit, self.credit, self.archived]
+        self.assertEqual(guids, [str(item.transaction_guid) for item in expected])
+
+
+    def test_direction_and_date_filters(self):
+        """Tests GET request only returns the requested side of the ledger within the date range"""
+
+        url = reverse('accounts-transactions', kwargs={'id': self.test_account_one.id})
+
+        response = self.client.get(url, {'direction': 'debit_to'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_guids(response), [str(self.self_transfer.transaction_guid), str(self.debit.transaction_guid)])
+
+        date_from = (timezone.now() - timedelta(days=30)).isoformat()
+        response = self.client.get(url, {'direction': 'credit_from', 'date_from': date_from})
+
+        self.assertEqual(self.get_guids(response), [str(self.self_transfer.transaction_guid), str(self.credit.transaction_guid)])
+
+
+    def test_page_reads_use_account_indexes(self):
+        """Tests each page is a fixed number of queries that seek the (account, transaction_date, id) indexes"""
+
+        url = reverse('accounts-transactions', kwargs={'id': self.test_account_three.id})
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'date_from': (timezone.now() - timedelta(days=30)).isoformat()})
+
+        self.assertEqual(self.get_guids(response), [str(self.unrelated.transaction_guid)])
+        history_queries = [query['sql'] for query in context.captured_queries if 'ORDER BY' in query['sql']]
+        self.assertEqual(len(history_queries), 2)
+        with connection.cursor() as cursor:
+            for sql in history_queries:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = ' '.join(str(row) for row in cursor.fetchall())
+                self.assertRegex(plan, 'txn_(credit_from|debit_to)_date_idx')
+
+
+    def test_account_transactions_invalid_requests(self):
+        """Tests GET request is unsuccessful for an unknown account or a malformed cursor"""
+
+        response = self.client.get(reverse('accounts-transactions', kwargs={'id': 19}))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"res": "Object with account id does not exist"})
+
+        url = reverse('accounts-transactions', kwargs={'id': self.test_account_one.id})
+        response = self.client.get(url, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestAccountGuidViews(AccountBaseAPITestCase):
+
+    def test_view_single_account_by_guid(self):
+        """Tests GET request retrieves the account with the given account_guid"""
+
+        response = self.client.get(reverse('accounts-guid-detail', args=[self.test_account_one.account_guid]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, AccountSerializer(self.test_account_one).data)
+
+
+    def test_partial_update_account_by_guid(self):
+        """Tests PATCH request updates the account with the given account_guid"""
+
+        response = self.client.patch(reverse('accounts-guid-detail', args=[self.test_account_two.account_guid]), data={'status': 'INACTIVE'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Account.objects.get(id=self.test_account_two.id).status, Account.Status.INACTIVE)
+
+
+    def test_view_single_account_by_unknown_guid(self):
+        """Tests GET request is unsuccessful when no account has the given account_guid"""
+
+        response = self.client.get(reverse('accounts-guid-detail', args=['00000000-0000-0000-0000-000000000000']))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_guid_lookup_resolves_batch_in_one_query(self):
+        """Tests POST request resolves many account_guids with one query and reports the missing ones"""
+
+        missing_guid = '00000000-0000-0000-0000-000000000000'
+        guids = [str(self.test_account_one.account_guid), str(self.test_account_two.account_guid), missing_guid]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('accounts-guid-lookup'), data={'guids': guids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results']), set(guids[:2]))
+        self.assertEqual(response.data['results'][guids[0]]['account_name'], 'Test Account 1')
+        self.assertEqual(response.data['missing'], [missing_guid])
+        account_queries = [query for query in context.captured_queries if 'accounts_api_account' in query['sql']]
+        self.assertEqual(len(account_queries), 1)
+
+
+    def test_guid_lookup_fails_with_invalid_batch(self):
+        """Tests POST request is unsuccessful with an empty, oversized or malformed batch"""
+
+        for guids in [[], ['not-a-guid'], ['00000000-0000-0000-0000-000000000000'] * 101]:
+            response = self.client.post(reverse('accounts-guid-lookup'), data={'guids': guids}, format='json')
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestAccountBatchView(AccountBaseAPITestCase):
+
+    def test_batch_get_returns_keyed_accounts(self):
+        """Tests GET request with ?ids returns the accounts keyed by id with one account query"""
+
+        ids = f'{self.test_account_one.id},{self.test_account_two.id},19'
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('accounts-batch'), {'ids': ids})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][str(self.test_account_one.id)], AccountSerializer(self.test_account_one).data)
+        self.assertEqual(response.data['results'][str(self.test_account_two.id)], AccountSerializer(self.test_account_two).data)
+        self.assertEqual(response.data['missing'], [19])
+        account_queries = [query for query in context.captured_queries if 'accounts_api_account' in query['sql']]
+        self.assertEqual(len(account_queries), 1)
+
+
+    def test_batch_post_returns_keyed_accounts(self):
+        """Tests POST request with the ids in the body returns the accounts keyed by id"""
+
+        response = self.client.post(reverse('accounts-batch'), data={'ids': [self.test_account_two.id]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data['results']), [str(self.test_account_two.id)])
+        self.assertEqual(response.data['missing'], [])
+
+
+    def test_batch_fails_with_invalid_ids(self):
+        """Tests batch requests are unsuccessful without ids, with malformed ids or above the batch size"""
+
+        for ids in ['', '1,two', ','.join(str(account_id) for account_id in range(1, 102))]:
+            response = self.client.get(reverse('accounts-batch'), {'ids': ids})
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(reverse('accounts-batch'), data={'ids': list(range(1, 102))}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_batch_post_fails_with_non_object_body(self):
+        """Tests POST request with a body that is not an object is unsuccessful rather than an error"""
+
+        response = self.client.post(reverse('accounts-batch'), data=[1, 2], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_batch_unsuccessful_no_authentication(self):
+        """Tests GET request is unsuccessful when there are no credentials provided"""
+
+        self.client.credentials()
+
+        response = self.client.get(reverse('accounts-batch'), {'ids': str(self.test_account_one.id)})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TestAccountOptimisticConcurrency(AccountBaseAPITestCase):
+
+    def test_update_with_matching_if_match(self):
+        """Tests PATCH request with the current ETag in If-Match succeeds and returns the next version"""
+
+        url = reverse('accounts-detail', args=[self.test_account_one.id])
+        current_etag = self.client.get(url)['ETag']
+
+        response = self.client.patch(url, data={'status': 'INACTIVE'}, HTTP_IF_MATCH=current_etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(current_etag, '"1"')
+        self.assertEqual(response['ETag'], '"2"')
+        self.assertEqual(Account.objects.get(id=self.test_account_one.id).version, 2)
+
+
+    def test_update_with_stale_if_match(self):
+        """Tests PUT and PATCH requests are rejected with 412 when If-Match names an older version"""
+
+        url = reverse('accounts-detail', args=[self.test_account_one.id])
+        self.client.patch(url, data={'account_name': 'Renamed'})
+        data = {'account_name': 'Test Account 1', 'status': 'INACTIVE', 'balance': 10.00, 'currency': 'CAD'}
+
+        response = self.client.put(url, data=data, HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        response = self.client.patch(url, data={'status': 'INACTIVE'}, HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Account.objects.get(id=self.test_account_one.id).status, Account.Status.ACTIVE)
+
+
+    def test_delete_with_stale_if_match(self):
+        """Tests DELETE request is rejected with 412 when If-Match names an older version"""
+
+        response = self.client.delete(reverse('accounts-detail', args=[self.test_account_two.id]), HTTP_IF_MATCH='"7"')
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertTrue(Account.objects.filter(id=self.test_account_two.id).exists())
+
+
+    def test_bulk_update_with_stale_version(self):
+        """Tests PATCH request to the bulk endpoint is rejected with 409 when an item's version is stale"""
+
+        data = [
+            {'id': self.test_account_one.id, 'status': 'INACTIVE', 'version': 1},
+            {'id': self.test_account_two.id, 'status': 'INACTIVE', 'version': 3}
+        ]
+
+        response = self.client.patch(reverse('accounts-bulk-update'), data=data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['ids'], [self.test_account_two.id])
+        self.assertEqual(Account.objects.filter(status=Account.Status.INACTIVE).count(), 0)
+
+        response = self.client.patch(reverse('accounts-bulk-update'), data=data[:1], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['version'], 2)
+
+
+    def test_bulk_update_with_compact_body(self):
+        """Tests PATCH request to the bulk endpoint accepts and returns the compact format"""
+
+        data = json.dumps({
+            'fields': ['id', 'status'],
+            'rows': [[self.test_account_one.id, 'INACTIVE'], [self.test_account_two.id, 'INACTIVE']]
+        })
+
+        response = self.client.patch(
+            reverse('accounts-bulk-update'), data=data, content_type='application/vnd.payments.compact+json',
+            HTTP_ACCEPT='application/vnd.payments.compact+json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual([row[body['fields'].index('status')] for row in body['rows']], ['INACTIVE', 'INACTIVE'])
+        self.assertEqual(Account.objects.filter(status=Account.Status.INACTIVE).count(), 2)
+
+
+class TestShardedAccountViews(AccountBaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        shard_account(self.test_account_one.id, 4)
+        post_balance_deltas({self.test_account_one.id: Decimal('250.00')})
+
+
+    def test_reads_return_summed_balance(self):
+        """Tests GET requests report a sharded account's balance including its shards"""
+
+        response = self.client.get(reverse('accounts-detail', args=[self.test_account_one.id]))
+
+        self.assertEqual(response.data['balance'], '120250.00')
+
+        response = self.client.get(reverse('accounts-list'), {'convert_to': 'CAD'})
+        balances = {item['account_name']: (item['balance'], item['converted_balance']) for item in response.data}
+
+        self.assertEqual(balances['Test Account 1'], ('120250.00', '120250.00'))
+
+
+    def test_balance_update_keeps_shards(self):
+        """Tests PATCH request setting a sharded account's balance stores the total, leaving the shards alone"""
+
+        url = reverse('accounts-detail', args=[self.test_account_one.id])
+
+        response = self.client.patch(url, data={'balance': 1000.00})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['balance'], '1000.00')
+        self.assertEqual(Account.objects.get(id=self.test_account_one.id).balance, Decimal('750.00'))
+
+
+class TestAccountExportView(AccountBaseAPITestCase):
+
+    def test_export_streams_columnar_json_lines(self):
+        """Tests GET request to the export endpoint streams the accounts in the columnar format"""
+
+        response = self.client.get(reverse('accounts-export'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        meta, chunks = read_columnar_json(b''.join(response.streaming_content).decode().splitlines())
+        chunk = next(chunks)
+        self.assertEqual(meta['table'], 'accounts')
+        self.assertEqual(chunk['balance'], [12000000, 18000000])
+        self.assertEqual(chunk['currency'], ['CAD', 'USD'])
+
+
+    def test_export_unsuccessful_no_authentication(self):
+        """Tests GET request to the export endpoint needs authentication"""
+
+        self.client.credentials()
+        response = self.client.get(reverse('accounts-export'))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TestAccountSearchView(AccountBaseAPITestCase):
+
+    def test_search_by_name(self):
+        """Tests GET request to the search endpoint returns the matching accounts"""
+
+        response = self.client.get(reverse('accounts-search'), {'q': self.test_account_two.account_name})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['account_guid'], str(self.test_account_two.account_guid))
+
+
+    def test_search_finds_renamed_account(self):
+        """Tests an account renamed with PATCH is found by its new name"""
+
+        self.client.patch(reverse('accounts-detail', kwargs={'id': self.test_account_one.id}), data={'account_name': 'Quayside Traders'})
+        response = self.client.get(reverse('accounts-search'), {'q': 'quaysid'})
+
+        self.assertEqual([account['account_name'] for account in response.data['results']], ['Quayside Traders'])
+
+
+    def test_search_unsuccessful_without_query(self):
+        """Tests GET request to the search endpoint without search text is unsuccessful"""
+
+        response = self.client.get(reverse('accounts-search'), {'limit': 5})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('q', response.data)
+
+
+    def test_search_unsuccessful_no_authentication(self):
+        """Tests GET request to the search endpoint needs authentication"""
+
+        self.client.credentials()
+        response = self.client.get(reverse('accounts-search'), {'q': 'test'})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,10 +1,24 @@
 from django.urls import path, include
 from .views import (
     AccountListApiView,
-    AccountDetailApiView
+    AccountDetailApiView,
+    AccountGuidDetailApiView,
+    AccountGuidLookupApiView,
+    AccountBatchApiView,
+    AccountBulkUpdateApiView,
+    AccountTransactionsApiView,
+    AccountExportApiView,
+    AccountSearchApiView
 )
 
 urlpatterns = [
     path('api/', AccountListApiView.as_view(), name='accounts-list'),
-    path('api/<int:id>/', AccountDetailApiView.as_view(), name='accounts-detail')
+    path('api/<int:id>/', AccountDetailApiView.as_view(), name='accounts-detail'),
+    path('api/guid/<uuid:id>/', AccountGuidDetailApiView.as_view(), name='accounts-guid-detail'),
+    path('api/guid/lookup/', AccountGuidLookupApiView.as_view(), name='accounts-guid-lookup'),
+    path('api/batch/', AccountBatchApiView.as_view(), name='accounts-batch'),
+    path('api/bulk/', AccountBulkUpdateApiView.as_view(), name='accounts-bulk-update'),
+    path('api/<int:id>/transactions/', AccountTransactionsApiView.as_view(), name='accounts-transactions'),
+    path('api/export/', AccountExportApiView.as_view(), name='accounts-export'),
+    path('api/search/', AccountSearchApiView.as_view(), name='accounts-search')
 ]
\ No newline at end of file
@@ -1,18 +1,41 @@
-from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample, OpenApiResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample, OpenApiParameter, OpenApiResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import permissions
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.db import transaction
+from django.utils import timezone
 
+from .balances import balance_to_base, total_balance_expression
+from .export import ACCOUNT_COLUMNS, account_chunks
 from .models import Account
-from .serializers import AccountSerializer
+from .search import index_accounts, search_accounts
+from .serializers import (
+    AccountSerializer,
+    AccountBulkUpdateSerializer,
+    AccountGuidLookupResultSerializer,
+    AccountBatchSerializer,
+    AccountBatchResultSerializer,
+    AccountSearchSerializer,
+    AccountSearchResultSerializer
+)
+from fx_api.rates import convert_expression
+from transactions_api.archival import has_cleared_transactions
+from transactions_api.history import account_history
+from transactions_api.serializers import AccountTransactionsFilterSerializer, AccountTransactionsSerializer
+from fx_api.serializers import CurrencyConversionSerializer
+from payments.utils.utils_columnar import columnar_json_response
+from payments.utils.utils_concurrency import check_if_match, delete_if_match, etag, save_changes
+from payments.utils.utils_serializers import apply_changed_fields, GuidLookupSerializer
 
 # Create your views here.
 @extend_schema_view(
         get=extend_schema(
             operation_id='Get All Accounts',
             summary='Get a list of all accounts',
+            parameters=[CurrencyConversionSerializer],
             responses={
                 200: OpenApiResponse(
                     response=AccountSerializer(many=True),
@@ -48,13 +71,24 @@ from .serializers import AccountSerializer
 class AccountListApiView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = {'GET': 'list', 'POST': 'detail'}
 
     # List all
     def get(self, request, *args, **kwargs):
         """
-        List all the accounts
+        List all the accounts, with the balances converted when convert_to is given
         """
+        conversion = CurrencyConversionSerializer(data=request.query_params)
+        if not conversion.is_valid():
+            return Response(conversion.errors, status=status.HTTP_400_BAD_REQUEST)
+
         accounts = Account.objects.filter()
+        convert_to = conversion.validated_data.get('convert_to')
+        if convert_to:
+            accounts = accounts.annotate(
+                total_balance=total_balance_expression(),
+                converted_balance=convert_expression('total_balance', convert_to)
+            )
         serializer = AccountSerializer(accounts, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -120,6 +154,28 @@ class AccountListApiView(APIView):
     )
 )
 
+@extend_schema_view(
+    patch=extend_schema(
+        operation_id='Partially Update an Account',
+        summary='Partially update a single Account based on the provided ID',
+        responses={
+            200: OpenApiResponse(
+                response=AccountSerializer
+            ),
+            400: OpenApiResponse(
+                response={'Currency must be a 3 character ISO code'},
+                examples=[
+                    OpenApiExample(
+                        'Currency code Bad Request',
+                        description='Currency code validation fails',
+                        value={'detail': 'Currency must be a 3 character ISO code'}
+                    )
+                ]
+            )
+        }
+    )
+)
+
 @extend_schema_view(
     delete=extend_schema(
         operation_id='Delete an Account',
@@ -144,6 +200,16 @@ class AccountListApiView(APIView):
                         value={'res': 'Object with given account id does not exist'}
                     )
                 ]
+            ),
+            409: OpenApiResponse(
+                response={'Account Has Cleared Transactions'},
+                examples=[
+                    OpenApiExample(
+                        'Account has cleared transactions',
+                        description='Deleting the account would delete cleared transactions posted to other accounts',
+                        value={'res': 'Account has cleared transactions and cannot be deleted'}
+                    )
+                ]
             )
         }
     )
@@ -152,6 +218,8 @@ class AccountListApiView(APIView):
 class AccountDetailApiView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]  
+    throttle_scope = 'detail'
+    lookup_field = 'id'
 
     def get_object(self, id):
         """
@@ -159,7 +227,7 @@ class AccountDetailApiView(APIView):
         """
 
         try:
-            return Account.objects.get(id=id)
+            return Account.objects.get(**{self.lookup_field: id})
         except Account.DoesNotExist:
             return None
 
@@ -176,7 +244,7 @@ class AccountDetailApiView(APIView):
             )
         
         serializer = AccountSerializer(account_instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers={'ETag': etag(account_instance)})
     
     # Update a single account
     def put(self, request, id, *args, **kwargs):
@@ -195,12 +263,39 @@ class AccountDetailApiView(APIView):
             'balance': request.data.get('balance'),
             'currency': request.data.get('currency')
         }
+        check_if_match(request, account_instance)
         serializer = AccountSerializer(instance=account_instance, data=data)
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            balance_to_base(account_instance, serializer.validated_data)
+            if 'account_name' in save_changes(request, account_instance, serializer.validated_data):
+                index_accounts([account_instance])
+            serializer = AccountSerializer(account_instance)
+            return Response(serializer.data, status=status.HTTP_200_OK, headers={'ETag': etag(account_instance)})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    # Partially update a single account
+    def patch(self, request, id, *args, **kwargs):
+        """
+        Partially updates the account with the given id, writing only the fields that changed
+        """
+        account_instance = self.get_object(id)
+        if not account_instance:
+            return Response(
+                {"res": "Object with given account id does not exist"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        check_if_match(request, account_instance)
+        serializer = AccountSerializer(instance=account_instance, data=request.data, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        balance_to_base(account_instance, serializer.validated_data)
+        if 'account_name' in save_changes(request, account_instance, serializer.validated_data):
+            index_accounts([account_instance])
+
+        serializer = AccountSerializer(account_instance)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers={'ETag': etag(account_instance)})
+
     # Delete a single account
     def delete(self, request, id, *args, **kwargs):
         """
@@ -211,9 +306,338 @@ class AccountDetailApiView(APIView):
             return Response(
                 {"res": "Object with given account id does not exist"}, status=status.HTTP_400_BAD_REQUEST
             )
-        
-        account_instance.delete()
+
+        # Deleting the account would cascade to its transactions, and the CLEARED ones have been posted
+        # to the balances of the other accounts they involve
+        with transaction.atomic():
+            if has_cleared_transactions(account_instance.id):
+                return Response(
+                    {"res": "Account has cleared transactions and cannot be deleted"}, status=status.HTTP_409_CONFLICT
+                )
+            delete_if_match(request, account_instance)
         return Response(
             {"res": "Account deleted"},
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+
+@extend_schema_view(
+    get=extend_schema(operation_id='Get an Account by GUID', summary='Get a single account based on the provided account_guid'),
+    put=extend_schema(operation_id='Update an Account by GUID', summary='Update a single account based on the provided account_guid'),
+    patch=extend_schema(operation_id='Partially Update an Account by GUID', summary='Partially update a single account based on the provided account_guid'),
+    delete=extend_schema(operation_id='Delete an Account by GUID', summary='Delete an account based on the provided account_guid')
+)
+
+class AccountGuidDetailApiView(AccountDetailApiView):
+    lookup_field = 'account_guid'
+
+
+@extend_schema_view(
+    post=extend_schema(
+        operation_id='Look Up Accounts by GUID',
+        summary='Get many accounts based on their account_guid in a single request',
+        request=GuidLookupSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=AccountGuidLookupResultSerializer,
+                description='Returns the accounts keyed by account_guid, and the GUIDs that were not found'
+            )
+        }
+    )
+)
+
+class AccountGuidLookupApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'list'
+
+    # Look up many accounts
+    def post(self, request, *args, **kwargs):
+        """
+        Resolves a batch of account GUIDs with a single query
+        """
+        serializer = GuidLookupSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        guids = list(dict.fromkeys(serializer.validated_data['guids']))
+        accounts = Account.objects.in_bulk(guids, field_name='account_guid')
+
+        serializer = AccountGuidLookupResultSerializer({
+            'results': {str(guid): account for guid, account in accounts.items()},
+            'missing': [guid for guid in guids if guid not in accounts]
+        })
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        operation_id='Get Accounts by ID',
+        summary='Get many accounts based on a comma separated list of ids in a single request',
+        parameters=[OpenApiParameter('ids', str, description='Comma separated account ids, e.g. 1,2,3', required=True)],
+        responses={
+            200: OpenApiResponse(
+                response=AccountBatchResultSerializer,
+                description='Returns the accounts keyed by id, and the ids that were not found'
+            )
+        }
+    ),
+    post=extend_schema(
+        operation_id='Get Accounts by ID in the Request Body',
+        summary='Get many accounts based on a list of ids in the request body, for batches too long for a URL',
+        request=AccountBatchSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=AccountBatchResultSerializer,
+                description='Returns the accounts keyed by id, and the ids that were not found'
+            )
+        }
+    )
+)
+
+class AccountBatchApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'list'
+
+    def get_accounts(self, data):
+        """
+        Helper method to retrieve a batch of accounts with a single query
+        """
+        serializer = AccountBatchSerializer(data=data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        accounts = Account.objects.in_bulk(ids)
+
+        serializer = AccountBatchResultSerializer({
+            'results': {str(account_id): accounts[account_id] for account_id in ids if account_id in accounts},
+            'missing': [account_id for account_id in ids if account_id not in accounts]
+        })
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    # Get many accounts from the query string
+    def get(self, request, *args, **kwargs):
+        """
+        Retrieves the accounts with the ids given as ?ids=1,2,3
+        """
+        return self.get_accounts({'ids': request.query_params.get('ids', '')})
+
+    # Get many accounts from the request body
+    def post(self, request, *args, **kwargs):
+        """
+        Retrieves the accounts with the ids given in the request body
+        """
+        return self.get_accounts(request.data)
+
+
+@extend_schema_view(
+    patch=extend_schema(
+        operation_id='Bulk Update Accounts',
+        summary='Partially update many accounts in a single request',
+        request=AccountBulkUpdateSerializer(many=True),
+        responses={
+            200: OpenApiResponse(
+                response=AccountSerializer(many=True),
+                description='Returns the updated accounts'
+            ),
+            400: OpenApiResponse(
+                response={'Accounts Not Found'},
+                examples=[
+                    OpenApiExample(
+                        'Accounts do not exist',
+                        description='One or more of the account ids in the batch do not exist',
+                        value={'res': 'Objects with given account ids do not exist', 'ids': [19, 20]}
+                    )
+                ]
+            )
+        }
+    )
+)
+
+class AccountBulkUpdateApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'list'
+
+    # Partially update many accounts
+    def patch(self, request, *args, **kwargs):
+        """
+        Applies a list of partial updates, writing only the fields that changed
+        """
+        serializer = AccountBulkUpdateSerializer(data=request.data, many=True, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        updates = {item.pop('id'): item for item in serializer.validated_data}
+
+        with transaction.atomic():
+            accounts = Account.objects.select_for_update().in_bulk(list(updates))
+            missing_ids = sorted(set(updates) - set(accounts))
+            if missing_ids:
+                return Response(
+                    {"res": "Objects with given account ids do not exist", "ids": missing_ids},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            stale_ids = sorted(
+                account_id for account_id, validated_data in updates.items()
+                if validated_data.get('version', accounts[account_id].version) != accounts[account_id].version
+            )
+            if stale_ids:
+                return Response(
+                    {"res": "Objects with given account ids have changed since the given versions", "ids": stale_ids},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            changed_accounts = []
+            changed_fields = set()
+            now = timezone.now()
+            for account_id, validated_data in updates.items():
+                validated_data.pop('version', None)
+                account_instance = accounts[account_id]
+                balance_to_base(account_instance, validated_data)
+                account_changes = apply_changed_fields(account_instance, validated_data)
+                if account_changes:
+                    # bulk_update bypasses save(), so auto_now has to be set explicitly.
+                    # The rows are locked above, so the version can be bumped in Python
+                    account_instance.last_updated = now
+                    account_instance.version += 1
+                    changed_accounts.append(account_instance)
+                    changed_fields.update(account_changes)
+
+            if changed_accounts:
+                Account.objects.bulk_update(changed_accounts, sorted(changed_fields) + ['last_updated', 'version'])
+                if 'account_name' in changed_fields:
+                    index_accounts(changed_accounts)
+
+        serializer = AccountSerializer([accounts[account_id] for account_id in updates], many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        operation_id='Get Account Transactions',
+        summary="Get a page of an account's transactions, newest first",
+        parameters=[AccountTransactionsFilterSerializer],
+        responses={
+            200: OpenApiResponse(
+                response=AccountTransactionsSerializer,
+                description='Returns a page of transactions and the cursor for the next page, null on the last page'
+            ),
+            400: OpenApiResponse(
+                response={'Account Not Found'},
+                examples=[
+                    OpenApiExample(
+                        'Account does not exist',
+                        description='Object with account id does not exist',
+                        value={'res': 'Object with account id does not exist'}
+                    )
+                ]
+            )
+        }
+    )
+)
+
+class AccountTransactionsApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'list'
+
+    # List the transactions of a single account
+    def get(self, request, id, *args, **kwargs):
+        """
+        Lists the transactions crediting or debiting the account with the given id, a page at a time
+        """
+        filters = AccountTransactionsFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if not Account.objects.filter(id=id).exists():
+            return Response(
+                {"res": "Object with account id does not exist"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        options = filters.validated_data
+        convert_to = options.pop('convert_to', None)
+        annotations = {'converted_amount': convert_expression('amount', convert_to)} if convert_to else None
+        transactions, next_cursor = account_history(id, annotations=annotations, **options)
+
+        serializer = AccountTransactionsSerializer({'next_cursor': next_cursor, 'results': transactions})
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        operation_id='Export Accounts',
+        summary='Download every account in the columnar JSON lines format, for offline analysis',
+        responses={
+            (200, 'application/x-ndjson'): OpenApiResponse(
+                response=OpenApiTypes.STR,
+                description=(
+                    'A header line describing the columns, then one line per chunk of rows with currency and status'
+                    ' dictionary encoded, amounts as integers scaled by 10 ** scale and timestamps as epoch microseconds'
+                )
+            )
+        }
+    )
+)
+
+class AccountExportApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'list'
+
+    # Export all
+    def get(self, request, *args, **kwargs):
+        """
+        Streams every account a chunk at a time, so the response is never held in memory
+        """
+        return columnar_json_response('accounts', ACCOUNT_COLUMNS, account_chunks())
+
+
+@extend_schema_view(
+    get=extend_schema(
+        operation_id='Search Accounts',
+        summary='Find accounts by name, best matches first',
+        parameters=[AccountSearchSerializer],
+        responses={
+            200: OpenApiResponse(
+                response=AccountSearchResultSerializer,
+                description=(
+                    'Returns up to limit accounts: names starting with q first, then names with a word starting with q,'
+                    ' then names containing q, then names close to q'
+                )
+            ),
+            400: OpenApiResponse(
+                response={'Invalid Search'},
+                examples=[
+                    OpenApiExample(
+                        'Missing query',
+                        description='No search text was given',
+                        value={'q': "['This field is required.']"}
+                    )
+                ]
+            )
+        }
+    )
+)
+
+class AccountSearchApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'detail'
+
+    # Search by name
+    def get(self, request, *args, **kwargs):
+        """
+        Finds the accounts whose names match the search text by prefix, substring or similarity
+        """
+        filters = AccountSearchSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        accounts = search_accounts(filters.validated_data['q'], filters.validated_data['limit'])
+        serializer = AccountSearchResultSerializer({'results': accounts})
+        return Response(serializer.data, status=status.HTTP_200_OK)
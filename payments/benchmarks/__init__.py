@@ -0,0 +1,26 @@
+"""
+Micro-benchmarks for the payments project. Run them from the payments directory, e.g.
+
+    python3 -m benchmarks.bench_currency
+"""
+import os
+import time
+
+
+def setup_django(settings_module='payments.settings'):
+    """Configure Django so the benchmarks can import the project modules"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+
+    import django
+    django.setup()
+
+
+def timed(func, *args, repeat=5):
+    """Run func several times and return the best wall-clock time in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+
+    return best
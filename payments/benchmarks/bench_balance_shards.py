@@ -0,0 +1,88 @@
+"""
+Benchmark posting throughput to a single hot account as the number of balance shards grows.
+
+Worker threads each post a delta to the hot account inside a transaction that stays open for HOLD_SECONDS
+after the balance update, standing in for the rest of the posting's work (the transaction update, the
+outbox and webhook rows). The row lock taken by the update is held for that time, so with one balance row
+the postings queue up behind each other, and with N shards up to N of them proceed at once.
+
+The benchmark runs against a throwaway test database created from DJANGO_SETTINGS_MODULE. Row locks need
+a database server such as PostgreSQL, so point it at settings using one to see the throughput scale.
+SQLite locks the whole database for every write, so on the default settings the throughput stays flat
+whatever the shard count, which is the ceiling the shards remove on a server database.
+"""
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from benchmarks import setup_django
+
+setup_django()
+
+from django.db import connection, connections, transaction
+
+from accounts_api.balances import post_balance_deltas, shard_account, total_balance
+from accounts_api.models import Account
+
+SHARD_COUNTS = [0, 2, 4, 8]
+WORKERS = 8
+POSTINGS_PER_WORKER = 50
+HOLD_SECONDS = 0.002
+
+
+def post(account_id, shard_count, barrier):
+    barrier.wait()
+    try:
+        for _ in range(POSTINGS_PER_WORKER):
+            with transaction.atomic():
+                post_balance_deltas({account_id: Decimal('1.00')}, {account_id: shard_count}, strategy='hash')
+                time.sleep(HOLD_SECONDS)
+    finally:
+        connections.close_all()
+
+
+def run(account_id, shard_count):
+    """Post from all workers at once, returning the postings per second"""
+    shard_account(account_id, shard_count)
+    barrier = threading.Barrier(WORKERS + 1)
+    workers = [threading.Thread(target=post, args=(account_id, shard_count, barrier)) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+
+    return WORKERS * POSTINGS_PER_WORKER / (time.perf_counter() - started)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        database_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            # A file rather than the in-memory default, so the worker threads share the database
+            connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'bench.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            account = Account.objects.create(account_name='Settlement Account', balance=0, currency='GBP')
+            print(f'{connection.vendor}: {WORKERS} workers, {POSTINGS_PER_WORKER} postings each, {HOLD_SECONDS * 1000:.0f} ms per transaction')
+
+            baseline = None
+            for shard_count in SHARD_COUNTS:
+                rate = run(account.id, shard_count)
+                baseline = baseline or rate
+                print(f'{shard_count or "no":>3} shards: {rate:>8.0f} postings/s  ({rate / baseline:.1f}x)')
+
+            account.refresh_from_db()
+            expected = Decimal(len(SHARD_COUNTS) * WORKERS * POSTINGS_PER_WORKER)
+            assert total_balance(account) == expected, f'balance {total_balance(account)} != {expected}'
+        finally:
+            connection.creation.destroy_test_db(database_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark the payload size and the render and parse throughput of a page of serialized transactions in
+the default JSON format against the compact JSON format, and MessagePack when msgpack is installed.
+Sizes are also given gzip compressed, as sent to clients that accept it.
+"""
+import gzip
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+
+from benchmarks import setup_django, timed
+
+setup_django()
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from payments.utils.utils_renderers import msgpack, CompactJSONParser, CompactJSONRenderer, MessagePackParser, MessagePackRenderer
+
+ROWS = 10_000
+
+
+def make_transactions():
+    """Rows shaped like TransactionSerializer output"""
+    rng = random.Random(42)
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            'transaction_guid': str(uuid.UUID(int=rng.getrandbits(128))),
+            'transaction_type': rng.choice(['CREDIT', 'DEBIT']),
+            'credit_from': rng.randrange(1, 1000),
+            'debit_to': rng.randrange(1, 1000),
+            'amount': f'{rng.randint(1, 10_000_000) / 100:.2f}',
+            'currency': rng.choice(['GBP', 'EUR', 'USD', 'CAD']),
+            'transaction_date': (started + timedelta(seconds=index * 37)).isoformat(),
+            'status': rng.choice(['CLEARED', 'UNCLEARED']),
+            'last_updated': (started + timedelta(seconds=index * 37 + 5)).isoformat(),
+            'version': 1
+        }
+        for index in range(ROWS)
+    ]
+
+
+def main():
+    transactions = make_transactions()
+    formats = [
+        ('json', JSONRenderer(), JSONParser()),
+        ('compact json', CompactJSONRenderer(), CompactJSONParser()),
+    ]
+    if msgpack is not None:
+        formats.append(('msgpack', MessagePackRenderer(), MessagePackParser()))
+    else:
+        print('msgpack is not installed, skipping MessagePack')
+
+    print(f'Rendering and parsing a list of {ROWS} transactions')
+    print(f'{"format":14} {"bytes":>10} {"gzipped":>10} {"render rows":>12} {"parse rows":>12}')
+    for name, renderer, parser in formats:
+        content = renderer.render(transactions)
+        render_seconds = timed(renderer.render, transactions)
+        parse_seconds = timed(lambda: parser.parse(BytesIO(content)))
+        print(
+            f'{name:14} {len(content):10} {len(gzip.compress(content, 6)):10} '
+            f'{ROWS / render_seconds:8.0f} /s {ROWS / parse_seconds:8.0f} /s'
+        )
+
+
+if __name__ == '__main__':
+    main()
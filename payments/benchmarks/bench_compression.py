@@ -0,0 +1,39 @@
+"""
+Benchmark the compression ratio and throughput of each available content coding and level on a rendered
+page of transactions, to choose COMPRESSION_LEVELS. Only gzip is measured unless brotli or zstandard is installed.
+"""
+from benchmarks import setup_django, timed
+
+setup_django()
+
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.bench_compact_format import make_transactions
+from payments.utils.utils_compression import compress_stream, ENCODINGS
+
+LEVELS = {'gzip': range(1, 10), 'br': range(0, 12), 'zstd': (1, 3, 6, 9, 12, 19)}
+
+CHUNK_SIZE = 64 * 1024
+
+
+def main():
+    content = JSONRenderer().render(make_transactions())
+    chunks = [content[start:start + CHUNK_SIZE] for start in range(0, len(content), CHUNK_SIZE)]
+    megabytes = len(content) / 1e6
+    print(f'Compressing {megabytes:.2f} MB of transactions JSON, whole and streamed in {CHUNK_SIZE // 1024} KiB chunks')
+    print(f'{"coding":8} {"level":>5} {"ratio":>7} {"MB/s":>8} {"streamed ratio":>15}')
+
+    for name, encoding_class in ENCODINGS.items():
+        for level in LEVELS[name]:
+            encoding = encoding_class(level)
+            compressed = encoding.compress(content)
+            seconds = timed(encoding.compress, content, repeat=3)
+            streamed = b''.join(compress_stream(encoding, chunks))
+            print(
+                f'{name:8} {level:5} {len(content) / len(compressed):7.1f} {megabytes / seconds:8.1f} '
+                f'{len(content) / len(streamed):15.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
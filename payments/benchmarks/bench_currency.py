@@ -0,0 +1,68 @@
+"""
+Benchmark validating a bulk batch of (currency, amount) pairs with the ISO 4217 registry,
+compared with the old length-only check and a linear scan of the code list.
+"""
+import random
+from decimal import Decimal
+
+from benchmarks import setup_django, timed
+
+setup_django()
+
+from rest_framework import serializers
+
+from payments.utils.utils_currency import ISO_4217_CODES, quantize_amount, InexactAmountError
+from payments.utils.utils_serializers import validate_currency
+
+BATCH_SIZE = 100_000
+
+CODE_LIST = sorted(ISO_4217_CODES)
+
+
+def make_batch():
+    rng = random.Random(42)
+    codes = CODE_LIST + ['ZZZ', 'ABC', 'JPAN']
+    return [(rng.choice(codes), Decimal(rng.randint(0, 10_000_000)) / 100) for _ in range(BATCH_SIZE)]
+
+
+def validate_length_only(batch):
+    return sum(1 for code, _ in batch if len(code) == 3)
+
+
+def validate_linear_scan(batch):
+    return sum(1 for code, _ in batch if code in CODE_LIST)
+
+
+def validate_registry_membership(batch):
+    return sum(1 for code, _ in batch if code in ISO_4217_CODES)
+
+
+def validate_registry(batch):
+    valid = 0
+    for code, amount in batch:
+        try:
+            validate_currency(code)
+            quantize_amount(amount, code, strict=True)
+        except (serializers.ValidationError, InexactAmountError):
+            continue
+        valid += 1
+
+    return valid
+
+
+def main():
+    batch = make_batch()
+    print(f'Validating a batch of {BATCH_SIZE} currency/amount pairs')
+
+    for name, func in [
+        ('length only (old check)', validate_length_only),
+        ('linear scan of code list', validate_linear_scan),
+        ('registry membership', validate_registry_membership),
+        ('validator + quantization', validate_registry),
+    ]:
+        seconds = timed(func, batch)
+        print(f'{name:28} {seconds * 1000:8.1f} ms  {seconds / BATCH_SIZE * 1e9:7.0f} ns/item')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark cold-start import time and per-request middleware overhead for the default
+settings (payments.settings) against the API-only profile (payments.settings_api).
+
+Each measurement runs in a fresh interpreter so the settings modules do not share imports.
+The per-request figure is an unauthenticated GET of the accounts list, which walks the whole
+middleware chain and DRF's authentication without touching the database.
+"""
+import json
+import subprocess
+import sys
+
+SETTINGS_MODULES = ['payments.settings', 'payments.settings_api']
+
+STARTUP_RUNS = 5
+REQUESTS = 2000
+
+STARTUP_SCRIPT = '''
+import json, os, time
+started = time.perf_counter()
+os.environ['DJANGO_SETTINGS_MODULE'] = {settings!r}
+import django
+django.setup()
+from django.conf import settings
+from django.utils.module_loading import import_module
+import_module(settings.ROOT_URLCONF)
+print(json.dumps(time.perf_counter() - started))
+'''
+
+REQUEST_SCRIPT = '''
+import json, os, time
+os.environ['DJANGO_SETTINGS_MODULE'] = {settings!r}
+import django
+django.setup()
+from django.test import Client
+client = Client(HTTP_HOST='localhost')
+client.get('/v1/accounts/api/')
+started = time.perf_counter()
+for _ in range({requests}):
+    client.get('/v1/accounts/api/')
+print(json.dumps((time.perf_counter() - started) / {requests}))
+'''
+
+
+def run(script):
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    print(f'{"settings":24} {"cold start":>12} {"per request":>12}')
+
+    for settings in SETTINGS_MODULES:
+        startup = min(run(STARTUP_SCRIPT.format(settings=settings)) for _ in range(STARTUP_RUNS))
+        per_request = run(REQUEST_SCRIPT.format(settings=settings, requests=REQUESTS))
+        print(f'{settings:24} {startup * 1000:9.1f} ms {per_request * 1e6:9.1f} us')
+
+
+if __name__ == '__main__':
+    main()
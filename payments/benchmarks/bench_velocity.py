@@ -0,0 +1,55 @@
+"""
+Benchmark checking and recording new transactions against velocity rules, with the windows kept in
+process memory and in a local memory cache, for a stream of transactions spread over many accounts.
+"""
+import random
+from decimal import Decimal
+
+from benchmarks import setup_django, timed
+
+setup_django()
+
+from django.conf import settings
+
+from transactions_api.velocity import VelocityChecker, VelocityRule, LocalWindowStore, CacheWindowStore, reset_velocity_windows
+
+TRANSACTIONS = 100_000
+ACCOUNTS = 1000
+
+RULES = [
+    VelocityRule('minute_debits', 60, max_count=1000),
+    VelocityRule('daily_amount', 86400, max_amount=10 ** 9, buckets=24),
+]
+
+
+def make_stream():
+    rng = random.Random(42)
+    return [
+        ({'credit_from': rng.randrange(ACCOUNTS), 'debit_to': rng.randrange(ACCOUNTS),
+          'amount': Decimal(rng.randint(1, 100_000)) / 100, 'currency': 'GBP'}, 1000 + index * 0.01)
+        for index in range(TRANSACTIONS)
+    ]
+
+
+def run(checker, stream):
+    reset_velocity_windows()
+    for data, now in stream:
+        if checker.check(data, now=now) is None:
+            checker.record(data, now=now)
+
+
+def main():
+    settings.CACHES['velocity'] = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'velocity-bench'}
+    stream = make_stream()
+    print(f'Checking and recording {TRANSACTIONS} transactions over {ACCOUNTS} accounts with {len(RULES)} rules')
+
+    for name, store in [
+        ('in process', LocalWindowStore()),
+        ('locmem cache', CacheWindowStore('velocity')),
+    ]:
+        seconds = timed(run, VelocityChecker(RULES, store), stream, repeat=3)
+        print(f'{name:14} {seconds * 1000:8.1f} ms  {seconds / TRANSACTIONS * 1e6:6.1f} us/transaction')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class FxApiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'fx_api'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,14 @@
+from django.db import models
+from django.utils import timezone
+
+class ExchangeRate(models.Model):
+    base_currency = models.CharField(max_length=3)
+    quote_currency = models.CharField(max_length=3)
+    rate = models.DecimalField(max_digits=19, decimal_places=8)
+    valid_from = models.DateTimeField(default=timezone.now)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['base_currency', 'quote_currency', 'valid_from'], name='fx_rate_pair_valid_from_idx')
+        ]
@@ -0,0 +1,133 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Value, When
+from django.utils import timezone
+
+from payments.utils.utils_currency import quantize_amount
+
+RATE_VERSION_CACHE_KEY = 'fx_api:rate-version'
+DEFAULT_RATE_CACHE_TTL = 300
+
+
+class MissingRateError(Exception):
+    """Raised when there is no exchange rate between some of the currencies and the target currency"""
+
+    def __init__(self, currencies, convert_to):
+        self.currencies = sorted(currencies)
+        self.convert_to = convert_to
+        super().__init__(f"No exchange rate from {', '.join(self.currencies)} to {convert_to}")
+
+
+class RateCache:
+    """
+    In-memory table of the latest exchange rates.
+
+    The table is tagged with a version token kept in the Django cache. Saving or deleting a rate
+    replaces the token, so every process sharing the cache backend reloads its table on the next
+    lookup. The table is also reloaded after FX_RATE_CACHE_TTL seconds to pick up future-dated rates.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0.0
+        self._rates = {}
+        self._factors = {}
+
+    def invalidate(self):
+        cache.set(RATE_VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+
+    def _current_version(self):
+        return cache.get_or_set(RATE_VERSION_CACHE_KEY, time.time_ns, timeout=None)
+
+    def _refresh(self):
+        """Reload the rate table if its version is stale, returning the table"""
+        version = self._current_version()
+        ttl = getattr(settings, 'FX_RATE_CACHE_TTL', DEFAULT_RATE_CACHE_TTL)
+        if version == self._version and time.monotonic() - self._loaded_at < ttl:
+            return self._rates
+
+        from .models import ExchangeRate
+
+        with self._lock:
+            rates = {}
+            # Ordered by valid_from so the latest rate for each pair wins
+            for base, quote, rate in (
+                ExchangeRate.objects.filter(valid_from__lte=timezone.now())
+                .order_by('valid_from', 'id')
+                .values_list('base_currency', 'quote_currency', 'rate')
+            ):
+                rates[(base, quote)] = rate
+                rates[(quote, base)] = Decimal(1) / rate
+
+            self._rates = rates
+            self._factors = {}
+            self._version = version
+            self._loaded_at = time.monotonic()
+
+        return rates
+
+    def get_rate(self, from_currency, to_currency):
+        """The multiplier converting from_currency into to_currency, or None when it is unknown"""
+        if from_currency == to_currency:
+            return Decimal(1)
+
+        rates = self._refresh()
+        if (from_currency, to_currency) in rates:
+            return rates[(from_currency, to_currency)]
+
+        # Cross rate through any currency quoted against both sides
+        for (base, pivot), rate in rates.items():
+            if base == from_currency and (pivot, to_currency) in rates:
+                return rate * rates[(pivot, to_currency)]
+
+        return None
+
+    def factors(self, convert_to):
+        """Map every currency with a known rate to its multiplier into convert_to"""
+        rates = self._refresh()
+        factors = self._factors.get(convert_to)
+        if factors is None:
+            currencies = {base for base, _ in rates} | {convert_to}
+            factors = {}
+            for currency in currencies:
+                rate = self.get_rate(currency, convert_to)
+                if rate is not None:
+                    factors[currency] = rate
+            self._factors[convert_to] = factors
+
+        return factors
+
+
+rate_cache = RateCache()
+
+
+def convert_expression(amount_field, convert_to, currency_field='currency'):
+    """
+    Build a SQL expression converting amount_field into convert_to using a CASE over the cached rates.
+    Rows in a currency without a rate convert to NULL.
+    """
+    factors = rate_cache.factors(convert_to)
+    factor = Case(
+        *[When(**{currency_field: currency}, then=Value(rate)) for currency, rate in factors.items()],
+        default=Value(None),
+        output_field=DecimalField(max_digits=30, decimal_places=12)
+    )
+    return ExpressionWrapper(F(amount_field) * factor, output_field=DecimalField(max_digits=19, decimal_places=2))
+
+
+def convert_totals(totals, convert_to):
+    """
+    Convert a mapping of currency to amount into convert_to, quantized to its minor units.
+    Raises MissingRateError if any of the currencies has no rate.
+    """
+    factors = rate_cache.factors(convert_to)
+    missing = set(totals) - set(factors)
+    if missing:
+        raise MissingRateError(missing, convert_to)
+
+    return {currency: quantize_amount(amount * factors[currency], convert_to) for currency, amount in totals.items()}
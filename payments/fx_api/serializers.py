@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+from .models import ExchangeRate
+from payments.utils.utils_serializers import validate_currency
+
+
+class ExchangeRateSerializer(serializers.ModelSerializer):
+    base_currency = serializers.CharField(validators=[validate_currency])
+    quote_currency = serializers.CharField(validators=[validate_currency])
+
+    class Meta:
+        model = ExchangeRate
+        fields = ["id", "base_currency", "quote_currency", "rate", "valid_from", "created_on"]
+        read_only_fields = ["id", "created_on"]
+
+    def validate(self, attrs):
+        """Check the rate converts between two different currencies and is positive"""
+        if attrs['base_currency'] == attrs['quote_currency']:
+            raise serializers.ValidationError('base_currency and quote_currency must be different')
+        if attrs['rate'] <= 0:
+            raise serializers.ValidationError({'rate': 'Rate must be positive'})
+
+        return attrs
+
+
+class CurrencyConversionSerializer(serializers.Serializer):
+    convert_to = serializers.CharField(required=False, validators=[validate_currency])
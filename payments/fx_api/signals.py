@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import ExchangeRate
+from .rates import rate_cache
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def invalidate_rate_cache(sender, **kwargs):
+    """Bump the shared rate version so every process reloads its rate table"""
+    rate_cache.invalidate()
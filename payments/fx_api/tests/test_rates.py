@@ -0,0 +1,50 @@
+from decimal import Decimal
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from fx_api.models import ExchangeRate
+from fx_api.rates import rate_cache, convert_totals, MissingRateError
+
+
+class RateCacheTest(TestCase):
+    def setUp(self):
+        rate_cache.invalidate()
+        ExchangeRate.objects.create(base_currency='GBP', quote_currency='USD', rate='1.25')
+        ExchangeRate.objects.create(base_currency='GBP', quote_currency='EUR', rate='1.20')
+
+    def test_direct_and_inverse_rates(self):
+        "Testing rates are available in both directions"
+        self.assertEqual(rate_cache.get_rate('GBP', 'USD'), Decimal('1.25'))
+        self.assertEqual(rate_cache.get_rate('USD', 'GBP'), Decimal(1) / Decimal('1.25'))
+        self.assertEqual(rate_cache.get_rate('GBP', 'GBP'), Decimal(1))
+
+    def test_cross_rate(self):
+        "Testing a rate is derived through a currency quoted against both sides"
+        self.assertEqual(rate_cache.get_rate('USD', 'EUR'), (Decimal(1) / Decimal('1.25')) * Decimal('1.20'))
+        self.assertIsNone(rate_cache.get_rate('USD', 'JPY'))
+
+    def test_new_rate_invalidates_cache(self):
+        "Testing saving a rate replaces the cached rate for the pair"
+        self.assertEqual(rate_cache.get_rate('GBP', 'USD'), Decimal('1.25'))
+
+        ExchangeRate.objects.create(base_currency='GBP', quote_currency='USD', rate='1.30')
+
+        self.assertEqual(rate_cache.get_rate('GBP', 'USD'), Decimal('1.30'))
+
+    def test_future_rate_is_not_used(self):
+        "Testing a rate is only used from its valid_from date"
+        ExchangeRate.objects.create(base_currency='GBP', quote_currency='USD', rate='2.00', valid_from=timezone.now() + timedelta(days=1))
+
+        self.assertEqual(rate_cache.get_rate('GBP', 'USD'), Decimal('1.25'))
+
+    def test_convert_totals(self):
+        "Testing currency totals are converted and missing rates are reported"
+        converted = convert_totals({'USD': Decimal('125.00'), 'GBP': Decimal('10.00')}, 'GBP')
+
+        self.assertEqual(converted['USD'], Decimal('100.00'))
+        self.assertEqual(converted['GBP'], Decimal('10.00'))
+
+        with self.assertRaises(MissingRateError):
+            convert_totals({'JPY': Decimal('100')}, 'GBP')
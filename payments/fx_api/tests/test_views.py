@@ -0,0 +1,115 @@
+from django.urls import reverse
+from rest_framework import status
+
+from fx_api.models import ExchangeRate
+from fx_api.rates import rate_cache
+from transactions_api.models import Transaction
+from payments.utils.utils_test import BaseAPITestCase, validate_response_headers
+
+
+class FxBaseAPITestCase(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        rate_cache.invalidate()
+        ExchangeRate.objects.create(base_currency='USD', quote_currency='CAD', rate='1.25')
+        ExchangeRate.objects.create(base_currency='GBP', quote_currency='USD', rate='1.50')
+
+
+class TestExchangeRateListView(FxBaseAPITestCase):
+
+    def test_lists_all_exchange_rates(self):
+        """Tests GET request to retrieve all exchange rates is successful"""
+
+        response = self.client.get(reverse('fx-rates-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        validate_response_headers(response)
+
+
+    def test_create_exchange_rate_successful(self):
+        """Tests POST request creates an exchange rate"""
+
+        response = self.client.post(reverse('fx-rates-list'), data={'base_currency': 'EUR', 'quote_currency': 'USD', 'rate': '1.08'})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ExchangeRate.objects.count(), 3)
+
+
+    def test_create_exchange_rate_unsuccessful_invalid_rate(self):
+        """Tests POST request is unsuccessful for a non-positive rate or the same currency on both sides"""
+
+        response = self.client.post(reverse('fx-rates-list'), data={'base_currency': 'EUR', 'quote_currency': 'USD', 'rate': '0'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(reverse('fx-rates-list'), data={'base_currency': 'EUR', 'quote_currency': 'EUR', 'rate': '1'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ExchangeRate.objects.count(), 2)
+
+
+class TestConvertedAmounts(FxBaseAPITestCase):
+
+    def test_accounts_list_converted_balance(self):
+        """Tests GET request with convert_to returns the balances converted in SQL"""
+
+        response = self.client.get(reverse('accounts-list'), {'convert_to': 'USD'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        balances = {item['account_name']: item['converted_balance'] for item in response.data}
+
+        self.assertEqual(balances, {'Test Account 1': '96000.00', 'Test Account 2': '180000.00'})
+
+
+    def test_accounts_list_without_convert_to(self):
+        """Tests GET request without convert_to does not include converted balances"""
+
+        response = self.client.get(reverse('accounts-list'))
+
+        self.assertNotIn('converted_balance', response.data[0])
+
+
+    def test_transactions_list_converted_amount_missing_rate(self):
+        """Tests transactions in a currency without a rate have a null converted amount"""
+
+        Transaction.objects.create(credit_from=self.test_account_one, debit_to=self.test_account_two, amount=125.00, currency='CAD')
+        Transaction.objects.create(credit_from=self.test_account_one, debit_to=self.test_account_two, amount=10.00, currency='JPY')
+
+        response = self.client.get(reverse('transactions-list'), {'convert_to': 'USD'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['converted_amount'] for item in response.data], ['100.00', None])
+
+
+    def test_transaction_totals_converted(self):
+        """Tests the totals endpoint aggregates per currency and converts the grand total"""
+
+        Transaction.objects.create(credit_from=self.test_account_one, debit_to=self.test_account_two, amount=125.00, currency='CAD')
+        Transaction.objects.create(credit_from=self.test_account_one, debit_to=self.test_account_two, amount=25.00, currency='CAD')
+        Transaction.objects.create(credit_from=self.test_account_one, debit_to=self.test_account_two, amount=10.00, currency='GBP')
+
+        response = self.client.get(reverse('transactions-totals'), {'convert_to': 'USD'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['converted_total'], '135.00')
+        self.assertEqual(
+            [(item['currency'], item['count'], item['amount'], item['converted_amount']) for item in response.data['totals']],
+            [('CAD', 2, '150.00', '120.00'), ('GBP', 1, '10.00', '15.00')]
+        )
+
+
+    def test_transaction_totals_missing_rate(self):
+        """Tests the totals endpoint is unsuccessful when a currency cannot be converted"""
+
+        Transaction.objects.create(credit_from=self.test_account_one, debit_to=self.test_account_two, amount=10.00, currency='JPY')
+
+        response = self.client.get(reverse('transactions-totals'), {'convert_to': 'USD'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse('transactions-totals'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('converted_total', response.data)
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import (
+    ExchangeRateListApiView
+)
+
+urlpatterns = [
+    path('api/', ExchangeRateListApiView.as_view(), name='fx-rates-list')
+]
@@ -0,0 +1,60 @@
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .models import ExchangeRate
+from .serializers import ExchangeRateSerializer
+
+# Create your views here.
+@extend_schema_view(
+    get=extend_schema(
+        operation_id='Get All Exchange Rates',
+        summary='Get a list of all exchange rates',
+        responses={
+            200: OpenApiResponse(
+                response=ExchangeRateSerializer(many=True),
+                description='Returns a list of exchange rates'
+            )
+        }
+    ),
+    post=extend_schema(
+        operation_id='Create an Exchange Rate',
+        summary='Create one exchange rate',
+        responses={
+            201: OpenApiResponse(
+                response=ExchangeRateSerializer,
+                description='Creates an exchange rate'
+            )
+        }
+    )
+)
+
+class ExchangeRateListApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = {'GET': 'list', 'POST': 'detail'}
+
+    # List all exchange rates
+    def get(self, request, *args, **kwargs):
+        """
+        List all the exchange rates
+        """
+        rates = ExchangeRate.objects.order_by('base_currency', 'quote_currency', 'valid_from')
+        serializer = ExchangeRateSerializer(rates, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    # Create an exchange rate
+    def post(self, request, *args, **kwargs):
+        """
+        Create an exchange rate, which replaces the previous rate for the pair from its valid_from date
+        """
+        serializer = ExchangeRateSerializer(data=request.data)
+
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
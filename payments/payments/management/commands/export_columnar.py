@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts_api.export import ACCOUNT_COLUMNS, account_chunks
+from payments.utils.utils_columnar import pyarrow, write_columnar_json, write_parquet, DEFAULT_CHUNK_SIZE
+from transactions_api.export import TRANSACTION_COLUMNS, transaction_chunks
+
+TABLES = {
+    'accounts': (ACCOUNT_COLUMNS, account_chunks),
+    'transactions': (TRANSACTION_COLUMNS, transaction_chunks),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Exports accounts or transactions in a columnar format for offline analysis: Parquet when pyarrow is '
+        'installed, otherwise columnar JSON lines'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=sorted(TABLES), help='Table to export')
+        parser.add_argument('output', help='File to write, gzip compressed if it ends in .gz when writing JSON lines')
+        parser.add_argument('--format', choices=['auto', 'parquet', 'jsonl'], default='auto', help='Output format, auto picks Parquet when pyarrow is installed')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows read and encoded at a time')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        output_format = options['format']
+        if output_format == 'auto':
+            output_format = 'parquet' if pyarrow is not None else 'jsonl'
+        if output_format == 'parquet' and pyarrow is None:
+            raise CommandError('Writing Parquet needs pyarrow, install it or use --format jsonl')
+
+        columns, chunks = TABLES[options['table']]
+        write = write_parquet if output_format == 'parquet' else write_columnar_json
+        rows = write(options['output'], options['table'], columns, chunks(options['chunk_size']))
+
+        self.stdout.write(f"Exported {rows} {options['table']} to {options['output']} as {output_format}")
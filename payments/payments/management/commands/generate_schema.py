@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.schema import code_version, generate_schema, write_schema
+
+
+class Command(BaseCommand):
+    help = 'Generates the OpenAPI schema ahead of time so /docs/schema/ serves it without introspecting the views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=None, help='Where to write the schema (defaults to OPENAPI_SCHEMA_PATH)')
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.OPENAPI_SCHEMA_PATH
+        version = code_version()
+        write_schema(generate_schema(), version, path=path)
+        self.stdout.write(f'Wrote the OpenAPI schema for code version {version} to {path}')
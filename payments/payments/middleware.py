@@ -0,0 +1,117 @@
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from payments.utils.utils_compression import choose_encoding, compress_async_stream, compress_stream, DEFAULT_MIN_SIZE
+from payments.utils.utils_metrics import registry
+
+REQUESTS = registry.counter('payments_http_requests_total', 'HTTP requests handled, by method and status code', ['method', 'status'])
+REQUEST_DURATION = registry.summary('payments_http_request_duration_seconds', 'Time spent handling HTTP requests, by method', ['method'])
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Other methods are reported as OTHER to keep the number of label values bounded
+KNOWN_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+def healthz(request):
+    """Liveness probe: the process is up and serving requests"""
+    return HttpResponse('ok', content_type='text/plain')
+
+
+def readyz(request):
+    """Readiness probe: the process can reach the database"""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Exception:
+        return HttpResponse('database unavailable', content_type='text/plain', status=503)
+
+    return HttpResponse('ok', content_type='text/plain')
+
+
+def metrics(request):
+    """The process metrics in the Prometheus text format"""
+    return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+PROBES = {
+    '/healthz': healthz,
+    '/readyz': readyz,
+    '/metrics': metrics,
+}
+
+
+class HealthCheckMiddleware:
+    """
+    Answers the probe and metrics endpoints before the rest of the middleware stack runs,
+    so load balancer checks skip sessions, CSRF, authentication and messages.
+    Must be first in MIDDLEWARE. Every other request is counted and timed for /metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        probe = PROBES.get(request.path_info.rstrip('/'))
+        if probe is not None:
+            return probe(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+
+        method = request.method if request.method in KNOWN_METHODS else 'OTHER'
+        REQUESTS.inc(method=method, status=response.status_code)
+        REQUEST_DURATION.observe(time.perf_counter() - started, method=method)
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best coding the client accepts: br or zstd when their optional packages are
+    installed, otherwise gzip, at the levels in COMPRESSION_LEVELS. Responses shorter than COMPRESSION_MIN_SIZE
+    bytes are sent as they are, while streamed responses such as the exports are always compressed, chunk by chunk.
+    Django's GZipMiddleware pads responses against BREACH, which needs the browser to attach credentials to
+    requests an attacker makes; the API only takes JWTs sent explicitly in the Authorization header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_stream(encoding, response.streaming_content)
+            else:
+                response.streaming_content = compress_stream(encoding, response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed = encoding.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The compressed bytes differ from the uncompressed ones, so the tag can only be weak.
+        # If-Match accepts either form, see payments.utils.utils_concurrency
+        etag = response.headers.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+
+        response.headers['Content-Encoding'] = encoding.name
+        return response
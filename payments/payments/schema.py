@@ -0,0 +1,157 @@
+import hashlib
+import json
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from drf_spectacular.openapi import AutoSchema
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+from payments.utils.utils_schema import DeferredAutoSchema
+
+# The OpenAPI schema is generated once per code version, either at build time by the generate_schema
+# command or on the first request, and kept on disk at OPENAPI_SCHEMA_PATH and in memory.
+# The code version is SCHEMA_CODE_VERSION when it is set (e.g. to the git commit at build time),
+# otherwise a hash of the project's Python sources, URL configuration and SPECTACULAR_SETTINGS.
+
+_lock = threading.Lock()
+_cache = {'version': None, 'schema': None, 'rendered': {}}
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """Identify the code the schema is generated from"""
+    configured = getattr(settings, 'SCHEMA_CODE_VERSION', None)
+    if configured:
+        return str(configured)
+
+    digest = hashlib.sha256(repr((settings.ROOT_URLCONF, sorted(settings.SPECTACULAR_SETTINGS.items()))).encode())
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for app_config in apps.get_app_configs():
+        app_path = Path(app_config.path).resolve()
+        if base_dir not in app_path.parents:
+            continue
+        for source in sorted(app_path.rglob('*.py')):
+            if 'tests' in source.parts or 'migrations' in source.parts:
+                continue
+            digest.update(str(source.relative_to(base_dir)).encode())
+            digest.update(source.read_bytes())
+
+    for source in sorted((base_dir / 'payments').glob('urls*.py')):
+        digest.update(source.read_bytes())
+
+    return digest.hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def spectacular_schema_class(schema_class):
+    """
+    The schema class rebased from DeferredAutoSchema onto drf_spectacular's AutoSchema, keeping the classes
+    extend_schema built on top of it, as drf_spectacular rearranges schemas set on a view
+    """
+    extensions = tuple(cls for cls in schema_class.__mro__ if cls not in DeferredAutoSchema.__mro__)
+    if not extensions:
+        return AutoSchema
+
+    return type(schema_class.__name__, extensions + AutoSchema.__mro__, {})
+
+
+class SchemaGenerator(spectacular_settings.DEFAULT_GENERATOR_CLASS):
+    """
+    Generates the schema with drf_spectacular's AutoSchema under the API profile too, whose
+    DEFAULT_SCHEMA_CLASS is payments.utils.utils_schema.DeferredAutoSchema, without changing the setting
+    """
+
+    def create_view(self, callback, method, request=None):
+        view = super().create_view(callback, method, request)
+        schema_class = type(view.schema)
+        if not issubclass(schema_class, AutoSchema):
+            view.schema = spectacular_schema_class(schema_class)()
+        return view
+
+
+def generate_schema():
+    """Introspect the views and build the schema"""
+    generator = SchemaGenerator(urlconf=spectacular_settings.SERVE_URLCONF)
+    return generator.get_schema(request=None, public=True)
+
+
+def write_schema(schema, version, path=None):
+    """Store the schema and the code version it was generated from"""
+    path = Path(path or settings.OPENAPI_SCHEMA_PATH)
+    path.write_text(json.dumps({'code_version': version, 'schema': schema}))
+
+
+def read_schema(version, path=None):
+    """Read the stored schema, or None when it is missing or was generated from other code"""
+    try:
+        stored = json.loads(Path(path or settings.OPENAPI_SCHEMA_PATH).read_text())
+    except (OSError, ValueError):
+        return None
+
+    return stored['schema'] if stored.get('code_version') == version else None
+
+
+def load_schema():
+    """Return (version, schema) from memory, then disk, generating it only for a new code version"""
+    version = code_version()
+    if _cache['version'] == version:
+        return version, _cache['schema']
+
+    with _lock:
+        if _cache['version'] != version:
+            schema = read_schema(version)
+            if schema is None:
+                schema = generate_schema()
+                try:
+                    write_schema(schema, version)
+                except OSError:
+                    pass
+            _cache.update(version=version, schema=schema, rendered={})
+
+    return version, _cache['schema']
+
+
+def clear_schema_cache():
+    """Forget the in-memory schema so it is loaded again"""
+    _cache.update(version=None, schema=None, rendered={})
+    code_version.cache_clear()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    Serves the pre-generated schema with an ETag, answering If-None-Match with 304.
+    Requests for a specific API version or language fall back to generating the schema.
+    """
+
+    schema = AutoSchema()
+    generator_class = SchemaGenerator
+
+    def _get_schema_response(self, request):
+        if self.api_version or request.version or self._get_version_parameter(request) or request.GET.get('lang'):
+            return super()._get_schema_response(request)
+
+        version, schema = load_schema()
+        renderer = request.accepted_renderer
+        etag = f'"{version}-{renderer.format}"'
+
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            key = (renderer.media_type, renderer.format)
+            body = _cache['rendered'].get(key)
+            if body is None:
+                body = renderer.render(schema, renderer_context={'request': request, 'view': self})
+                _cache['rendered'][key] = body
+
+            response = HttpResponse(body, content_type=f'{renderer.media_type}; charset={renderer.charset}')
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Accept'])
+        return response
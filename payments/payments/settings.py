@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import importlib.util
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -40,13 +42,19 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'djoser',
+    'payments',
     'transactions_api',
     'accounts_api',
+    'fx_api',
+    'webhooks_api',
+    'tasks_api',
     'drf_spectacular',
     'coverage'
 ]
 
 MIDDLEWARE = [
+    'payments.middleware.HealthCheckMiddleware',
+    'payments.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -129,11 +137,37 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Compact representations for internal services, see payments.utils.utils_renderers.
+# The MessagePack ones are only offered when msgpack is installed
+COMPACT_RENDERER_CLASSES = ['payments.utils.utils_renderers.CompactJSONRenderer']
+COMPACT_PARSER_CLASSES = ['payments.utils.utils_renderers.CompactJSONParser']
+if importlib.util.find_spec('msgpack'):
+    COMPACT_RENDERER_CLASSES.append('payments.utils.utils_renderers.MessagePackRenderer')
+    COMPACT_PARSER_CLASSES.append('payments.utils.utils_renderers.MessagePackParser')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        *COMPACT_RENDERER_CLASSES,
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        *COMPACT_PARSER_CLASSES,
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_THROTTLE_CLASSES': [
+        'payments.utils.utils_throttling.TokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'list': '60/min',
+        'detail': '600/min',
+    },
     'TEST_REQUEST_DEFAULT_FORMAT': 'json'
 }
 
@@ -160,4 +194,64 @@ SPECTACULAR_SETTINGS = {
     "SWAGGER_UI_SETTINGS": {
         'displayOperationId': True
     }
-}
\ No newline at end of file
+}
+
+# Cleared transactions older than this are moved to the archive table by the archive_transactions command
+TRANSACTION_ARCHIVE_AFTER_DAYS = 365
+
+# Seconds before the in-memory exchange rate table is reloaded, even if no rate has changed
+FX_RATE_CACHE_TTL = 300
+
+# Cache alias used to share the throttle buckets between processes, None keeps them in-process
+THROTTLE_CACHE_ALIAS = None
+
+# Pre-generated OpenAPI schema written by the generate_schema command and served from /docs/schema/
+OPENAPI_SCHEMA_PATH = BASE_DIR / 'openapi-schema.json'
+
+# Code version the schema is tagged with, e.g. the git commit set at build time. None hashes the sources instead
+SCHEMA_CODE_VERSION = os.environ.get('PAYMENTS_SCHEMA_CODE_VERSION')
+
+# Where the relay_outbox command delivers transaction events: a sink class and its options.
+# transactions_api.outbox also provides LocalQueueSink and HttpSink (OPTIONS: url, timeout, headers)
+OUTBOX_SINK = {
+    'CLASS': 'transactions_api.outbox.FileSink',
+    'OPTIONS': {'path': BASE_DIR / 'outbox-events.jsonl'},
+}
+
+# Webhook deliveries are retried with exponential backoff and full jitter, from WEBHOOK_BACKOFF_BASE seconds
+# up to WEBHOOK_BACKOFF_MAX seconds between attempts, and marked FAILED after WEBHOOK_MAX_ATTEMPTS
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_BACKOFF_BASE = 2
+WEBHOOK_BACKOFF_MAX = 3600
+WEBHOOK_TIMEOUT = 10
+
+# How postings to a sharded account pick a balance shard: 'hash' pins each worker to a shard, 'round_robin' rotates
+BALANCE_SHARD_STRATEGY = 'hash'
+
+# Progress of the reconcile command, so an interrupted run resumes from the last partition it finished
+RECONCILE_CHECKPOINT_PATH = BASE_DIR / 'reconcile-checkpoint.json'
+
+# Seconds the refresh_summaries watermark trails the start of each refresh, to catch transactions committed late
+SUMMARY_REFRESH_LAG = 60
+
+# Limits on the transactions created against an account within a sliding window, checked in memory before each
+# POST to the transactions list, e.g.
+# {'name': 'daily_debits', 'window': 86400, 'max_count': 50, 'max_amount': 10000, 'account': 'credit_from', 'currency': 'GBP'}
+VELOCITY_RULES = []
+
+# Cache alias holding the velocity windows so they are shared between processes. None keeps them in each process
+VELOCITY_CACHE_ALIAS = None
+
+# Tasks queued with tasks_api.queue.enqueue are retried with exponential backoff and full jitter, from
+# TASK_BACKOFF_BASE seconds up to TASK_BACKOFF_MAX seconds between attempts, and marked FAILED after TASK_MAX_ATTEMPTS.
+# A claimed task is hidden from other workers for TASK_VISIBILITY_TIMEOUT seconds, renewed while it runs
+TASK_MAX_ATTEMPTS = 5
+TASK_BACKOFF_BASE = 2
+TASK_BACKOFF_MAX = 600
+TASK_VISIBILITY_TIMEOUT = 300
+
+# Responses shorter than this many bytes are not compressed by payments.middleware.CompressionMiddleware
+COMPRESSION_MIN_SIZE = 1024
+
+# Compression level per content coding; br and zstd are only used when brotli or zstandard is installed
+COMPRESSION_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 4}
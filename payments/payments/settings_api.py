@@ -0,0 +1,63 @@
+"""
+Production settings for serving the payments project as a JWT-only JSON API.
+
+Select with DJANGO_SETTINGS_MODULE=payments.settings_api. Compared with payments.settings this
+drops the admin, sessions, messages, static files and coverage apps, runs a minimal middleware
+chain and renders JSON only. drf_spectacular's schema generator and views are imported by the first
+request for the schema; only its lightweight extend_schema decorators are loaded with the views.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import REST_FRAMEWORK, COMPACT_RENDERER_CLASSES
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get('PAYMENTS_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'rest_framework',
+    'djoser',
+    'payments',
+    'transactions_api',
+    'accounts_api',
+    'fx_api',
+    'webhooks_api',
+    'tasks_api',
+]
+
+# Sessions, CSRF, messages and clickjacking protection only matter for browser sessions,
+# and authentication is done per view by JWTAuthentication
+MIDDLEWARE = [
+    'payments.middleware.HealthCheckMiddleware',
+    'payments.middleware.CompressionMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'payments.urls_api'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        *COMPACT_RENDERER_CLASSES,
+    ],
+    # Keeps drf_spectacular.openapi out of the views' import, see payments.utils.utils_schema
+    'DEFAULT_SCHEMA_CLASS': 'payments.utils.utils_schema.DeferredAutoSchema',
+}
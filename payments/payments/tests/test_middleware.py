@@ -0,0 +1,136 @@
+import gzip
+import json
+import zlib
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from accounts_api.models import Account
+from payments.utils.utils_columnar import read_columnar_json
+from payments.utils.utils_compression import choose_encoding, compress_stream, GzipEncoding, ENCODINGS
+from payments.utils.utils_metrics import MetricsRegistry
+from payments.utils.utils_test import BaseAPITestCase
+
+
+class HealthCheckMiddlewareTest(TestCase):
+    def test_healthz(self):
+        "Testing the liveness probe answers without authentication or the rest of the middleware"
+        response = self.client.get('/healthz')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b'ok')
+        self.assertNotIn('X-Frame-Options', response.headers)
+
+    def test_readyz_pings_database(self):
+        "Testing the readiness probe queries the database"
+        with self.assertNumQueries(1):
+            response = self.client.get('/readyz/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_metrics_counts_requests(self):
+        "Testing the metrics endpoint reports the requests handled in the Prometheus text format"
+        self.client.get(reverse('accounts-list'))
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE payments_http_requests_total counter', response.content.decode())
+        self.assertIn('payments_http_requests_total{method="GET",status="401"}', response.content.decode())
+
+
+class MetricsRegistryTest(SimpleTestCase):
+    def test_render(self):
+        "Testing counters, summaries and gauges are rendered in the Prometheus text format"
+        registry = MetricsRegistry()
+        counter = registry.counter('jobs_total', 'Jobs run', ['queue'])
+        summary = registry.summary('job_seconds', 'Job duration')
+        registry.gauge('workers', 'Running workers', lambda: 3)
+
+        counter.inc(queue='default')
+        counter.inc(2, queue='default')
+        summary.observe(0.5)
+
+        rendered = registry.render()
+
+        self.assertIn('# TYPE jobs_total counter\njobs_total{queue="default"} 3\n', rendered)
+        self.assertIn('job_seconds_count 1\njob_seconds_sum 0.5\n', rendered)
+        self.assertIn('# TYPE workers gauge\nworkers 3\n', rendered)
+
+
+class CompressionMiddlewareTest(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        Account.objects.bulk_create([
+            Account(account_name=f'Account {number}', status=Account.Status.ACTIVE, balance=100, currency='GBP') for number in range(20)
+        ])
+
+    def test_compresses_large_responses(self):
+        "Testing responses over the size threshold are gzip compressed for clients accepting gzip"
+        plain = self.client.get(reverse('accounts-list'))
+        response = self.client.get(reverse('accounts-list'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(int(response.headers['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertNotIn('Content-Encoding', plain.headers)
+
+    def test_small_responses_not_compressed(self):
+        "Testing responses under COMPRESSION_MIN_SIZE are sent as they are"
+        response = self.client.get(reverse('accounts-detail', args=[self.test_account_one.id]), HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.headers['ETag'], '"1"')
+
+    @override_settings(COMPRESSION_MIN_SIZE=0)
+    def test_weakens_etag(self):
+        "Testing the ETag of a compressed response is made weak, and still accepted by If-Match"
+        url = reverse('accounts-detail', args=[self.test_account_one.id])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.headers['ETag'], 'W/"1"')
+        response = self.client.patch(url, data={'status': 'INACTIVE'}, HTTP_IF_MATCH=response.headers['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_compresses_streaming_export(self):
+        "Testing streamed exports are compressed chunk by chunk"
+        response = self.client.get(reverse('accounts-export'), HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response.headers)
+        content = gzip.decompress(b''.join(response.streaming_content)).decode()
+        meta, chunks = read_columnar_json(content.splitlines())
+        self.assertEqual(meta['table'], 'accounts')
+        self.assertEqual(len(next(chunks)['balance']), 22)
+
+
+class ChooseEncodingTest(SimpleTestCase):
+    def test_negotiation(self):
+        "Testing the coding is chosen by the client's q-values, and refused codings are not used"
+        self.assertEqual(choose_encoding('gzip').name, 'gzip')
+        self.assertEqual(choose_encoding('deflate, GZIP;q=0.5').name, 'gzip')
+        self.assertEqual(choose_encoding('br, gzip;q=0.8').name, 'br' if 'br' in ENCODINGS else 'gzip')
+        self.assertIn(choose_encoding('*').name, ENCODINGS)
+        self.assertIsNone(choose_encoding(''))
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+        self.assertIsNone(choose_encoding('*;q=0'))
+
+    @override_settings(COMPRESSION_LEVELS={'gzip': 9})
+    def test_levels_from_settings(self):
+        "Testing the compression level comes from COMPRESSION_LEVELS"
+        self.assertEqual(choose_encoding('gzip').level, 9)
+
+    def test_stream_decodes_per_chunk(self):
+        "Testing each streamed chunk can be decoded as soon as it arrives"
+        chunks = [json.dumps({'chunk': number}).encode() for number in range(3)]
+        decompressor = zlib.decompressobj(31)
+
+        decoded = [decompressor.decompress(data) for data in compress_stream(GzipEncoding(4), chunks)]
+
+        self.assertEqual(decoded[:3], chunks)
+        self.assertEqual(b''.join(decoded), b''.join(chunks))
@@ -0,0 +1,65 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from payments.schema import clear_schema_cache, write_schema
+
+STORED_SCHEMA = {'openapi': '3.0.3', 'info': {'title': 'Stored schema', 'version': '1.0.0'}, 'paths': {}}
+
+
+class CachedSchemaViewTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.schema_path = Path(self.tmp_dir.name) / 'openapi-schema.json'
+        self.settings_override = override_settings(OPENAPI_SCHEMA_PATH=self.schema_path, SCHEMA_CODE_VERSION='test-build')
+        self.settings_override.enable()
+        clear_schema_cache()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        clear_schema_cache()
+        self.tmp_dir.cleanup()
+
+    def test_serves_stored_schema(self):
+        "Testing the schema generated for the current code version is served from disk"
+        write_schema(STORED_SCHEMA, 'test-build', path=self.schema_path)
+
+        response = self.client.get(reverse('schema'), HTTP_ACCEPT='application/vnd.oai.openapi+json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), STORED_SCHEMA)
+        self.assertEqual(response['ETag'], '"test-build-json"')
+
+    def test_regenerates_schema_for_new_code_version(self):
+        "Testing a schema stored for another code version is regenerated and written back"
+        write_schema(STORED_SCHEMA, 'old-build', path=self.schema_path)
+
+        response = self.client.get(reverse('schema'), HTTP_ACCEPT='application/vnd.oai.openapi+json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('/v1/accounts/api/', json.loads(response.content)['paths'])
+        self.assertEqual(json.loads(self.schema_path.read_text())['code_version'], 'test-build')
+
+    def test_not_modified_with_matching_etag(self):
+        "Testing a client holding the current ETag gets 304 without a body"
+        write_schema(STORED_SCHEMA, 'test-build', path=self.schema_path)
+        etag = self.client.get(reverse('schema'))['ETag']
+
+        response = self.client.get(reverse('schema'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_generate_schema_command(self):
+        "Testing the command writes the schema tagged with the code version"
+        call_command('generate_schema', stdout=StringIO())
+
+        stored = json.loads(self.schema_path.read_text())
+        self.assertEqual(stored['code_version'], 'test-build')
+        self.assertIn('/v1/transactions/api/', stored['schema']['paths'])
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from payments import settings_api
+
+
+class ApiSettingsTest(SimpleTestCase):
+    def test_minimal_middleware(self):
+        "Testing the API profile skips the session, CSRF, message and clickjacking middleware"
+        self.assertEqual(settings_api.MIDDLEWARE[0], 'payments.middleware.HealthCheckMiddleware')
+
+        for middleware in (
+            'django.contrib.sessions.middleware.SessionMiddleware',
+            'django.middleware.csrf.CsrfViewMiddleware',
+            'django.contrib.messages.middleware.MessageMiddleware',
+            'django.middleware.clickjacking.XFrameOptionsMiddleware',
+        ):
+            self.assertNotIn(middleware, settings_api.MIDDLEWARE)
+
+    def test_minimal_apps(self):
+        "Testing the API profile drops the admin, browser and development apps"
+        for app in ('django.contrib.admin', 'django.contrib.sessions', 'django.contrib.messages', 'coverage', 'drf_spectacular'):
+            self.assertNotIn(app, settings_api.INSTALLED_APPS)
+
+        self.assertFalse(settings_api.DEBUG)
+        self.assertEqual(
+            settings_api.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'], ['rest_framework.renderers.JSONRenderer', *settings_api.COMPACT_RENDERER_CLASSES]
+        )
+
+    def test_urlconf_does_not_import_schema_generator(self):
+        "Testing importing the API URLconf leaves drf_spectacular's schema generator unimported until the schema is generated, without changing DEFAULT_SCHEMA_CLASS"
+        script = (
+            'import sys, django; django.setup(); import payments.urls_api; '
+            'print("drf_spectacular.openapi" in sys.modules); '
+            'from payments.schema import generate_schema; '
+            'print("/v1/transactions/api/" in generate_schema()["paths"]); '
+            'from rest_framework.settings import api_settings; '
+            'print(api_settings.DEFAULT_SCHEMA_CLASS.__name__)'
+        )
+
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'payments.settings_api'}
+        )
+
+        # Generating the schema leaves the process-wide setting alone
+        self.assertEqual(result.stdout.split(), ['False', 'True', 'DeferredAutoSchema'])
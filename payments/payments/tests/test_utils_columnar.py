@@ -0,0 +1,114 @@
+import gzip
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from accounts_api.models import Account
+from payments.utils.utils_columnar import (
+    Column, columnar_json_lines, encode_chunk, pyarrow, queryset_chunks, read_columnar_json, DECIMAL, DICTIONARY, INT, STRING, TIMESTAMP
+)
+from transactions_api.models import Transaction
+
+COLUMNS = [
+    Column('id', INT), Column('name', STRING), Column('currency', DICTIONARY),
+    Column('amount', DECIMAL, scale=2), Column('created_on', TIMESTAMP)
+]
+
+
+class ColumnarEncodingTest(TestCase):
+
+    def test_encodes_columns(self):
+        "Testing categorical columns are dictionary encoded, decimals scaled and timestamps in epoch microseconds"
+        rows = [
+            (1, 'a', 'GBP', Decimal('12.34'), datetime(1970, 1, 1, 0, 0, 1, tzinfo=timezone.utc)),
+            (2, None, 'USD', Decimal('-0.05'), None),
+            (3, 'c', 'GBP', None, datetime(1970, 1, 1, tzinfo=timezone.utc))
+        ]
+
+        chunk = encode_chunk(COLUMNS, rows)
+
+        self.assertEqual(chunk['id'], [1, 2, 3])
+        self.assertEqual(chunk['name'], ['a', None, 'c'])
+        self.assertEqual(chunk['currency'], {'dictionary': ['GBP', 'USD'], 'indices': [0, 1, 0]})
+        self.assertEqual(chunk['amount'], [1234, -5, None])
+        self.assertEqual(chunk['created_on'], [1_000_000, None, 0])
+
+    def test_round_trips_through_json_lines(self):
+        "Testing the columnar JSON lines format reads back to the same columns, a chunk per line"
+        chunks = [[(1, 'a', 'GBP', Decimal('1.00'), None)], [(2, 'b', 'EUR', Decimal('2.50'), None)]]
+
+        lines = list(columnar_json_lines('test', COLUMNS, chunks))
+        meta, decoded = read_columnar_json(lines)
+
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(meta['table'], 'test')
+        self.assertEqual(meta['columns'][3], {'name': 'amount', 'type': 'decimal', 'scale': 2})
+        self.assertEqual(
+            [(chunk['id'], chunk['currency'], chunk['amount']) for chunk in decoded],
+            [([1], ['GBP'], [100]), ([2], ['EUR'], [250])]
+        )
+
+    def test_queryset_chunks_are_bounded(self):
+        "Testing querysets are read in chunks of at most chunk_size rows, in primary key order"
+        for number in range(5):
+            Account.objects.create(account_name=f'Test Account {number}', balance=number, currency='GBP')
+
+        chunks = list(queryset_chunks(Account.objects.all(), [Column('account_name', STRING)], chunk_size=2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[0][0], ('Test Account 0',))
+
+
+class ExportColumnarCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        account_one = Account.objects.create(account_name='Test Account 1', status=Account.Status.ACTIVE, balance=120000.00, currency='GBP')
+        account_two = Account.objects.create(account_name='Test Account 2', status=Account.Status.ACTIVE, balance=250000.00, currency='GBP')
+        for amount in ('10.00', '0.01', '99.99'):
+            Transaction.objects.create(credit_from=account_one, debit_to=account_two, amount=amount, currency='GBP')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_exports_transactions_as_json_lines(self):
+        "Testing the command writes gzip compressed columnar JSON lines in chunks"
+        path = os.path.join(self.directory, 'transactions.jsonl.gz')
+        out = StringIO()
+
+        call_command('export_columnar', 'transactions', path, '--format', 'jsonl', '--chunk-size', '2', stdout=out)
+
+        with gzip.open(path, 'rt') as export:
+            meta, chunks = read_columnar_json(export)
+            chunks = list(chunks)
+
+        self.assertIn('Exported 3 transactions', out.getvalue())
+        self.assertEqual(meta['table'], 'transactions')
+        self.assertEqual([chunk['amount'] for chunk in chunks], [[1000, 1], [9999]])
+        self.assertEqual(chunks[0]['status'], ['UNCLEARED', 'UNCLEARED'])
+
+    @unittest.skipIf(pyarrow is not None, 'pyarrow is installed')
+    def test_parquet_needs_pyarrow(self):
+        "Testing asking for Parquet without pyarrow fails with a clear error"
+        with self.assertRaisesMessage(CommandError, 'needs pyarrow'):
+            call_command('export_columnar', 'accounts', os.path.join(self.directory, 'accounts.parquet'), '--format', 'parquet')
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_exports_accounts_as_parquet(self):
+        "Testing the command writes a Parquet file with dictionary encoded and scaled integer columns"
+        import pyarrow.parquet
+
+        path = os.path.join(self.directory, 'accounts.parquet')
+        call_command('export_columnar', 'accounts', path, stdout=StringIO())
+
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(table.column('balance').to_pylist(), [12000000, 25000000])
+        self.assertEqual(table.column('currency').to_pylist(), ['GBP', 'GBP'])
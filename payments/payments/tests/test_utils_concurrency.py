@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+from django.db.models import F
+from django.test import TestCase
+
+from accounts_api.models import Account
+from payments.utils.utils_concurrency import PreconditionFailed, VersionConflict, if_match_version, save_changes
+
+
+class SaveChangesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(account_name='Test Account 1', status=Account.Status.ACTIVE, balance=120000.00, currency='GBP')
+
+    def request(self, **headers):
+        return SimpleNamespace(headers=headers)
+
+    def test_writes_changed_fields_and_bumps_version(self):
+        "Testing a write conditional on the version read updates the row and the instance"
+        account = Account.objects.get(id=self.account.id)
+
+        changed = save_changes(self.request(), account, {'status': Account.Status.INACTIVE, 'currency': 'GBP'})
+
+        self.assertEqual(changed, ['status'])
+        self.assertEqual(account.version, 2)
+        self.assertEqual(Account.objects.get(id=self.account.id).version, 2)
+
+    def test_concurrent_write_is_detected(self):
+        "Testing a write racing another one is rejected instead of overwriting it"
+        account = Account.objects.get(id=self.account.id)
+        Account.objects.filter(id=self.account.id).update(account_name='Renamed elsewhere', version=F('version') + 1)
+
+        with self.assertRaises(VersionConflict):
+            save_changes(self.request(), account, {'status': Account.Status.INACTIVE})
+
+        with self.assertRaises(PreconditionFailed):
+            save_changes(self.request(**{'If-Match': '"1"'}), account, {'account_name': 'Renamed here'})
+
+        stored = Account.objects.get(id=self.account.id)
+        self.assertEqual(stored.account_name, 'Renamed elsewhere')
+        self.assertEqual(stored.status, Account.Status.ACTIVE)
+
+    def test_if_match_parsing(self):
+        "Testing If-Match accepts strong and weak tags, * and rejects unknown tags"
+        self.assertIsNone(if_match_version(self.request()))
+        self.assertIsNone(if_match_version(self.request(**{'If-Match': '*'})))
+        self.assertEqual(if_match_version(self.request(**{'If-Match': '"3"'})), 3)
+        self.assertEqual(if_match_version(self.request(**{'If-Match': 'W/"3"'})), 3)
+        self.assertEqual(if_match_version(self.request(**{'If-Match': '"abc"'})), -1)
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework import serializers
+
+from payments.utils.utils_currency import ISO_4217_CODES, decimal_places, quantize_amount, InexactAmountError
+from payments.utils.utils_serializers import validate_currency
+
+
+class CurrencyRegistryTest(SimpleTestCase):
+    def test_registry_contains_active_codes(self):
+        "Testing common ISO 4217 codes are in the registry and junk codes are not"
+        for code in ('GBP', 'USD', 'EUR', 'JPY', 'BHD'):
+            self.assertIn(code, ISO_4217_CODES)
+
+        for code in ('gbp', 'ABC', 'JPAN', 'US', 'XAU'):
+            self.assertNotIn(code, ISO_4217_CODES)
+
+    def test_validate_currency(self):
+        "Testing the validator rejects codes that are 3 characters but not ISO 4217"
+        self.assertEqual(validate_currency('CAD'), 'CAD')
+
+        with self.assertRaises(serializers.ValidationError):
+            validate_currency('ZZZ')
+
+    def test_quantize_amount_uses_minor_units(self):
+        "Testing amounts are quantized to the minor units of their currency"
+        self.assertEqual(decimal_places('JPY'), 0)
+        self.assertEqual(decimal_places('GBP'), 2)
+        self.assertEqual(quantize_amount('100', 'GBP'), Decimal('100.00'))
+        self.assertEqual(quantize_amount('100.4', 'JPY'), Decimal('100'))
+
+    def test_quantize_amount_strict(self):
+        "Testing strict quantization rejects amounts that would be rounded"
+        self.assertEqual(quantize_amount('100.00', 'JPY', strict=True), Decimal('100'))
+
+        with self.assertRaises(InexactAmountError):
+            quantize_amount('100.50', 'JPY', strict=True)
@@ -0,0 +1,61 @@
+import unittest
+from decimal import Decimal
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+
+from payments.utils.utils_renderers import (
+    compact, expand, msgpack, CompactJSONParser, CompactJSONRenderer, MessagePackParser, MessagePackRenderer
+)
+
+ROWS = [
+    {'amount': '1.00', 'currency': 'GBP', 'tags': [{'name': 'a'}, {'name': 'b'}]},
+    {'amount': '2.50', 'currency': 'EUR', 'tags': []},
+]
+
+
+class CompactRepresentationTest(SimpleTestCase):
+
+    def test_lists_of_objects_become_tables(self):
+        "Testing lists of objects with the same fields are sent as field names and rows, at any depth"
+        self.assertEqual(compact({'next_cursor': None, 'results': ROWS}), {
+            'next_cursor': None,
+            'results': {
+                'fields': ['amount', 'currency', 'tags'],
+                'rows': [['1.00', 'GBP', {'fields': ['name'], 'rows': [['a'], ['b']]}], ['2.50', 'EUR', []]]
+            }
+        })
+
+    def test_other_values_unchanged(self):
+        "Testing single objects, errors and lists of objects with different fields are left as they are"
+        mixed = [{'id': 1}, {'id': 2, 'name': 'x'}]
+
+        self.assertEqual(compact({'res': 'Object does not exist'}), {'res': 'Object does not exist'})
+        self.assertEqual(compact(mixed), mixed)
+        self.assertEqual(compact([1, 2]), [1, 2])
+
+    def test_round_trip(self):
+        "Testing expanding the compact representation gives back the original data"
+        self.assertEqual(expand(compact(ROWS)), ROWS)
+        self.assertEqual(expand(compact({'results': ROWS})), {'results': ROWS})
+
+    def test_malformed_tables(self):
+        "Testing tables with rows of the wrong length or no field names are refused"
+        for table in ({'fields': ['a', 'b'], 'rows': [[1]]}, {'fields': 'a', 'rows': []}, {'fields': ['a'], 'rows': [1]}):
+            with self.assertRaises(ParseError):
+                expand(table)
+
+    def test_compact_json_renderer_and_parser(self):
+        "Testing the compact JSON renderer output is parsed back by the compact JSON parser"
+        content = CompactJSONRenderer().render(ROWS)
+
+        self.assertTrue(content.startswith(b'{"fields":["amount","currency","tags"],"rows":'))
+        self.assertEqual(CompactJSONParser().parse(BytesIO(content)), ROWS)
+
+    @unittest.skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack_renderer_and_parser(self):
+        "Testing the MessagePack renderer output is parsed back, with decimals as strings"
+        content = MessagePackRenderer().render([{'amount': Decimal('1.10')}])
+
+        self.assertEqual(MessagePackParser().parse(BytesIO(content)), [{'amount': '1.10'}])
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from payments.utils.utils_test import BaseAPITestCase
+from payments.utils import utils_throttling
+from payments.utils.utils_throttling import LocalBucketStore, parse_rate
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'list': '2/min', 'detail': '3/min'}})
+class TestTokenBucketThrottle(BaseAPITestCase):
+
+    def test_parse_rate(self):
+        """Tests rates are parsed into a capacity and a period in seconds"""
+
+        self.assertEqual(parse_rate('60/min'), (60, 60))
+        self.assertEqual(parse_rate('5/s'), (5, 1))
+        self.assertEqual(parse_rate('1000/day'), (1000, 86400))
+
+
+    def test_local_store_never_grows_past_cap(self):
+        """Tests the in-process store evicts the least recently used bucket once MAX_LOCAL_BUCKETS is reached"""
+
+        store = LocalBucketStore()
+        with mock.patch('payments.utils.utils_throttling.MAX_LOCAL_BUCKETS', 3):
+            store.set('kept', (1, 0), 60)
+            for number in range(10):
+                store.set(f'client-{number}', (1, 0), 60)
+                store.get('kept')
+
+                self.assertLessEqual(len(utils_throttling._buckets), 3)
+
+        self.assertEqual(list(utils_throttling._buckets), ['client-8', 'client-9', 'kept'])
+
+
+    def test_list_requests_throttled_with_retry_after(self):
+        """Tests list requests beyond the budget return 429 with a Retry-After header"""
+
+        for _ in range(2):
+            response = self.client.get(reverse('accounts-list'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse('accounts-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response.headers['Retry-After'], '30')
+
+
+    def test_list_and_detail_budgets_are_separate(self):
+        """Tests exhausting the list budget does not throttle detail or posting requests"""
+
+        for _ in range(3):
+            self.client.get(reverse('accounts-list'))
+
+        response = self.client.get(reverse('accounts-detail', args=[self.test_account_one.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = {"account_name": "Test Account 3", "status": "ACTIVE", "balance": 100.00, "currency": "GBP"}
+        response = self.client.post(reverse('accounts-list'), data=data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+    def test_endpoints_have_separate_buckets(self):
+        """Tests exhausting the budget of one list endpoint does not throttle another"""
+
+        for _ in range(3):
+            self.client.get(reverse('accounts-list'))
+
+        response = self.client.get(reverse('transactions-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -15,22 +15,18 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
-from transactions_api import urls as transaction_urls
-from accounts_api import urls as accounts_urls
-from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+from django.urls import path
+from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+
+from payments.schema import CachedSpectacularAPIView
+from payments.urls_api import api_urlpatterns
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('auth/', include('djoser.urls')),
-    path('auth/', include('djoser.urls.jwt')),
-    path('v1/', include([
-        path('transactions/', include(transaction_urls)),
-        path('accounts/', include(accounts_urls))
-    ])),
+    *api_urlpatterns,
 
     # OpenAPI endpoints
-    path('docs/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('docs/schema/', CachedSpectacularAPIView.as_view(), name='schema'),
     path('swagger/schema/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('redoc/schema/', SpectacularRedocView.as_view(url_name='schema'), name='redoc')
-]
+]
\ No newline at end of file
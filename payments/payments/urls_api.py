@@ -0,0 +1,43 @@
+"""
+URL configuration for the API URL space, used directly by payments.settings_api and
+extended with the admin and documentation pages by payments.urls.
+"""
+from django.urls import path, include
+from django.utils.module_loading import import_string
+from transactions_api import urls as transaction_urls
+from accounts_api import urls as accounts_urls
+from fx_api import urls as fx_urls
+from webhooks_api import urls as webhooks_urls
+from tasks_api import urls as tasks_urls
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """Import the class-based view on its first request rather than at URLconf import"""
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    wrapper.csrf_exempt = True
+    return wrapper
+
+
+api_urlpatterns = [
+    path('auth/', include('djoser.urls')),
+    path('auth/', include('djoser.urls.jwt')),
+    path('v1/', include([
+        path('transactions/', include(transaction_urls)),
+        path('accounts/', include(accounts_urls)),
+        path('fx/', include(fx_urls)),
+        path('webhooks/', include(webhooks_urls)),
+        path('tasks/', include(tasks_urls))
+    ])),
+]
+
+urlpatterns = api_urlpatterns + [
+    # OpenAPI schema, without the Swagger and Redoc pages that need the drf_spectacular templates
+    path('docs/schema/', lazy_view('payments.schema.CachedSpectacularAPIView'), name='schema'),
+]
@@ -0,0 +1,201 @@
+import gzip
+import json
+from datetime import datetime, timezone as dt_timezone
+
+from django.http import StreamingHttpResponse
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+# Columnar export of query results for offline analysis.
+# Rows are read a chunk at a time and turned into columns: low-cardinality text columns are dictionary
+# encoded, decimals are stored as integers scaled by 10 ** scale and timestamps as UTC epoch microseconds.
+# Each chunk is written as a Parquet row group when pyarrow is installed, otherwise as one line of the
+# columnar JSON lines format below, which needs nothing outside the standard library to write or read:
+#
+#   {"format": "payments-columnar", "version": 1, "table": ..., "columns": [{"name": ..., "type": ..., "scale": ...}]}
+#   {"rows": <n>, "columns": {<name>: [values], <dictionary name>: {"dictionary": [values], "indices": [ints]}}}
+#   ... one line per chunk
+
+FORMAT_NAME = 'payments-columnar'
+CONTENT_TYPE = 'application/x-ndjson'
+FORMAT_VERSION = 1
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+INT = 'int64'
+DECIMAL = 'decimal'
+DICTIONARY = 'dictionary'
+STRING = 'string'
+TIMESTAMP = 'timestamp'
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSECOND = datetime.resolution
+
+
+class Column:
+    """A column of an exported table, read from the source field (the column name by default)"""
+
+    def __init__(self, name, kind, scale=None, source=None):
+        self.name = name
+        self.kind = kind
+        self.scale = scale
+        self.source = source or name
+
+    def describe(self):
+        description = {'name': self.name, 'type': self.kind}
+        if self.scale is not None:
+            description['scale'] = self.scale
+        return description
+
+    def encode(self, values):
+        """Encode a chunk of Python values into this column's stored form"""
+        if self.kind == DICTIONARY:
+            dictionary = {}
+            indices = [None if value is None else dictionary.setdefault(value, len(dictionary)) for value in values]
+            return {'dictionary': list(dictionary), 'indices': indices}
+
+        if self.kind == DECIMAL:
+            factor = 10 ** self.scale
+            return [None if value is None else int((value * factor).to_integral_value()) for value in values]
+
+        if self.kind == TIMESTAMP:
+            return [None if value is None else (value - EPOCH) // _MICROSECOND for value in values]
+
+        if self.kind == STRING:
+            return [None if value is None else str(value) for value in values]
+
+        return list(values)
+
+
+def queryset_chunks(queryset, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the queryset's rows as lists of tuples in column order, chunk_size rows at a time.
+    Chunks are read in primary key order from the last key seen, so memory stays bounded and
+    each chunk is an index range scan however far into the table it is
+    """
+    fields = ['pk'] + [column.source for column in columns]
+    last_pk = None
+    while True:
+        page = queryset.order_by('pk')
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+
+        rows = list(page.values_list(*fields)[:chunk_size])
+        if not rows:
+            return
+
+        last_pk = rows[-1][0]
+        yield [row[1:] for row in rows]
+
+
+def encode_chunk(columns, rows):
+    """Turn a list of row tuples, in column order, into a dict of encoded columns"""
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    return {column.name: column.encode(column_values) for column, column_values in zip(columns, values)}
+
+
+def header(table, columns):
+    return {'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'table': table, 'columns': [column.describe() for column in columns]}
+
+
+def columnar_json_lines(table, columns, chunks):
+    """Yield the lines of the columnar JSON lines format for an iterable of row chunks"""
+    yield json.dumps(header(table, columns)) + '\n'
+    for rows in chunks:
+        yield json.dumps({'rows': len(rows), 'columns': encode_chunk(columns, rows)}, separators=(',', ':')) + '\n'
+
+
+def columnar_json_response(table, columns, chunks):
+    """Stream the columnar JSON lines format as an attachment, encoding one chunk at a time"""
+    response = StreamingHttpResponse(columnar_json_lines(table, columns, chunks), content_type=CONTENT_TYPE)
+    response['Content-Disposition'] = f'attachment; filename="{table}.columnar.jsonl"'
+    return response
+
+
+def write_columnar_json(path, table, columns, chunks):
+    """Write the columnar JSON lines format to path, gzip compressed when it ends in .gz, returning the row count"""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    rows = 0
+
+    def counted():
+        nonlocal rows
+        for chunk in chunks:
+            rows += len(chunk)
+            yield chunk
+
+    with opener(path, 'wt') as output:
+        output.writelines(columnar_json_lines(table, columns, counted()))
+
+    return rows
+
+
+def read_columnar_json(lines):
+    """
+    Read the columnar JSON lines format back, returning the header and yielding each chunk as a dict of
+    decoded columns: dictionaries expanded, decimals left scaled and timestamps left as epoch microseconds
+    """
+    lines = iter(lines)
+    meta = json.loads(next(lines))
+    if meta.get('format') != FORMAT_NAME or meta.get('version') != FORMAT_VERSION:
+        raise ValueError('Not a payments-columnar version 1 file')
+
+    def chunks():
+        for line in lines:
+            chunk = json.loads(line)
+            columns = {}
+            for name, values in chunk['columns'].items():
+                if isinstance(values, dict):
+                    dictionary = values['dictionary']
+                    values = [None if index is None else dictionary[index] for index in values['indices']]
+                columns[name] = values
+            yield columns
+
+    return meta, chunks()
+
+
+def arrow_type(column):
+    if column.kind == DICTIONARY:
+        return pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    if column.kind == TIMESTAMP:
+        return pyarrow.timestamp('us', tz='UTC')
+    if column.kind == STRING:
+        return pyarrow.string()
+    return pyarrow.int64()
+
+
+def arrow_schema(table, columns):
+    fields = [
+        pyarrow.field(column.name, arrow_type(column), metadata={'scale': str(column.scale)} if column.scale is not None else None)
+        for column in columns
+    ]
+    return pyarrow.schema(fields, metadata={'table': table, 'format': FORMAT_NAME})
+
+
+def write_parquet(path, table, columns, chunks):
+    """Write the chunks to a Parquet file, one row group per chunk, returning the row count. Needs pyarrow"""
+    if pyarrow is None:
+        raise RuntimeError('Writing Parquet needs pyarrow, install it or use the columnar JSON lines format')
+
+    schema = arrow_schema(table, columns)
+    rows = 0
+    with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            encoded = encode_chunk(columns, chunk)
+            arrays = []
+            for column, field in zip(columns, schema):
+                values = encoded[column.name]
+                if column.kind == DICTIONARY:
+                    arrays.append(pyarrow.DictionaryArray.from_arrays(
+                        pyarrow.array(values['indices'], pyarrow.int32()), pyarrow.array(values['dictionary'], pyarrow.string())
+                    ))
+                else:
+                    arrays.append(pyarrow.array(values, field.type))
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+            rows += len(chunk)
+
+    return rows
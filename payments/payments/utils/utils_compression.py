@@ -0,0 +1,168 @@
+import gzip
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Content codings for response compression, see payments.middleware.CompressionMiddleware.
+# gzip is always available; br and zstd are offered when the optional brotli and zstandard packages are
+# installed. Streamed responses are compressed a chunk at a time and flushed after every chunk, so clients
+# can decode each chunk as it arrives and memory stays bounded.
+
+DEFAULT_MIN_SIZE = 1024
+# Levels favouring speed over the last few percent of size, since every response is compressed as it is served
+DEFAULT_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 4}
+# Used when the client accepts several codings equally, best ratio first
+PREFERENCE = ('br', 'zstd', 'gzip')
+
+
+class GzipEncoding:
+    name = 'gzip'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, content):
+        return gzip.compress(content, compresslevel=self.level, mtime=0)
+
+    def compressor(self):
+        return GzipCompressor(self.level)
+
+
+class GzipCompressor:
+    def __init__(self, level):
+        # wbits 31 writes the gzip header and trailer
+        self.compressobj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        return self.compressobj.compress(chunk) + self.compressobj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressobj.flush()
+
+
+class BrotliEncoding:
+    name = 'br'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, content):
+        return brotli.compress(content, quality=self.level)
+
+    def compressor(self):
+        return BrotliCompressor(self.level)
+
+
+class BrotliCompressor:
+    def __init__(self, level):
+        self.compressobj = brotli.Compressor(quality=level)
+
+    def compress(self, chunk):
+        return self.compressobj.process(chunk) + self.compressobj.flush()
+
+    def finish(self):
+        return self.compressobj.finish()
+
+
+class ZstdEncoding:
+    name = 'zstd'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, content):
+        return zstandard.ZstdCompressor(level=self.level).compress(content)
+
+    def compressor(self):
+        return ZstdCompressor(self.level)
+
+
+class ZstdCompressor:
+    def __init__(self, level):
+        self.compressobj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk):
+        return self.compressobj.compress(chunk) + self.compressobj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self.compressobj.flush()
+
+
+ENCODINGS = {'gzip': GzipEncoding}
+if brotli is not None:
+    ENCODINGS['br'] = BrotliEncoding
+if zstandard is not None:
+    ENCODINGS['zstd'] = ZstdEncoding
+
+
+def compression_levels():
+    return {**DEFAULT_LEVELS, **getattr(settings, 'COMPRESSION_LEVELS', {})}
+
+
+def accepted_codings(header):
+    """The codings in an Accept-Encoding header mapped to their q-values"""
+    codings = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+
+    return codings
+
+
+def choose_encoding(header):
+    """
+    The available coding the client ranks highest, breaking ties by PREFERENCE, as an encoding object set to
+    its compression level, or None if the client accepts none of them
+    """
+    codings = accepted_codings(header)
+    wildcard = codings.get('*', 0.0)
+    ranked = [
+        (codings.get(name, wildcard), -PREFERENCE.index(name), name)
+        for name in PREFERENCE if name in ENCODINGS
+    ]
+    quality, _, name = max(ranked)
+    if quality <= 0:
+        return None
+
+    return ENCODINGS[name](compression_levels()[name])
+
+
+def compress_stream(encoding, chunks):
+    compressor = encoding.compressor()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def compress_async_stream(encoding, chunks):
+    compressor = encoding.compressor()
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
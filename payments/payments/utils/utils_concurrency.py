@@ -0,0 +1,85 @@
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from payments.utils.utils_serializers import apply_changed_fields
+
+
+# Optimistic concurrency for the detail views.
+# Accounts and transactions carry a version that every write increments. Updates are written with a
+# single UPDATE ... WHERE version = <version read>, so no row lock is held while the request is validated
+# and a concurrent write makes the UPDATE match no row instead of being silently overwritten.
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = {'res': 'Object has changed since the version given in If-Match'}
+    default_code = 'precondition_failed'
+
+
+class VersionConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = {'res': 'Object was modified by another request, fetch it again and retry'}
+    default_code = 'conflict'
+
+
+def etag(instance):
+    """The entity tag of an instance's current version"""
+    return f'"{instance.version}"'
+
+
+def if_match_version(request):
+    """The version given in If-Match, or None when the header is absent or *"""
+    header = request.headers.get('If-Match', '').strip()
+    if not header or header == '*':
+        return None
+
+    try:
+        return int(header.removeprefix('W/').strip('"'))
+    except ValueError:
+        # A tag this API never issued cannot match
+        return -1
+
+
+def check_if_match(request, instance):
+    """Raise PreconditionFailed if the request is conditional on a version other than the instance's"""
+    expected = if_match_version(request)
+    if expected is not None and expected != instance.version:
+        raise PreconditionFailed()
+
+
+def save_changes(request, instance, validated_data):
+    """
+    Apply the validated data to the instance and write the changed fields, conditional on the version
+    read with the instance. Raises PreconditionFailed (If-Match requests) or VersionConflict when
+    another request wrote the row first. Returns the names of the changed fields.
+    """
+    read_version = instance.version
+    changed_fields = apply_changed_fields(instance, validated_data)
+    if not changed_fields:
+        return changed_fields
+
+    now = timezone.now()
+    updated = type(instance).objects.filter(pk=instance.pk, version=read_version).update(
+        **{field_name: getattr(instance, field_name) for field_name in changed_fields},
+        last_updated=now,
+        version=F('version') + 1
+    )
+    if not updated:
+        raise PreconditionFailed() if if_match_version(request) is not None else VersionConflict()
+
+    instance.last_updated = now
+    instance.version = read_version + 1
+    return changed_fields
+
+
+def delete_if_match(request, instance):
+    """
+    Delete the instance, conditional on the version read with it, so the caller knows exactly what was
+    deleted. Raises PreconditionFailed (If-Match requests) or VersionConflict when another request wrote
+    or deleted the row first.
+    """
+    check_if_match(request, instance)
+    deleted, _ = type(instance).objects.filter(pk=instance.pk, version=instance.version).delete()
+    if not deleted:
+        raise PreconditionFailed() if if_match_version(request) is not None else VersionConflict()
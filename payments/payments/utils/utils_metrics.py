@@ -0,0 +1,140 @@
+import threading
+import time
+
+
+# Throughput metrics for the background workers
+
+class ThroughputMetrics:
+    """Counts the items and batches handled by a worker and reports its throughput"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.batches = 0
+        self.processed = 0
+        self.failed = 0
+
+    def record_batch(self, processed, failed=0):
+        """Record the outcome of a single batch"""
+        self.batches += 1
+        self.processed += processed
+        self.failed += failed
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        """Items processed per second since the worker started"""
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            'batches': self.batches,
+            'processed': self.processed,
+            'failed': self.failed,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rate_per_second': round(self.rate, 1)
+        }
+
+
+# Process-wide metrics, served in the Prometheus text format at /metrics
+
+class _Metric:
+    type_name = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key):
+        if not key:
+            return ''
+        pairs = ','.join(f'{name}="{value}"' for name, value in zip(self.labelnames, key))
+        return '{' + pairs + '}'
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.type_name}']
+        for name, key, value in self.samples():
+            lines.append(f'{name}{self._format_labels(key)} {value}')
+        return lines
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Summary(_Metric):
+    type_name = 'summary'
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            count, total = self._values.get(key, (0, 0.0))
+            self._values[key] = (count + 1, total + value)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        samples = []
+        for key, (count, total) in items:
+            samples.append((f'{self.name}_count', key, count))
+            samples.append((f'{self.name}_sum', key, round(total, 6)))
+        return samples
+
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def __init__(self, name, help_text, function):
+        super().__init__(name, help_text)
+        self.function = function
+
+    def samples(self):
+        return [(self.name, (), self.function())]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def summary(self, name, help_text, labelnames=()):
+        return self.register(Summary(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, function):
+        return self.register(Gauge(name, help_text, function))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+PROCESS_START_TIME = time.time()
+
+registry.gauge('payments_process_start_time_seconds', 'Start time of the process since the unix epoch in seconds', lambda: PROCESS_START_TIME)
@@ -0,0 +1,115 @@
+from decimal import Decimal
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Compact representations for internal service-to-service calls, chosen with the Accept header for
+# responses and the Content-Type header for request bodies.
+# Every list of objects with the same fields, such as a page of transactions or a bulk update, is sent as a
+# table naming the fields once, instead of repeating them on every row:
+#
+#   [{"amount": "1.00", "currency": "GBP"}, {"amount": "2.50", "currency": "EUR"}]
+#   {"fields": ["amount", "currency"], "rows": [["1.00", "GBP"], ["2.50", "EUR"]]}
+#
+# Anything else, such as a single object or an error, is sent as it is. The tables are written as JSON, or
+# as MessagePack when msgpack is installed (optional, `pip install msgpack`).
+
+COMPACT_JSON_MEDIA_TYPE = 'application/vnd.payments.compact+json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+
+TABLE_KEYS = {'fields', 'rows'}
+
+
+def compact(data):
+    """Turn each list of objects sharing the same fields into a table, at any depth"""
+    if isinstance(data, dict):
+        return {key: compact(value) for key, value in data.items()}
+
+    if isinstance(data, list):
+        if data and all(isinstance(item, dict) for item in data):
+            fields = list(data[0])
+            if all(item.keys() == data[0].keys() for item in data):
+                return {'fields': fields, 'rows': [[compact(item[field]) for field in fields] for item in data]}
+
+        return [compact(item) for item in data]
+
+    return data
+
+
+def expand(data):
+    """Turn the tables of the compact representation back into lists of objects, raising ParseError on a malformed table"""
+    if isinstance(data, list):
+        return [expand(item) for item in data]
+
+    if not isinstance(data, dict):
+        return data
+
+    if data.keys() != TABLE_KEYS:
+        return {key: expand(value) for key, value in data.items()}
+
+    fields, rows = data['fields'], data['rows']
+    if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields) or not isinstance(rows, list):
+        raise ParseError('A compact table needs a list of field names and a list of rows')
+    if any(not isinstance(row, list) or len(row) != len(fields) for row in rows):
+        raise ParseError(f'Every row of a compact table must have {len(fields)} values, one per field')
+
+    return [{field: expand(value) for field, value in zip(fields, row)} for row in rows]
+
+
+class CompactJSONRenderer(JSONRenderer):
+    media_type = COMPACT_JSON_MEDIA_TYPE
+    format = 'compact'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(compact(data), accepted_media_type, renderer_context)
+
+
+class CompactJSONParser(JSONParser):
+    media_type = COMPACT_JSON_MEDIA_TYPE
+    renderer_class = CompactJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return expand(super().parse(stream, media_type, parser_context))
+
+
+def encode_msgpack_value(value):
+    """Amounts as exact decimal strings, as the JSON renderers write them, and anything else as JSON would"""
+    if isinstance(value, Decimal):
+        return str(value)
+
+    return JSONEncoder().default(value)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders the compact representation as MessagePack, with values JSON cannot hold natively as strings"""
+
+    media_type = MSGPACK_MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        return msgpack.packb(compact(data), default=encode_msgpack_value, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            data = msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as error:
+            raise ParseError(f'MessagePack parse error - {error}')
+
+        return expand(data)
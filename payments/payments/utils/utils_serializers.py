@@ -1,15 +1,64 @@
 from rest_framework import serializers
 
+from payments.utils.utils_currency import is_valid_currency, quantize_amount, InexactAmountError
+
 # Common error messages
 
 CURRENCY_ERROR_MESSAGE = 'Currency must be a 3 character ISO code'
 
 
+# Common limits
+
+BULK_UPDATE_MAX_SIZE = 500
+
+BATCH_LOOKUP_MAX_SIZE = 100
+
+
+# Common serializers
+
+class GuidLookupSerializer(serializers.Serializer):
+    guids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=BATCH_LOOKUP_MAX_SIZE)
+
+
 # Additional functions for the serializers
 
 def validate_currency(value):
-        """Check that the currency code is 3 characters (valid ISO code)"""
-        if len(value) != 3:
+        """Check that the currency code is a valid ISO 4217 code"""
+        if not is_valid_currency(value):
             raise serializers.ValidationError(CURRENCY_ERROR_MESSAGE)
 
-        return value
\ No newline at end of file
+        return value
+
+
+def validate_amount_for_currency(attrs, instance, amount_field):
+    """Quantize the amount to its currency's minor units, rejecting amounts that would be rounded"""
+    if amount_field not in attrs and 'currency' not in attrs:
+        return attrs
+
+    amount = attrs.get(amount_field, getattr(instance, amount_field, None))
+    currency = attrs.get('currency', getattr(instance, 'currency', None))
+    if amount is None or not is_valid_currency(currency):
+        return attrs
+
+    try:
+        attrs[amount_field] = quantize_amount(amount, currency, strict=True)
+    except InexactAmountError as error:
+        raise serializers.ValidationError({amount_field: str(error)})
+
+    return attrs
+
+
+def apply_changed_fields(instance, validated_data):
+    """Set the validated values that differ from the instance and return the names of the changed fields"""
+    changed_fields = []
+
+    for field_name, value in validated_data.items():
+        field = instance._meta.get_field(field_name)
+        current_value = getattr(instance, field.attname)
+        new_value = value.pk if field.is_relation and value is not None else value
+
+        if current_value != new_value:
+            setattr(instance, field_name, value)
+            changed_fields.append(field_name)
+
+    return changed_fields
@@ -4,9 +4,13 @@ from rest_framework_simplejwt.tokens import AccessToken
 
 from accounts_api.models import Account
 from transactions_api.models import Transaction
+from payments.utils.utils_throttling import reset_throttle_buckets
+from transactions_api.velocity import reset_velocity_windows
 
 class BaseAPITestCase(APITestCase):
     def setUp(self):
+        reset_throttle_buckets()
+        reset_velocity_windows()
         user = User.objects.create_user(
                 email='testuser@test.com',
                 username='user123',
@@ -0,0 +1,123 @@
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from payments.utils.utils_metrics import registry
+
+THROTTLED = registry.counter('payments_throttled_requests_total', 'Requests rejected by the token bucket throttle, by scope', ['scope'])
+
+
+# In-process token buckets, keyed by scope, endpoint, method and client.
+# Each value is an immutable (tokens, timestamp) tuple that is replaced in a single assignment,
+# so no lock is taken. Concurrent requests for the same key can race and admit a request or two
+# above the budget, which is an acceptable trade for never blocking the request thread.
+# Buckets are kept in the order they were last used, and past MAX_LOCAL_BUCKETS the least recently used
+# one is evicted in constant time, so a flood of new clients cannot grow the store or slow requests down.
+_buckets = OrderedDict()
+
+MAX_LOCAL_BUCKETS = 10000
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Turn a rate such as '100/min' into (capacity, period in seconds)"""
+    num, period = rate.split('/')
+    return int(num), RATE_PERIODS[period[0]]
+
+
+def reset_throttle_buckets():
+    """Forget every in-process bucket"""
+    _buckets.clear()
+
+
+class LocalBucketStore:
+    def get(self, key):
+        state = _buckets.get(key)
+        if state is not None:
+            try:
+                _buckets.move_to_end(key)
+            except KeyError:
+                pass
+        return state
+
+    def set(self, key, state, period):
+        _buckets[key] = state
+        _buckets.move_to_end(key)
+        while len(_buckets) > MAX_LOCAL_BUCKETS:
+            try:
+                _buckets.popitem(last=False)
+            except KeyError:
+                break
+
+
+class CacheBucketStore:
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def get(self, key):
+        return self.cache.get(f'throttle:{key}')
+
+    def set(self, key, state, period):
+        self.cache.set(f'throttle:{key}', state, timeout=period)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket throttle with separate budgets per scope.
+
+    Views name their scope with throttle_scope, either a string or a mapping of HTTP method to scope,
+    and the rates come from DEFAULT_THROTTLE_RATES. Buckets are kept per client and per endpoint.
+    Set THROTTLE_CACHE_ALIAS to share the buckets between processes through a Django cache.
+    """
+
+    def __init__(self):
+        self.retry_after = None
+
+    def get_store(self):
+        alias = getattr(settings, 'THROTTLE_CACHE_ALIAS', None)
+        return CacheBucketStore(alias) if alias else LocalBucketStore()
+
+    def get_scope(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if isinstance(scope, dict):
+            return scope.get(request.method)
+
+        return scope
+
+    def get_client_ident(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user-{request.user.pk}'
+
+        return f'anon-{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope) if scope else None
+        if rate is None:
+            return True
+
+        capacity, period = parse_rate(rate)
+        refill_per_second = capacity / period
+        key = f'{scope}:{view.__class__.__name__}:{request.method}:{self.get_client_ident(request)}'
+        store = self.get_store()
+
+        now = time.time()
+        tokens, timestamp = store.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - timestamp) * refill_per_second)
+
+        if tokens >= 1:
+            store.set(key, (tokens - 1, now), period)
+            return True
+
+        store.set(key, (tokens, now), period)
+        THROTTLED.inc(scope=scope)
+        self.retry_after = (1 - tokens) / refill_per_second
+        return False
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks_api.worker import TaskWorker, DEFAULT_CONCURRENCY
+
+
+class Command(BaseCommand):
+    help = 'Runs the queued tasks on a pool of worker threads, highest priority first, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Number of tasks run at once')
+        parser.add_argument(
+            '--visibility-timeout', type=int, default=None,
+            help='Seconds a claimed task is hidden from other workers, renewed while it runs (default TASK_VISIBILITY_TIMEOUT)'
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling for due tasks')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to wait between polls when running with --loop')
+
+    def handle(self, *args, **options):
+        worker = TaskWorker(concurrency=options['concurrency'], visibility_timeout=options['visibility_timeout'])
+
+        try:
+            while True:
+                batches = worker.metrics.batches
+                worker.run()
+                if not options['loop'] or worker.metrics.batches > batches:
+                    self.report(worker.metrics)
+
+                if not options['loop']:
+                    break
+
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.report(worker.metrics)
+        finally:
+            worker.close()
+
+    def report(self, metrics):
+        """Write the throughput of the worker so far"""
+        self.stdout.write(
+            f'Ran {metrics.processed} tasks ({metrics.failed} failed attempts) in {metrics.elapsed:.1f}s, '
+            f'{metrics.rate:.1f} tasks/s'
+        )
@@ -0,0 +1,39 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    A call to a function, by dotted path, queued to run in a run_workers process instead of the request.
+    Higher priorities run first. Failed tasks are retried with backoff until max_attempts
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING"
+        RUNNING = "RUNNING"
+        SUCCEEDED = "SUCCEEDED"
+        FAILED = "FAILED"
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(encoder=DjangoJSONEncoder, default=list)
+    kwargs = models.JSONField(encoder=DjangoJSONEncoder, default=dict)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=9, choices=Status, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField()
+    # When a PENDING task is next due to run
+    run_at = models.DateTimeField(default=timezone.now)
+    # When the worker running a RUNNING task loses it, so another worker picks it up if the first one died
+    locked_until = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    started_on = models.DateTimeField(null=True, blank=True)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-priority', 'run_at', 'id'], condition=models.Q(status='PENDING'), name='task_due_idx'),
+            models.Index(fields=['locked_until'], condition=models.Q(status='RUNNING'), name='task_lease_idx'),
+        ]
@@ -0,0 +1,133 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_BASE = 2
+DEFAULT_BACKOFF_MAX = 600
+DEFAULT_VISIBILITY_TIMEOUT = 300
+
+
+def task_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def task_name(func):
+    """The dotted path a task function is stored and imported by"""
+    if isinstance(func, str):
+        return func
+
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue(func, args=(), kwargs=None, priority=0, delay=None, max_attempts=None):
+    """
+    Queue a call of func, a module-level function or its dotted path, with JSON serialisable arguments.
+    Call inside the atomic block of the write the task follows up on, so it is only queued if the write commits.
+    Higher priorities run first; delay, in seconds, holds the task back.
+    """
+    return Task.objects.create(
+        name=task_name(func),
+        args=list(args),
+        kwargs=kwargs or {},
+        priority=priority,
+        max_attempts=max_attempts or task_setting('TASK_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS),
+        run_at=timezone.now() + timedelta(seconds=delay or 0)
+    )
+
+
+def retry_delay(attempts, rng=random):
+    """
+    Seconds to wait before retrying a failed task, using exponential backoff with full jitter:
+    uniform between zero and base * 2 ** (attempts - 1), capped at TASK_BACKOFF_MAX
+    """
+    base = task_setting('TASK_BACKOFF_BASE', DEFAULT_BACKOFF_BASE)
+    cap = task_setting('TASK_BACKOFF_MAX', DEFAULT_BACKOFF_MAX)
+    return rng.uniform(0, min(cap, base * 2 ** (attempts - 1)))
+
+
+def release_expired_tasks():
+    """
+    Put RUNNING tasks whose worker let the visibility timeout pass back in the queue, presumably because the
+    worker died, or mark them FAILED if they have no attempts left. Returns the number released and failed.
+    """
+    now = timezone.now()
+    expired = Task.objects.filter(status=Task.Status.RUNNING, locked_until__lte=now)
+    failed = expired.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.Status.FAILED, locked_until=None, finished_on=now, last_error='Visibility timeout expired'
+    )
+    released = expired.update(
+        status=Task.Status.PENDING, locked_until=None, run_at=now, last_error='Visibility timeout expired'
+    )
+    return released, failed
+
+
+def claim_tasks(limit, visibility_timeout=None):
+    """
+    Claim up to limit due tasks, highest priority first, hiding them from other workers for visibility_timeout
+    seconds. Each task is claimed with an update conditional on its attempts, so when two workers read the
+    same task only one of them gets it, on any database.
+    """
+    timeout = visibility_timeout or task_setting('TASK_VISIBILITY_TIMEOUT', DEFAULT_VISIBILITY_TIMEOUT)
+    now = timezone.now()
+    candidates = Task.objects.filter(status=Task.Status.PENDING, run_at__lte=now).order_by('-priority', 'run_at', 'id')
+
+    claimed = []
+    for task in candidates[:limit]:
+        updated = Task.objects.filter(id=task.id, status=Task.Status.PENDING, attempts=task.attempts).update(
+            status=Task.Status.RUNNING, attempts=F('attempts') + 1, locked_until=now + timedelta(seconds=timeout), started_on=now
+        )
+        if updated:
+            task.status = Task.Status.RUNNING
+            task.attempts += 1
+            task.started_on = now
+            claimed.append(task)
+
+    return claimed
+
+
+def claimed(task):
+    """The task as long as it is still this worker's claim: RUNNING, and not claimed again since"""
+    return Task.objects.filter(id=task.id, status=Task.Status.RUNNING, attempts=task.attempts)
+
+
+def extend_lease(task, visibility_timeout=None):
+    """Keep a long running task hidden from other workers for another visibility timeout"""
+    timeout = visibility_timeout or task_setting('TASK_VISIBILITY_TIMEOUT', DEFAULT_VISIBILITY_TIMEOUT)
+    return claimed(task).update(locked_until=timezone.now() + timedelta(seconds=timeout))
+
+
+def run_task(task):
+    """Import the task's function and call it with its arguments"""
+    return import_string(task.name)(*task.args, **task.kwargs)
+
+
+def complete_task(task, result):
+    """Store the result of a task. Returns False if the task was no longer this worker's claim"""
+    return bool(claimed(task).update(
+        status=Task.Status.SUCCEEDED, result=result, locked_until=None, finished_on=timezone.now(), last_error=''
+    ))
+
+
+def fail_task(task, error, rng=random):
+    """
+    Record a failed attempt, rescheduling the task with backoff or marking it FAILED once it has had
+    max_attempts. Returns the new status, or None if the task was no longer this worker's claim.
+    """
+    now = timezone.now()
+    last_error = f'{type(error).__name__}: {error}'
+    if task.attempts >= task.max_attempts:
+        changes = {'status': Task.Status.FAILED, 'finished_on': now}
+    else:
+        changes = {'status': Task.Status.PENDING, 'run_at': now + timedelta(seconds=retry_delay(task.attempts, rng))}
+
+    if not claimed(task).update(locked_until=None, last_error=last_error, **changes):
+        return None
+
+    return changes['status']
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+
+from .models import Task
+
+
+class TaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = [
+            "id", "name", "priority", "status", "attempts", "max_attempts", "run_at", "result", "last_error",
+            "created_on", "started_on", "finished_on"
+        ]
@@ -0,0 +1,129 @@
+import random
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from tasks_api.models import Task
+from tasks_api.queue import claim_tasks, complete_task, enqueue, fail_task, release_expired_tasks, retry_delay
+from tasks_api.worker import TaskWorker
+
+calls = []
+
+
+def record_call(*args, **kwargs):
+    calls.append((threading.get_ident(), args, kwargs))
+    return {'args': list(args)}
+
+
+def always_fails(reason):
+    raise ValueError(reason)
+
+
+class TaskQueueTest(TestCase):
+    def test_enqueue(self):
+        "Testing enqueue stores the function's dotted path and arguments"
+        task = enqueue(record_call, args=[1, 'two'], kwargs={'three': 3}, priority=5)
+
+        self.assertEqual(task.name, 'tasks_api.tests.test_queue.record_call')
+        self.assertEqual((task.args, task.kwargs, task.priority), ([1, 'two'], {'three': 3}, 5))
+        self.assertEqual((task.status, task.max_attempts), (Task.Status.PENDING, 5))
+
+    def test_claim_by_priority(self):
+        "Testing tasks are claimed highest priority first, skipping those not yet due"
+        low = enqueue(record_call)
+        high = enqueue(record_call, priority=10)
+        enqueue(record_call, priority=20, delay=60)
+
+        claimed = claim_tasks(2)
+
+        self.assertEqual([task.id for task in claimed], [high.id, low.id])
+        self.assertEqual(claim_tasks(2), [])
+        self.assertEqual(Task.objects.get(id=high.id).attempts, 1)
+
+    def test_claim_is_exclusive(self):
+        "Testing a task already claimed by another worker is not claimed again"
+        task = enqueue(record_call)
+        stale = Task.objects.get(id=task.id)
+        claim_tasks(1)
+
+        self.assertFalse(Task.objects.filter(id=stale.id, status=Task.Status.PENDING, attempts=stale.attempts).exists())
+        self.assertEqual(claim_tasks(1), [])
+
+    def test_retry_then_fail(self):
+        "Testing a failed task is rescheduled with backoff until it runs out of attempts"
+        enqueue(always_fails, args=['broken'], max_attempts=2)
+
+        task = claim_tasks(1)[0]
+        self.assertEqual(fail_task(task, ValueError('broken')), Task.Status.PENDING)
+        Task.objects.filter(id=task.id).update(run_at=timezone.now())
+        task = claim_tasks(1)[0]
+        self.assertEqual(fail_task(task, ValueError('broken')), Task.Status.FAILED)
+
+        task = Task.objects.get(id=task.id)
+        self.assertEqual((task.status, task.attempts), (Task.Status.FAILED, 2))
+        self.assertEqual(task.last_error, 'ValueError: broken')
+
+    @override_settings(TASK_BACKOFF_BASE=2, TASK_BACKOFF_MAX=10)
+    def test_retry_delay(self):
+        "Testing the retry delay grows exponentially up to the cap"
+        rng = random.Random(1)
+        self.assertTrue(all(0 <= retry_delay(1, rng) <= 2 for _ in range(20)))
+        self.assertTrue(all(0 <= retry_delay(10, rng) <= 10 for _ in range(20)))
+
+    def test_visibility_timeout(self):
+        "Testing a task whose lease expired is released to other workers, or failed with no attempts left"
+        enqueue(record_call)
+        enqueue(record_call, max_attempts=1)
+        claimed = claim_tasks(2)
+        Task.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(release_expired_tasks(), (1, 1))
+        self.assertEqual(len(claim_tasks(2)), 1)
+        self.assertFalse(complete_task(claimed[0], None))
+
+    def test_lost_claim(self):
+        "Testing a worker cannot complete a task another worker claimed after its lease expired"
+        enqueue(record_call)
+        first = claim_tasks(1)[0]
+        Task.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        release_expired_tasks()
+        second = claim_tasks(1)[0]
+
+        self.assertFalse(complete_task(first, 'late'))
+        self.assertTrue(complete_task(second, 'on time'))
+        self.assertEqual(Task.objects.get(id=second.id).result, 'on time')
+
+
+class TaskWorkerTest(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_worker_runs_tasks_on_threads(self):
+        "Testing the worker runs every due task on its pool and stores the results"
+        for number in range(6):
+            enqueue(record_call, args=[number])
+        enqueue(always_fails, args=['broken'], max_attempts=1)
+
+        worker = TaskWorker(concurrency=3)
+        metrics = worker.run()
+        worker.close()
+
+        self.assertEqual((metrics.processed, metrics.failed), (6, 1))
+        self.assertEqual(sorted(args[0] for _, args, _ in calls), list(range(6)))
+        self.assertEqual(Task.objects.filter(status=Task.Status.SUCCEEDED).count(), 6)
+        self.assertEqual(Task.objects.get(name__endswith='always_fails').status, Task.Status.FAILED)
+        self.assertEqual(Task.objects.filter(name__endswith='record_call').first().result, {'args': [0]})
+
+    def test_run_workers_command(self):
+        "Testing the run_workers command drains the queue and reports its throughput"
+        enqueue(record_call, args=[1])
+        output = StringIO()
+
+        call_command('run_workers', '--concurrency', '2', stdout=output)
+
+        self.assertIn('Ran 1 tasks (0 failed attempts)', output.getvalue())
+        self.assertEqual(Task.objects.get().status, Task.Status.SUCCEEDED)
@@ -0,0 +1,37 @@
+from django.urls import reverse
+from rest_framework import status
+
+from tasks_api.queue import enqueue
+from payments.utils.utils_test import BaseAPITestCase
+
+
+class TestTaskDetailView(BaseAPITestCase):
+
+    def test_view_single_task(self):
+        """Tests GET request returns the status of a queued task"""
+        task = enqueue('accounts_api.balances.compact_shards', priority=3)
+
+        response = self.client.get(reverse('tasks-detail', kwargs={'id': task.id}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'accounts_api.balances.compact_shards')
+        self.assertEqual((response.data['status'], response.data['priority']), ('PENDING', 3))
+
+
+    def test_view_single_invalid_task(self):
+        """Tests GET request for a task that does not exist is unsuccessful"""
+
+        response = self.client.get(reverse('tasks-detail', kwargs={'id': 999}))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['res'], 'Object with task id does not exist')
+
+
+    def test_view_single_task_no_authentication(self):
+        """Tests GET request for a task needs authentication"""
+        task = enqueue('accounts_api.balances.compact_shards')
+
+        self.client.credentials()
+        response = self.client.get(reverse('tasks-detail', kwargs={'id': task.id}))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
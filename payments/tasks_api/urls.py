@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import TaskDetailApiView
+
+urlpatterns = [
+    path('api/<int:id>/', TaskDetailApiView.as_view(), name='tasks-detail')
+]
@@ -0,0 +1,52 @@
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample, OpenApiResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .models import Task
+from .serializers import TaskSerializer
+
+# Create your views here.
+@extend_schema_view(
+    get=extend_schema(
+        operation_id='Get a Task',
+        summary='Get the status and result of a queued task',
+        responses={
+            200: OpenApiResponse(
+                response=TaskSerializer,
+                description='Returns the task, with its result once it has SUCCEEDED or its last error'
+            ),
+            400: OpenApiResponse(
+                response={'Task Not Found'},
+                examples=[
+                    OpenApiExample(
+                        'Task does not exist',
+                        description='Object with task id does not exist',
+                        value={'res': 'Object with task id does not exist'}
+                    )
+                ]
+            )
+        }
+    )
+)
+
+class TaskDetailApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'detail'
+
+    # Get a single task
+    def get(self, request, id, *args, **kwargs):
+        """
+        Retrieves the task with the given id
+        """
+        task = Task.objects.filter(id=id).first()
+        if not task:
+            return Response(
+                {"res": "Object with task id does not exist"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = TaskSerializer(task)
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,116 @@
+import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db import close_old_connections
+
+from payments.utils.utils_metrics import ThroughputMetrics, registry
+
+from .models import Task
+from .queue import (
+    claim_tasks, complete_task, extend_lease, fail_task, release_expired_tasks, run_task, task_setting,
+    DEFAULT_VISIBILITY_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+
+# Seconds between checks for finished tasks and free threads
+POLL_INTERVAL = 0.5
+
+TASKS = registry.counter('payments_tasks_total', 'Tasks run by the workers, by result', ['result'])
+
+
+class TaskWorker:
+    """
+    Runs queued tasks on a pool of threads.
+
+    The worker claims as many due tasks as it has free threads, highest priority first, and claims more as
+    tasks finish. Each claim hides the task from other workers for the visibility timeout, renewed while
+    the task runs, so several run_workers processes can share the queue and a task whose worker dies is
+    picked up again once its lease expires. Tasks should be safe to run more than once.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, visibility_timeout=None, rng=random):
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout or task_setting('TASK_VISIBILITY_TIMEOUT', DEFAULT_VISIBILITY_TIMEOUT)
+        self.rng = rng
+        self.metrics = ThroughputMetrics()
+        self.pool = ThreadPoolExecutor(concurrency, thread_name_prefix='task-worker')
+        self.running = {}
+        self.leases_renewed = time.monotonic()
+
+    def execute(self, task):
+        """Run one task in a pool thread and record its outcome, returning the task's new status"""
+        close_old_connections()
+        try:
+            try:
+                result = run_task(task)
+                if not complete_task(task, result):
+                    logger.warning('Task %s (%s) finished after its lease was lost, its result was dropped', task.id, task.name)
+                    return None
+                return Task.Status.SUCCEEDED
+            except Exception as error:
+                logger.info('Task %s (%s) attempt %s failed: %r', task.id, task.name, task.attempts, error)
+                return fail_task(task, error, self.rng)
+        finally:
+            close_old_connections()
+
+    def fill(self):
+        """Claim due tasks for the free threads, returning the number claimed"""
+        free = self.concurrency - len(self.running)
+        if free <= 0:
+            return 0
+
+        release_expired_tasks()
+        tasks = claim_tasks(free, self.visibility_timeout)
+        for task in tasks:
+            self.running[self.pool.submit(self.execute, task)] = task
+
+        return len(tasks)
+
+    def renew_leases(self):
+        """Extend the leases of the running tasks every half visibility timeout"""
+        if time.monotonic() - self.leases_renewed < self.visibility_timeout / 2:
+            return
+
+        for task in self.running.values():
+            extend_lease(task, self.visibility_timeout)
+        self.leases_renewed = time.monotonic()
+
+    def collect(self, futures):
+        """Count the outcomes of finished tasks"""
+        succeeded = failed = 0
+        for future in futures:
+            task = self.running.pop(future)
+            outcome = future.result()
+            if outcome == Task.Status.SUCCEEDED:
+                succeeded += 1
+                TASKS.inc(result='succeeded')
+            elif outcome is None:
+                TASKS.inc(result='lost')
+            else:
+                failed += 1
+                TASKS.inc(result='retried' if outcome == Task.Status.PENDING else 'failed')
+                logger.debug('Task %s is now %s', task.id, outcome)
+
+        if futures:
+            self.metrics.record_batch(succeeded, failed)
+
+    def run(self):
+        """Run tasks until nothing is due and every claimed task has finished"""
+        while True:
+            self.fill()
+            if not self.running:
+                return self.metrics
+
+            done, _ = wait(self.running, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            self.collect(done)
+            self.renew_leases()
+
+    def close(self):
+        """Wait for the running tasks and shut the thread pool down"""
+        self.pool.shutdown(wait=True)
+        self.collect([future for future in list(self.running) if future.done()])
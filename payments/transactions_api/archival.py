@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import Transaction, ArchivedTransaction
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+DEFAULT_CHUNK_SIZE = 1000
+
+# Columns copied as-is from the hot table, using attnames so foreign keys are copied by id
+ARCHIVED_COLUMNS = [field.attname for field in Transaction._meta.concrete_fields]
+
+
+def archive_horizon():
+    """Cleared transactions dated before this moment are moved to the archive"""
+    days = getattr(settings, 'TRANSACTION_ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_transactions(before=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Move CLEARED transactions dated before the horizon into the archive table in chunks,
+    returning the number of transactions archived
+    """
+    before = before or archive_horizon()
+    archived = 0
+
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Transaction.objects.filter(status=Transaction.Status.CLEARED, transaction_date__lt=before)
+                .order_by('id')
+                .values(*ARCHIVED_COLUMNS)[:chunk_size]
+            )
+            if not rows:
+                break
+
+            ArchivedTransaction.objects.bulk_create([ArchivedTransaction(**row) for row in rows])
+            Transaction.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+        archived += len(rows)
+
+    return archived
+
+
+def latest_archived_date():
+    """The most recent transaction_date held in the archive, or None when it is empty"""
+    return ArchivedTransaction.objects.aggregate(latest=Max('transaction_date'))['latest']
+
+
+def includes_archive(date_from=None):
+    """Check whether a date range starting at date_from reaches into the archived transactions"""
+    latest = latest_archived_date()
+    return latest is not None and (date_from is None or date_from <= latest)
+
+
+def transaction_querysets(date_from=None, date_to=None):
+    """
+    Return the querysets holding the transactions in the date range, oldest table first.
+    The archive table is only queried when the range reaches into it.
+    """
+    filters = {}
+    if date_from is not None:
+        filters['transaction_date__gte'] = date_from
+    if date_to is not None:
+        filters['transaction_date__lte'] = date_to
+
+    querysets = [Transaction.objects.filter(**filters)]
+    if includes_archive(date_from):
+        querysets.insert(0, ArchivedTransaction.objects.filter(**filters))
+
+    return querysets
+
+
+def has_cleared_transactions(account_id):
+    """Check whether any CLEARED transaction, in the hot table or the archive, moved money in or out of the account"""
+    involving = Q(credit_from_id=account_id) | Q(debit_to_id=account_id)
+    return any(
+        model.objects.filter(involving, status=Transaction.Status.CLEARED).exists()
+        for model in (Transaction, ArchivedTransaction)
+    )
@@ -0,0 +1,134 @@
+import logging
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from accounts_api.balances import post_transactions
+from accounts_api.models import Account
+from payments.utils.utils_metrics import ThroughputMetrics
+
+from .models import Transaction
+from .outbox import record_status_changes, PAYLOAD_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def check_transaction(row, accounts):
+    """Apply the business checks to a claimed transaction, returning the reason it was rejected or None"""
+    if row['amount'] <= 0:
+        return 'Amount must be positive'
+
+    if row['credit_from_id'] == row['debit_to_id']:
+        return 'Cannot transfer between the same account'
+
+    for account_id in (row['credit_from_id'], row['debit_to_id']):
+        account = accounts.get(account_id)
+        if account is None or account['status'] != Account.Status.ACTIVE:
+            return f'Account {account_id} is not active'
+        if account['currency'] != row['currency']:
+            return f'Currency does not match account {account_id}'
+
+    return None
+
+
+class ClearingEngine:
+    """
+    Moves UNCLEARED transactions to CLEARED in batches, posting the amounts to the account balances.
+
+    Each batch is claimed with SELECT ... FOR UPDATE SKIP LOCKED where the database supports it,
+    so several engines can run in parallel without clearing the same rows twice. On databases
+    without row locks (SQLite) the final UPDATE is conditional on the row still being UNCLEARED,
+    each row at a time, and only the rows this engine's UPDATE matched are posted and get events.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.metrics = ThroughputMetrics()
+        self.last_id = 0
+
+    def claim_batch(self):
+        """Return the next batch of UNCLEARED transactions after the engine's cursor"""
+        queryset = Transaction.objects.filter(
+            status=Transaction.Status.UNCLEARED, id__gt=self.last_id
+        ).order_by('id')
+
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+
+        return list(queryset.values('id', *PAYLOAD_COLUMNS)[:self.batch_size])
+
+    def mark_cleared(self, rows):
+        """
+        Move the checked rows to CLEARED, returning the ones this engine's UPDATE matched. Only those are
+        posted and get a transaction.cleared event, so a transaction cleared by two engines at once is
+        posted and announced once.
+        """
+        changes = {'status': Transaction.Status.CLEARED, 'last_updated': timezone.now(), 'version': F('version') + 1}
+        uncleared = Transaction.objects.filter(status=Transaction.Status.UNCLEARED)
+
+        if connection.features.has_select_for_update_skip_locked:
+            # The claimed rows are locked until the batch commits, so the update matches every one of them
+            uncleared.filter(id__in=[row['id'] for row in rows]).update(**changes)
+            return rows
+
+        # Without row locks another engine may have cleared some of the rows since they were claimed, and
+        # a single UPDATE would only say how many it matched. Clearing each row with its own conditional
+        # UPDATE tells exactly which ones this engine cleared
+        return [row for row in rows if uncleared.filter(id=row['id']).update(**changes)]
+
+    def clear_batch(self):
+        """Claim, check and clear a single batch, returning the number of transactions claimed"""
+        with transaction.atomic():
+            rows = self.claim_batch()
+            if not rows:
+                return 0
+
+            account_ids = {row['credit_from_id'] for row in rows} | {row['debit_to_id'] for row in rows}
+            accounts = {
+                account['id']: account
+                for account in Account.objects.filter(id__in=account_ids).values('id', 'status', 'currency', 'balance_shards')
+            }
+
+            cleared_rows = []
+            for row in rows:
+                reason = check_transaction(row, accounts)
+                if reason:
+                    logger.info('Transaction %s not cleared: %s', row['id'], reason)
+                else:
+                    cleared_rows.append(row)
+
+            checked = len(cleared_rows)
+            if cleared_rows:
+                cleared_rows = self.mark_cleared(cleared_rows)
+
+                for row in cleared_rows:
+                    row['status'] = Transaction.Status.CLEARED
+
+                # Written in the same atomic block as the update, so the balances, events and statuses
+                # are committed together
+                post_transactions(
+                    [(row['credit_from_id'], row['debit_to_id'], row['amount']) for row in cleared_rows],
+                    shard_counts={account_id: account['balance_shards'] for account_id, account in accounts.items()}
+                )
+                record_status_changes(cleared_rows, Transaction.Status.UNCLEARED)
+
+        self.last_id = rows[-1]['id']
+        self.metrics.record_batch(len(cleared_rows), len(rows) - checked)
+        return len(rows)
+
+    def run(self, max_batches=None):
+        """Clear batches until no UNCLEARED transactions are left after the cursor"""
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            if not self.clear_batch():
+                break
+            batches += 1
+
+        return self.metrics
+
+    def reset(self):
+        """Move the cursor back to the start so rejected transactions are checked again"""
+        self.last_id = 0
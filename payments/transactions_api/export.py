@@ -0,0 +1,27 @@
+from itertools import chain
+
+from payments.utils.utils_columnar import Column, queryset_chunks, DECIMAL, DICTIONARY, INT, STRING, TIMESTAMP, DEFAULT_CHUNK_SIZE
+
+from .models import Transaction, ArchivedTransaction
+
+TRANSACTION_COLUMNS = [
+    Column('id', INT),
+    Column('transaction_guid', STRING),
+    Column('created_on', TIMESTAMP),
+    Column('transaction_type', DICTIONARY),
+    Column('credit_from_id', INT),
+    Column('debit_to_id', INT),
+    Column('amount', DECIMAL, scale=Transaction._meta.get_field('amount').decimal_places),
+    Column('currency', DICTIONARY),
+    Column('transaction_date', TIMESTAMP),
+    Column('status', DICTIONARY),
+    Column('last_updated', TIMESTAMP),
+]
+
+
+def transaction_chunks(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Chunks of every transaction, the archived ones first"""
+    return chain(
+        queryset_chunks(ArchivedTransaction.objects.all(), TRANSACTION_COLUMNS, chunk_size),
+        queryset_chunks(Transaction.objects.all(), TRANSACTION_COLUMNS, chunk_size)
+    )
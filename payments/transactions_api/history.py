@@ -0,0 +1,95 @@
+import base64
+import heapq
+from datetime import datetime
+
+from .archival import includes_archive
+from .models import Transaction, ArchivedTransaction
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# The account side(s) read for each direction filter
+DIRECTION_FIELDS = {
+    'all': ['credit_from', 'debit_to'],
+    'credit_from': ['credit_from'],
+    'debit_to': ['debit_to'],
+}
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(transaction):
+    """Encode the position after the transaction as an opaque cursor"""
+    position = f'{transaction.transaction_date.isoformat()}|{transaction.id}'
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into the (transaction_date, id) it points after"""
+    try:
+        transaction_date, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(transaction_date), int(transaction_id)
+    except (ValueError, UnicodeDecodeError) as error:
+        raise InvalidCursorError('Invalid cursor') from error
+
+
+def _side_queryset(model, account_field, account_id, date_from, date_to, after, limit):
+    """
+    One side of the account's ledger in one table, newest first, limited to a page.
+    Every filter is a prefix or range of the (account, transaction_date, id) index, so the scan stops
+    after limit rows however many transactions the account or the ledger holds.
+    """
+    queryset = model.objects.filter(**{account_field: account_id})
+    if date_from is not None:
+        queryset = queryset.filter(transaction_date__gte=date_from)
+    if date_to is not None:
+        queryset = queryset.filter(transaction_date__lte=date_to)
+    if after is not None:
+        after_date, after_id = after
+        # (transaction_date, id) < (after_date, after_id), written as a range the index can seek to
+        queryset = queryset.filter(transaction_date__lte=after_date).exclude(
+            transaction_date=after_date, id__gte=after_id
+        )
+
+    return queryset.order_by('-transaction_date', '-id')[:limit]
+
+
+def account_history(account_id, direction='all', date_from=None, date_to=None, cursor=None, limit=DEFAULT_PAGE_SIZE, annotations=None):
+    """
+    Return (transactions, next_cursor) for one page of the account's transactions, newest first.
+
+    Each side of the ledger, in the hot table and in the archive when the range reaches into it,
+    is read as its own limited index scan and the sorted pages are merged. Transactions the account
+    both credits and debits appear on both sides and are only returned once.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    models = [Transaction]
+    if includes_archive(date_from):
+        models.append(ArchivedTransaction)
+
+    pages = []
+    for model in models:
+        for account_field in DIRECTION_FIELDS[direction]:
+            queryset = _side_queryset(model, account_field, account_id, date_from, date_to, after, limit + 1)
+            if annotations:
+                queryset = queryset.annotate(**annotations)
+            pages.append(queryset)
+
+    transactions = []
+    seen = set()
+    for transaction in heapq.merge(*pages, key=lambda row: (row.transaction_date, row.id), reverse=True):
+        if transaction.id in seen:
+            continue
+        seen.add(transaction.id)
+        transactions.append(transaction)
+        if len(transactions) > limit:
+            break
+
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        next_cursor = encode_cursor(transactions[-1])
+
+    return transactions, next_cursor
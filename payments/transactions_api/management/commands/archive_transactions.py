@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from transactions_api.archival import archive_horizon, archive_transactions, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Moves CLEARED transactions older than the archive horizon into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Archive transactions older than this many days (defaults to TRANSACTION_ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Number of transactions moved per database transaction')
+
+    def handle(self, *args, **options):
+        if options['days'] is None:
+            before = archive_horizon()
+        else:
+            before = timezone.now() - timedelta(days=options['days'])
+
+        archived = archive_transactions(before=before, chunk_size=options['chunk_size'])
+        self.stdout.write(f'Archived {archived} transactions dated before {before.isoformat()}')
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from transactions_api.clearing import ClearingEngine, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Moves UNCLEARED transactions that pass the clearing checks to CLEARED in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Number of transactions claimed per batch')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling for new transactions')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to wait between polls when running with --loop')
+
+    def handle(self, *args, **options):
+        engine = ClearingEngine(batch_size=options['batch_size'])
+
+        try:
+            while True:
+                batches = engine.metrics.batches
+                engine.run(max_batches=options['max_batches'])
+                if not options['loop'] or engine.metrics.batches > batches:
+                    self.report(engine.metrics)
+
+                if not options['loop']:
+                    break
+
+                engine.reset()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.report(engine.metrics)
+
+    def report(self, metrics):
+        """Write the throughput of the engine so far"""
+        self.stdout.write(
+            f'Cleared {metrics.processed} transactions ({metrics.failed} rejected) in {metrics.batches} batches, '
+            f'{metrics.rate:.1f} transactions/s'
+        )
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from transactions_api.summaries import refresh_summaries, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Brings the daily account summaries up to date, recomputing only the days with transactions changed since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every summary, e.g. after transactions were deleted')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Number of summaries inserted per query')
+        parser.add_argument('--loop', action='store_true', help='Keep running, refreshing periodically')
+        parser.add_argument('--interval', type=float, default=60.0, help='Seconds to wait between refreshes when running with --loop')
+
+    def handle(self, *args, **options):
+        full = options['full']
+        try:
+            while True:
+                started = time.monotonic()
+                days, written = refresh_summaries(full=full, batch_size=options['batch_size'])
+                self.stdout.write(
+                    f'Refreshed {written} summaries over {days} days in {time.monotonic() - started:.2f}s'
+                    + (' (full)' if full else '')
+                )
+
+                if not options['loop']:
+                    break
+
+                full = False
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from transactions_api.outbox import OutboxRelay, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Delivers the transaction events in the outbox to the OUTBOX_SINK in batches, at least once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Number of events sent per batch')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling for new events')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to wait between polls when running with --loop')
+
+    def handle(self, *args, **options):
+        relay = OutboxRelay(batch_size=options['batch_size'])
+
+        try:
+            while True:
+                batches = relay.metrics.batches
+                relay.run(max_batches=options['max_batches'])
+                if not options['loop'] or relay.metrics.batches > batches:
+                    self.report(relay.metrics)
+
+                if not options['loop']:
+                    break
+
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.report(relay.metrics)
+
+    def report(self, metrics):
+        """Write the throughput of the relay so far"""
+        self.stdout.write(
+            f'Relayed {metrics.processed} events ({metrics.failed} failed) in {metrics.batches} batches, '
+            f'{metrics.rate:.1f} events/s'
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts_api', '0008_rename_base_currency_account_currency'),
+        ('transactions_api', '0004_transaction_status_transaction_transaction_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('transaction_guid', models.UUIDField(editable=False)),
+                ('created_on', models.DateTimeField()),
+                ('transaction_type', models.CharField(choices=[('CREDIT', 'Credit'), ('DEBIT', 'Debit')], max_length=6)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=19)),
+                ('currency', models.CharField(max_length=3)),
+                ('transaction_date', models.DateTimeField(db_index=True)),
+                ('status', models.CharField(choices=[('CLEARED', 'Cleared'), ('UNCLEARED', 'Uncleared')], max_length=9)),
+                ('last_updated', models.DateTimeField()),
+                ('archived_on', models.DateTimeField(auto_now_add=True)),
+                ('credit_from', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts_api.account')),
+                ('debit_to', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts_api.account')),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts_api', '0008_rename_base_currency_account_currency'),
+        ('transactions_api', '0005_archivedtransaction'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedtransaction',
+            index=models.Index(fields=['credit_from', 'transaction_date', 'id'], name='archived_credit_from_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtransaction',
+            index=models.Index(fields=['debit_to', 'transaction_date', 'id'], name='archived_debit_to_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['credit_from', 'transaction_date', 'id'], name='txn_credit_from_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['debit_to', 'transaction_date', 'id'], name='txn_debit_to_date_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:24
+
+import uuid
+from django.db import migrations, models
+
+
+def regenerate_duplicate_guids(apps, schema_editor):
+    """
+    Adding transaction_guid gave every existing row the same default value,
+    so give each duplicate a fresh GUID before the unique indexes are created
+    """
+    for model_name in ['Transaction', 'ArchivedTransaction']:
+        model = apps.get_model('transactions_api', model_name)
+        seen = set()
+        for row in model.objects.order_by('id').only('id', 'transaction_guid'):
+            if row.transaction_guid in seen:
+                row.transaction_guid = uuid.uuid4()
+                row.save(update_fields=['transaction_guid'])
+            seen.add(row.transaction_guid)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions_api', '0006_account_history_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(regenerate_duplicate_guids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='archivedtransaction',
+            name='transaction_guid',
+            field=models.UUIDField(editable=False, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='transaction_guid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
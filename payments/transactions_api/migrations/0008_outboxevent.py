@@ -0,0 +1,30 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:26
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions_api', '0007_unique_transaction_guid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('transaction.created', 'Transaction Created'), ('transaction.cleared', 'Transaction Cleared')], max_length=32)),
+                ('transaction_guid', models.UUIDField()),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('published_on', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('published_on__isnull', True)), fields=['id'], name='outbox_unpublished_idx')],
+            },
+        ),
+    ]
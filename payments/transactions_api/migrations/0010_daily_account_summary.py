@@ -0,0 +1,57 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts_api', '0012_account_opening_balance'),
+        ('transactions_api', '0009_transaction_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAccountSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('currency', models.CharField(max_length=3)),
+                ('credit_from_count', models.PositiveIntegerField(default=0)),
+                ('credit_from_amount', models.DecimalField(decimal_places=2, default=0, max_digits=19)),
+                ('debit_to_count', models.PositiveIntegerField(default=0)),
+                ('debit_to_amount', models.DecimalField(decimal_places=2, default=0, max_digits=19)),
+                ('refreshed_on', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SummaryWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('watermark', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedtransaction',
+            index=models.Index(fields=['last_updated'], name='archived_last_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['last_updated'], name='txn_last_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailyaccountsummary',
+            name='account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts_api.account'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyaccountsummary',
+            index=models.Index(fields=['day', 'currency'], name='summary_day_currency_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyaccountsummary',
+            constraint=models.UniqueConstraint(fields=('account', 'day', 'currency'), name='unique_daily_account_summary'),
+        ),
+    ]
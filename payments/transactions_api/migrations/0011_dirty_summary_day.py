@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-19 15:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts_api', '0013_account_search'),
+        ('transactions_api', '0010_daily_account_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirtySummaryDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts_api.account')),
+            ],
+        ),
+    ]
@@ -1,4 +1,5 @@
 import uuid
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.db import models
 
@@ -11,7 +12,7 @@ class Transaction(models.Model):
         CLEARED = "CLEARED"
         UNCLEARED = "UNCLEARED"    
 
-    transaction_guid = models.UUIDField( default=uuid.uuid4, editable=False)
+    transaction_guid = models.UUIDField( default=uuid.uuid4, editable=False, unique=True)
     created_on = models.DateTimeField(auto_now_add=True)
     transaction_type = models.CharField(max_length=6, choices=TransactionType,default=TransactionType.CREDIT)
     credit_from = models.ForeignKey("accounts_api.Account", on_delete=models.CASCADE, related_name='+')
@@ -20,4 +21,102 @@ class Transaction(models.Model):
     currency = models.CharField(max_length=3)
     transaction_date = models.DateTimeField(default=timezone.now)
     status = models.CharField(max_length=9, choices=Status, default=Status.UNCLEARED)
-    last_updated = models.DateTimeField(auto_now=True)
\ No newline at end of file
+    last_updated = models.DateTimeField(auto_now=True)
+    # Incremented by every write, see payments.utils.utils_concurrency
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        # Per-account history reads one side of the ledger newest first, so each side gets an index
+        # on (account, transaction_date, id) that serves the filter, the ordering and the cursor
+        indexes = [
+            models.Index(fields=['credit_from', 'transaction_date', 'id'], name='txn_credit_from_date_idx'),
+            models.Index(fields=['debit_to', 'transaction_date', 'id'], name='txn_debit_to_date_idx'),
+            # Finds the rows changed since the daily summaries were last refreshed
+            models.Index(fields=['last_updated'], name='txn_last_updated_idx'),
+        ]
+
+class ArchivedTransaction(models.Model):
+    """CLEARED transactions moved out of the hot table once they are older than the archive horizon"""
+
+    id = models.BigIntegerField(primary_key=True)
+    transaction_guid = models.UUIDField(editable=False, unique=True)
+    created_on = models.DateTimeField()
+    transaction_type = models.CharField(max_length=6, choices=Transaction.TransactionType)
+    credit_from = models.ForeignKey("accounts_api.Account", on_delete=models.CASCADE, related_name='+')
+    debit_to = models.ForeignKey("accounts_api.Account", on_delete=models.CASCADE, related_name='+')
+    amount = models.DecimalField(max_digits=19, decimal_places=2)
+    currency = models.CharField(max_length=3)
+    transaction_date = models.DateTimeField(db_index=True)
+    status = models.CharField(max_length=9, choices=Transaction.Status)
+    last_updated = models.DateTimeField()
+    version = models.PositiveIntegerField(default=1)
+    archived_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['credit_from', 'transaction_date', 'id'], name='archived_credit_from_date_idx'),
+            models.Index(fields=['debit_to', 'transaction_date', 'id'], name='archived_debit_to_date_idx'),
+            models.Index(fields=['last_updated'], name='archived_last_updated_idx'),
+        ]
+
+class OutboxEvent(models.Model):
+    """
+    Transaction events waiting to be published, written in the same database transaction as the change
+    they describe and delivered at least once by the relay_outbox command
+    """
+
+    class EventType(models.TextChoices):
+        TRANSACTION_CREATED = "transaction.created"
+        TRANSACTION_CLEARED = "transaction.cleared"
+
+    event_type = models.CharField(max_length=32, choices=EventType)
+    # Referenced by GUID rather than a foreign key, so archiving or deleting the transaction keeps its events
+    transaction_guid = models.UUIDField()
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_on = models.DateTimeField(auto_now_add=True)
+    published_on = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(published_on__isnull=True), name='outbox_unpublished_idx'),
+        ]
+
+class DailyAccountSummary(models.Model):
+    """
+    An account's transactions on one day in one currency, on each side of the ledger, across the hot and
+    archive tables. Kept up to date by the refresh_summaries command, see transactions_api.summaries
+    """
+
+    account = models.ForeignKey("accounts_api.Account", on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+    currency = models.CharField(max_length=3)
+    credit_from_count = models.PositiveIntegerField(default=0)
+    credit_from_amount = models.DecimalField(max_digits=19, decimal_places=2, default=0)
+    debit_to_count = models.PositiveIntegerField(default=0)
+    debit_to_amount = models.DecimalField(max_digits=19, decimal_places=2, default=0)
+    refreshed_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'day', 'currency'], name='unique_daily_account_summary'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'currency'], name='summary_day_currency_idx'),
+        ]
+
+class DirtySummaryDay(models.Model):
+    """
+    An account's day whose summaries a transaction change left stale without leaving a newer last_updated
+    behind on that day: a delete, or a move to another day or other accounts. Drained by the next refresh
+    """
+
+    account = models.ForeignKey("accounts_api.Account", on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+
+class SummaryWatermark(models.Model):
+    """The last_updated time up to which a summary has been refreshed"""
+
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField()
@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import queue
+import urllib.request
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from payments.utils.utils_metrics import ThroughputMetrics, registry
+
+from webhooks_api.deliveries import enqueue_status_changes
+
+from .models import Transaction, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+RELAYED = registry.counter('payments_outbox_events_total', 'Outbox events handed to the sink, by result', ['result'])
+
+# Transaction columns copied into the event payload
+PAYLOAD_COLUMNS = [
+    'transaction_guid', 'transaction_type', 'credit_from_id', 'debit_to_id',
+    'amount', 'currency', 'transaction_date', 'status'
+]
+
+
+def transaction_row(instance):
+    """The payload columns of a transaction instance, in the shape returned by values(*PAYLOAD_COLUMNS)"""
+    return {column: getattr(instance, column) for column in PAYLOAD_COLUMNS}
+
+
+def event_payload(row):
+    """The event data for a transaction row, named like the API fields"""
+    return {column.removesuffix('_id'): row[column] for column in PAYLOAD_COLUMNS}
+
+
+def record_events(event_type, rows):
+    """
+    Add an event per transaction row to the outbox. Call inside the atomic block that writes the
+    transactions, so the events are committed or rolled back with them.
+    """
+    if not rows:
+        return
+
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(event_type=event_type, transaction_guid=row['transaction_guid'], payload=event_payload(row))
+        for row in rows
+    ])
+
+
+def record_event(event_type, instance):
+    """Add an event for a single transaction to the outbox"""
+    record_events(event_type, [transaction_row(instance)])
+
+
+def record_status_changes(rows, previous_status):
+    """
+    Queue the webhook deliveries for transactions whose status changed from previous_status, and add
+    a cleared event to the outbox for those moved to CLEARED. Call inside the same atomic block as the change.
+    """
+    enqueue_status_changes([{**event_payload(row), 'previous_status': previous_status} for row in rows])
+    record_events(
+        OutboxEvent.EventType.TRANSACTION_CLEARED,
+        [row for row in rows if row['status'] == Transaction.Status.CLEARED]
+    )
+
+
+def record_status_change(instance, previous_status):
+    """Record the events for an update to a single transaction, if it changed the status"""
+    if instance.status != previous_status:
+        record_status_changes([transaction_row(instance)], previous_status)
+
+
+def event_message(event):
+    """The message delivered for an event. Consumers deduplicate redeliveries on id"""
+    return {
+        'id': event.id,
+        'type': event.event_type,
+        'occurred_on': event.created_on,
+        'data': event.payload
+    }
+
+
+# Sinks the relay delivers to. send() must raise if any message in the batch was not delivered
+
+class FileSink:
+    """Appends each message to a JSON lines file, synced to disk before the batch is acknowledged"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, messages):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for message in messages:
+                file.write(json.dumps(message, cls=DjangoJSONEncoder) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+
+local_queue = queue.Queue()
+
+
+class LocalQueueSink:
+    """Puts each message on an in-process queue, for consumers running in the same process and for tests"""
+
+    def __init__(self, queue=local_queue):
+        self.queue = queue
+
+    def send(self, messages):
+        for message in messages:
+            self.queue.put(message)
+
+
+class HttpSink:
+    """POSTs each batch as a JSON array, treating any non-2xx response as a failed delivery"""
+
+    def __init__(self, url, timeout=10, headers=None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+
+    def send(self, messages):
+        body = json.dumps(messages, cls=DjangoJSONEncoder).encode()
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method='POST')
+        # urlopen raises HTTPError for non-2xx responses
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def get_sink():
+    """Build the sink configured in OUTBOX_SINK"""
+    config = settings.OUTBOX_SINK
+    return import_string(config['CLASS'])(**config.get('OPTIONS', {}))
+
+
+class OutboxRelay:
+    """
+    Drains the outbox to a sink in batches, oldest event first.
+
+    Events are marked published only after the sink accepted the whole batch, so a crash between the
+    two re-sends the batch: delivery is at least once. A failed batch is left in the outbox with its
+    attempts counted and the relay stops, to be retried on the next run.
+    """
+
+    def __init__(self, sink=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.sink = sink or get_sink()
+        self.batch_size = batch_size
+        self.metrics = ThroughputMetrics()
+
+    def claim_batch(self):
+        """Return the next batch of unpublished events"""
+        queryset = OutboxEvent.objects.filter(published_on__isnull=True).order_by('id')
+
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+
+        return list(queryset[:self.batch_size])
+
+    def relay_batch(self):
+        """Send a single batch, returning the number of events published"""
+        with transaction.atomic():
+            events = self.claim_batch()
+            if not events:
+                return 0
+
+            ids = [event.id for event in events]
+            try:
+                self.sink.send([event_message(event) for event in events])
+            except Exception as error:
+                logger.warning('Outbox batch of %s events not delivered: %s', len(events), error)
+                OutboxEvent.objects.filter(id__in=ids).update(attempts=F('attempts') + 1, last_error=str(error))
+                self.metrics.record_batch(0, len(events))
+                RELAYED.inc(len(events), result='failed')
+                return 0
+
+            OutboxEvent.objects.filter(id__in=ids).update(published_on=timezone.now(), attempts=F('attempts') + 1)
+
+        self.metrics.record_batch(len(events))
+        RELAYED.inc(len(events), result='published')
+        return len(events)
+
+    def run(self, max_batches=None):
+        """Relay batches until the outbox is empty, a batch fails or max_batches is reached"""
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            if not self.relay_batch():
+                break
+            batches += 1
+
+        return self.metrics
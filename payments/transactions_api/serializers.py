@@ -1,13 +1,97 @@
 from rest_framework import serializers
 
 from .models import Transaction
-from payments.utils.utils_serializers import validate_currency
+from .history import DIRECTION_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, InvalidCursorError
+from fx_api.serializers import CurrencyConversionSerializer
+from payments.utils.utils_serializers import validate_currency, validate_amount_for_currency
 
 class TransactionSerializer(serializers.ModelSerializer):
 
     currency=serializers.CharField(validators=[validate_currency])
+    converted_amount = serializers.DecimalField(max_digits=19, decimal_places=2, read_only=True)
+    version = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Transaction
-        fields = ["transaction_guid", "transaction_type", "credit_from", "debit_to", "amount", "currency", "transaction_date", "status", "last_updated"]
-        read_only = ["transaction_guid", "last_updated"]
\ No newline at end of file
+        fields = ["transaction_guid", "transaction_type", "credit_from", "debit_to", "amount", "currency", "transaction_date", "status", "last_updated", "converted_amount", "version"]
+        read_only = ["transaction_guid", "last_updated"]
+
+    def validate(self, attrs):
+        """Check the amount fits the minor units of the transaction currency"""
+        return validate_amount_for_currency(attrs, self.instance, 'amount')
+
+class TransactionGuidLookupResultSerializer(serializers.Serializer):
+    results = serializers.DictField(child=TransactionSerializer())
+    missing = serializers.ListField(child=serializers.UUIDField())
+
+class TransactionFilterSerializer(CurrencyConversionSerializer):
+    date_from = serializers.DateTimeField(required=False)
+    date_to = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        """Check that the date range is not reversed"""
+        if 'date_from' in attrs and 'date_to' in attrs and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError('date_from must be before date_to')
+
+        return attrs
+
+
+class AccountTransactionsFilterSerializer(TransactionFilterSerializer):
+    direction = serializers.ChoiceField(choices=list(DIRECTION_FIELDS), default='all')
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_PAGE_SIZE, default=DEFAULT_PAGE_SIZE)
+
+    def validate_cursor(self, value):
+        """Check the cursor was issued by a previous page"""
+        try:
+            decode_cursor(value)
+        except InvalidCursorError as error:
+            raise serializers.ValidationError(str(error))
+
+        return value
+
+
+class AccountTransactionsSerializer(serializers.Serializer):
+    next_cursor = serializers.CharField(allow_null=True)
+    results = TransactionSerializer(many=True)
+
+
+class TransactionTotalSerializer(serializers.Serializer):
+    currency = serializers.CharField()
+    count = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=19, decimal_places=2)
+    converted_amount = serializers.DecimalField(max_digits=19, decimal_places=2, required=False)
+
+
+class TransactionTotalsSerializer(serializers.Serializer):
+    convert_to = serializers.CharField(required=False)
+    converted_total = serializers.DecimalField(max_digits=19, decimal_places=2, required=False)
+    totals = TransactionTotalSerializer(many=True)
+
+
+class DailySummaryFilterSerializer(serializers.Serializer):
+    account = serializers.IntegerField(required=False, min_value=1)
+    currency = serializers.CharField(required=False, validators=[validate_currency])
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        """Check the date range is not reversed"""
+        if 'date_from' in attrs and 'date_to' in attrs and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError('date_from must be before date_to')
+
+        return attrs
+
+
+class DailySummarySerializer(serializers.Serializer):
+    day = serializers.DateField()
+    currency = serializers.CharField()
+    credit_from_count = serializers.IntegerField()
+    credit_from_amount = serializers.DecimalField(max_digits=19, decimal_places=2)
+    debit_to_count = serializers.IntegerField()
+    debit_to_amount = serializers.DecimalField(max_digits=19, decimal_places=2)
+
+
+class DailySummariesSerializer(serializers.Serializer):
+    refreshed_to = serializers.DateTimeField(allow_null=True)
+    results = DailySummarySerializer(many=True)
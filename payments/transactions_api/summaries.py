@@ -0,0 +1,176 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Transaction, ArchivedTransaction, DailyAccountSummary, DirtySummaryDay, SummaryWatermark
+
+# Daily summaries per account and currency.
+# Each refresh finds the transactions whose last_updated moved past the watermark, and recomputes only the
+# (account, day) pairs they touch, from both the hot and archive tables. Changes that leave no row behind on
+# the day and accounts they leave, deleting a transaction or moving it to another day or other accounts, are
+# recorded as DirtySummaryDay rows by the transaction views and recomputed by the next refresh as well.
+
+SUMMARY_NAME = 'daily_account_summary'
+
+DEFAULT_REFRESH_LAG = 60
+DEFAULT_BATCH_SIZE = 1000
+REBUILD_WINDOW_DAYS = 31
+
+SIDES = ('credit_from', 'debit_to')
+TABLES = (ArchivedTransaction, Transaction)
+
+# Transaction fields that decide which summaries include it
+SUMMARY_FIELDS = {'transaction_date', 'credit_from', 'debit_to'}
+
+
+def refresh_lag():
+    """
+    How far behind the start of a refresh the watermark is kept, so transactions that were already
+    stamped but not yet committed when the refresh read the table are picked up by the next one
+    """
+    return timedelta(seconds=getattr(settings, 'SUMMARY_REFRESH_LAG', DEFAULT_REFRESH_LAG))
+
+
+def day_range(day):
+    """The start and end of a day in the current time zone"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
+
+
+def summary_days(instance):
+    """The (day, account id) pairs whose summaries include the transaction"""
+    day = timezone.localdate(instance.transaction_date)
+    return {(day, instance.credit_from_id), (day, instance.debit_to_id)}
+
+
+def mark_summaries_dirty(days):
+    """
+    Have the next refresh recompute the summaries of the (day, account id) pairs, as summary_days returned
+    them before a transaction was deleted or moved. Call inside the atomic block of the change
+    """
+    DirtySummaryDay.objects.bulk_create([DirtySummaryDay(day=day, account_id=account_id) for day, account_id in days])
+
+
+def touched_days(since):
+    """Map each day with transactions changed since the watermark to the accounts on either side of them"""
+    touched = defaultdict(set)
+    for model in TABLES:
+        rows = (
+            model.objects.filter(last_updated__gte=since).order_by()
+            .annotate(day=TruncDate('transaction_date'))
+            .values_list('day', 'credit_from_id', 'debit_to_id').distinct()
+        )
+        for day, credit_from_id, debit_to_id in rows:
+            touched[day].update((credit_from_id, debit_to_id))
+
+    return touched
+
+
+def summarise(start, end, account_ids=None):
+    """
+    Summaries of the transactions dated in [start, end), for every account or only the given ones, keyed by
+    (account id, day, currency) with one grouped query per side of the ledger and table
+    """
+    summaries = {}
+    for model in TABLES:
+        for side in SIDES:
+            queryset = model.objects.filter(transaction_date__gte=start, transaction_date__lt=end)
+            if account_ids is not None:
+                queryset = queryset.filter(**{f'{side}__in': account_ids})
+
+            rows = (
+                queryset.order_by()
+                .values(side, 'currency', day=TruncDate('transaction_date'))
+                .annotate(count=Count('id'), amount=Sum('amount'))
+            )
+            for row in rows:
+                key = (row[side], row['day'], row['currency'])
+                if key not in summaries:
+                    summaries[key] = DailyAccountSummary(account_id=key[0], day=key[1], currency=key[2])
+                summary = summaries[key]
+                setattr(summary, f'{side}_count', getattr(summary, f'{side}_count') + row['count'])
+                setattr(summary, f'{side}_amount', getattr(summary, f'{side}_amount') + row['amount'])
+
+    return list(summaries.values())
+
+
+def refresh_days(touched, batch_size=DEFAULT_BATCH_SIZE):
+    """Recompute the summaries of the touched accounts on each touched day, returning the number written"""
+    written = 0
+    for day, account_ids in sorted(touched.items()):
+        summaries = summarise(*day_range(day), account_ids=account_ids)
+        DailyAccountSummary.objects.filter(day=day, account_id__in=account_ids).delete()
+        DailyAccountSummary.objects.bulk_create(summaries, batch_size=batch_size)
+        written += len(summaries)
+
+    return written
+
+
+def rebuild(batch_size=DEFAULT_BATCH_SIZE, window_days=REBUILD_WINDOW_DAYS):
+    """
+    Recompute every summary from scratch, window_days at a time so memory stays bounded,
+    returning the number of days and summaries written
+    """
+    DailyAccountSummary.objects.all().delete()
+
+    dates = [
+        model.objects.aggregate(first=Min('transaction_date'), last=Max('transaction_date')) for model in TABLES
+    ]
+    firsts = [bounds['first'] for bounds in dates if bounds['first'] is not None]
+    if not firsts:
+        return 0, 0
+
+    day = timezone.localdate(min(firsts))
+    last_day = timezone.localdate(max(bounds['last'] for bounds in dates if bounds['last'] is not None))
+    days = set()
+    written = 0
+    while day <= last_day:
+        window_end = day + timedelta(days=window_days)
+        summaries = summarise(day_range(day)[0], day_range(window_end)[0])
+        DailyAccountSummary.objects.bulk_create(summaries, batch_size=batch_size)
+        days.update(summary.day for summary in summaries)
+        written += len(summaries)
+        day = window_end
+
+    return len(days), written
+
+
+def refresh_summaries(full=False, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Bring the daily summaries up to date, incrementally from the watermark unless full is set or there is
+    no watermark yet. Returns the number of days refreshed and summaries written.
+    Refreshes run in one transaction holding the watermark row, so readers never see a half-done refresh
+    and concurrent refreshes queue up instead of writing the same rows.
+    """
+    started = timezone.now()
+    with transaction.atomic():
+        watermark, created = SummaryWatermark.objects.select_for_update().get_or_create(
+            name=SUMMARY_NAME, defaults={'watermark': started}
+        )
+
+        # Only the rows read here are drained, so days marked while the refresh runs are left for the next one
+        dirty = list(DirtySummaryDay.objects.values_list('id', 'day', 'account_id'))
+        if full or created:
+            days, written = rebuild(batch_size)
+        else:
+            touched = touched_days(watermark.watermark)
+            for _, day, account_id in dirty:
+                touched[day].add(account_id)
+            days, written = len(touched), refresh_days(touched, batch_size)
+        DirtySummaryDay.objects.filter(id__in=[dirty_id for dirty_id, _, _ in dirty]).delete()
+
+        watermark.watermark = started - refresh_lag()
+        watermark.save(update_fields=['watermark'])
+
+    return days, written
+
+
+def refreshed_to():
+    """The watermark of the last refresh, None before the first"""
+    return SummaryWatermark.objects.filter(name=SUMMARY_NAME).values_list('watermark', flat=True).first()
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from accounts_api.models import Account
+from transactions_api.archival import archive_transactions, includes_archive, transaction_querysets
+from transactions_api.models import Transaction, ArchivedTransaction
+from payments.utils.utils_test import BaseAPITestCase
+
+
+class ArchivalTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        account_one = Account.objects.create(account_name='Test Account 1', status=Account.Status.ACTIVE, balance=120000.00, currency='GBP')
+        account_two = Account.objects.create(account_name='Test Account 2', status=Account.Status.ACTIVE, balance=250000.00, currency='GBP')
+        old_date = timezone.now() - timedelta(days=400)
+
+        cls.old_cleared = Transaction.objects.create(
+            credit_from=account_one, debit_to=account_two, amount=230.00, currency='GBP', status=Transaction.Status.CLEARED, transaction_date=old_date
+        )
+        cls.old_uncleared = Transaction.objects.create(
+            credit_from=account_one, debit_to=account_two, amount=130.00, currency='GBP', status=Transaction.Status.UNCLEARED, transaction_date=old_date
+        )
+        cls.recent_cleared = Transaction.objects.create(
+            credit_from=account_two, debit_to=account_one, amount=80.00, currency='GBP', status=Transaction.Status.CLEARED
+        )
+
+    def test_only_old_cleared_transactions_are_archived(self):
+        "Testing only CLEARED transactions older than the horizon are moved"
+        archived = archive_transactions(chunk_size=1)
+
+        self.assertEqual(archived, 1)
+        self.assertFalse(Transaction.objects.filter(id=self.old_cleared.id).exists())
+        self.assertTrue(Transaction.objects.filter(id=self.old_uncleared.id).exists())
+        self.assertTrue(Transaction.objects.filter(id=self.recent_cleared.id).exists())
+
+        archived_record = ArchivedTransaction.objects.get(id=self.old_cleared.id)
+
+        self.assertEqual(archived_record.transaction_guid, self.old_cleared.transaction_guid)
+        self.assertEqual(archived_record.credit_from_id, self.old_cleared.credit_from_id)
+
+    def test_archive_only_queried_when_range_reaches_into_it(self):
+        "Testing the archive table is skipped for date ranges after the latest archived transaction"
+        self.assertFalse(includes_archive())
+
+        archive_transactions()
+
+        self.assertTrue(includes_archive())
+        self.assertTrue(includes_archive(timezone.now() - timedelta(days=500)))
+        self.assertFalse(includes_archive(timezone.now() - timedelta(days=30)))
+        self.assertEqual(len(transaction_querysets(date_from=timezone.now() - timedelta(days=30))), 1)
+
+    def test_archive_transactions_command(self):
+        "Testing the management command archives transactions older than the given number of days"
+        out = StringIO()
+
+        call_command('archive_transactions', days=500, stdout=out)
+        self.assertIn('Archived 0 transactions', out.getvalue())
+
+        call_command('archive_transactions', stdout=out)
+        self.assertIn('Archived 1 transactions', out.getvalue())
+
+
+class TestArchivedTransactionListView(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.old_cleared = Transaction.objects.create(
+            credit_from=cls.test_account_one, debit_to=cls.test_account_two, amount=230.00, currency='EUR',
+            status=Transaction.Status.CLEARED, transaction_date=timezone.now() - timedelta(days=400)
+        )
+        cls.recent = Transaction.objects.create(
+            credit_from=cls.test_account_two, debit_to=cls.test_account_one, amount=80.00, currency='EUR'
+        )
+        archive_transactions()
+
+    def test_list_includes_archived_transactions(self):
+        """Tests GET request without a date range includes archived transactions"""
+
+        response = self.client.get(reverse('transactions-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['transaction_guid'] for item in response.data],
+            [str(self.old_cleared.transaction_guid), str(self.recent.transaction_guid)]
+        )
+
+    def test_list_with_recent_date_range_excludes_archive(self):
+        """Tests GET request with a date range after the archive only returns hot transactions"""
+
+        date_from = (timezone.now() - timedelta(days=30)).isoformat()
+
+        response = self.client.get(reverse('transactions-list'), {'date_from': date_from})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['transaction_guid'] for item in response.data], [str(self.recent.transaction_guid)])
+
+    def test_list_with_invalid_date_range(self):
+        """Tests GET request is unsuccessful when the date range is reversed"""
+
+        response = self.client.get(reverse('transactions-list'), {'date_from': '2024-06-01T00:00:00Z', 'date_to': '2024-05-01T00:00:00Z'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
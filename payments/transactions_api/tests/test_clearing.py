@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts_api.models import Account
+from transactions_api.clearing import ClearingEngine
+from transactions_api.models import OutboxEvent, Transaction
+
+
+class ClearingEngineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.account_one = Account.objects.create(account_name='Test Account 1', status=Account.Status.ACTIVE, balance=120000.00, currency='GBP')
+        cls.account_two = Account.objects.create(account_name='Test Account 2', status=Account.Status.ACTIVE, balance=250000.00, currency='GBP')
+        cls.inactive_account = Account.objects.create(account_name='Test Account 3', status=Account.Status.INACTIVE, balance=1000.00, currency='GBP')
+
+    def create_transaction(self, credit_from, debit_to, amount=100.00, currency='GBP'):
+        return Transaction.objects.create(
+            transaction_type=Transaction.TransactionType.CREDIT, credit_from=credit_from, debit_to=debit_to, amount=amount, currency=currency, status=Transaction.Status.UNCLEARED
+        )
+
+    def test_valid_transactions_are_cleared(self):
+        "Testing transactions that pass the checks are moved to CLEARED"
+        for _ in range(5):
+            self.create_transaction(self.account_one, self.account_two)
+
+        metrics = ClearingEngine(batch_size=2).run()
+
+        self.assertEqual(Transaction.objects.filter(status=Transaction.Status.CLEARED).count(), 5)
+        self.assertEqual(metrics.processed, 5)
+        self.assertEqual(metrics.batches, 3)
+        self.assertFalse(Transaction.objects.exclude(version=2).exists())
+
+    def test_invalid_transactions_are_not_cleared(self):
+        "Testing transactions failing the business checks stay UNCLEARED"
+        inactive = self.create_transaction(self.account_one, self.inactive_account)
+        same_account = self.create_transaction(self.account_one, self.account_one)
+        wrong_currency = self.create_transaction(self.account_one, self.account_two, currency='USD')
+        valid = self.create_transaction(self.account_two, self.account_one)
+
+        metrics = ClearingEngine().run()
+
+        self.assertEqual(metrics.processed, 1)
+        self.assertEqual(metrics.failed, 3)
+        self.assertEqual(Transaction.objects.get(id=valid.id).status, Transaction.Status.CLEARED)
+        for rejected in (inactive, same_account, wrong_currency):
+            self.assertEqual(Transaction.objects.get(id=rejected.id).status, Transaction.Status.UNCLEARED)
+
+    def test_cleared_transactions_are_not_claimed_again(self):
+        "Testing a second engine finds nothing left to clear"
+        self.create_transaction(self.account_one, self.account_two)
+        ClearingEngine().run()
+
+        metrics = ClearingEngine().run()
+
+        self.assertEqual(metrics.batches, 0)
+        self.assertEqual(metrics.processed, 0)
+
+    def test_rows_cleared_by_another_engine_are_skipped(self):
+        "Testing rows another engine cleared after this one claimed them are not posted or announced again"
+        raced, mine = self.create_transaction(self.account_one, self.account_two), self.create_transaction(self.account_two, self.account_one, amount=40.00)
+        engine = ClearingEngine()
+        claim_batch = engine.claim_batch
+
+        def claim_then_race():
+            rows = claim_batch()
+            Transaction.objects.filter(id=raced.id).update(status=Transaction.Status.CLEARED)
+            return rows
+
+        engine.claim_batch = claim_then_race
+        metrics = engine.run()
+
+        self.assertEqual(metrics.processed, 1)
+        self.assertEqual(Account.objects.get(id=self.account_one.id).balance, 120040)
+        self.assertEqual(Account.objects.get(id=self.account_two.id).balance, 249960)
+        self.assertEqual(
+            list(OutboxEvent.objects.filter(event_type=OutboxEvent.EventType.TRANSACTION_CLEARED).values_list('transaction_guid', flat=True)),
+            [mine.transaction_guid]
+        )
+
+    def test_clear_transactions_command(self):
+        "Testing the management command clears transactions and reports its throughput"
+        self.create_transaction(self.account_one, self.account_two)
+        out = StringIO()
+
+        call_command('clear_transactions', stdout=out)
+
+        self.assertEqual(Transaction.objects.filter(status=Transaction.Status.CLEARED).count(), 1)
+        self.assertIn('Cleared 1 transactions (0 rejected) in 1 batches', out.getvalue())
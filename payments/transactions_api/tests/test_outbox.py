@@ -0,0 +1,160 @@
+import json
+import queue
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from accounts_api.models import Account
+from transactions_api.clearing import ClearingEngine
+from transactions_api.models import Transaction, OutboxEvent
+from transactions_api.outbox import OutboxRelay, FileSink, HttpSink, LocalQueueSink
+from payments.utils.utils_test import BaseAPITestCase
+
+
+class FailingSink:
+    def send(self, messages):
+        raise ConnectionError('sink unavailable')
+
+
+class OutboxRecordingTest(BaseAPITestCase):
+
+    def create_transaction(self, **data):
+        data = {
+            'transaction_type': 'CREDIT', 'credit_from': self.test_account_one.id, 'debit_to': self.test_account_two.id,
+            'amount': 25.00, 'currency': 'CAD', 'status': 'UNCLEARED', **data
+        }
+        return self.client.post(reverse('transactions-list'), data=data)
+
+
+    def test_create_records_event_with_transaction(self):
+        """Tests POST request writes a transaction.created event with the transaction"""
+
+        response = self.create_transaction()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event_type, OutboxEvent.EventType.TRANSACTION_CREATED)
+        self.assertEqual(str(event.transaction_guid), response.data['transaction_guid'])
+        self.assertEqual(event.payload['credit_from'], self.test_account_one.id)
+        self.assertEqual(event.payload['amount'], '25.00')
+        self.assertIsNone(event.published_on)
+
+
+    def test_invalid_create_records_no_event(self):
+        """Tests POST request that fails validation leaves the outbox empty"""
+
+        response = self.create_transaction(currency='ZZZ')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+
+    def test_update_to_cleared_records_event(self):
+        """Tests PATCH request moving a transaction to CLEARED writes a transaction.cleared event once"""
+
+        guid = self.create_transaction().data['transaction_guid']
+        transaction_id = Transaction.objects.get(transaction_guid=guid).id
+
+        self.client.patch(reverse('transactions-detail', args=[transaction_id]), data={'status': 'CLEARED'})
+        self.client.patch(reverse('transactions-detail', args=[transaction_id]), data={'status': 'CLEARED'})
+
+        self.assertEqual(OutboxEvent.objects.filter(event_type=OutboxEvent.EventType.TRANSACTION_CLEARED).count(), 1)
+
+
+class OutboxRelayTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        account_one = Account.objects.create(account_name='Test Account 1', status=Account.Status.ACTIVE, balance=120000.00, currency='GBP')
+        account_two = Account.objects.create(account_name='Test Account 2', status=Account.Status.ACTIVE, balance=250000.00, currency='GBP')
+        for _ in range(5):
+            Transaction.objects.create(credit_from=account_one, debit_to=account_two, amount=100.00, currency='GBP')
+
+    def test_clearing_records_cleared_events(self):
+        "Testing the clearing engine writes a transaction.cleared event per cleared transaction"
+        ClearingEngine(batch_size=2).run()
+
+        events = OutboxEvent.objects.filter(event_type=OutboxEvent.EventType.TRANSACTION_CLEARED)
+        self.assertEqual(events.count(), 5)
+        self.assertTrue(all(event.payload['status'] == 'CLEARED' for event in events))
+
+    def test_relay_delivers_in_order_and_marks_published(self):
+        "Testing the relay sends the events oldest first in batches and does not send them again"
+        ClearingEngine().run()
+        messages = queue.Queue()
+
+        metrics = OutboxRelay(sink=LocalQueueSink(messages), batch_size=2).run()
+
+        self.assertEqual(metrics.processed, 5)
+        self.assertEqual(metrics.batches, 3)
+        delivered = [messages.get_nowait() for _ in range(messages.qsize())]
+        self.assertEqual([message['id'] for message in delivered], sorted(message['id'] for message in delivered))
+        self.assertFalse(OutboxEvent.objects.filter(published_on__isnull=True).exists())
+
+        self.assertEqual(OutboxRelay(sink=LocalQueueSink(messages)).run().processed, 0)
+
+    def test_failed_batch_is_retried(self):
+        "Testing events stay in the outbox with their attempts counted when the sink fails"
+        ClearingEngine().run()
+
+        with self.assertLogs('transactions_api.outbox', 'WARNING'):
+            metrics = OutboxRelay(sink=FailingSink(), batch_size=2).run()
+
+        self.assertEqual(metrics.processed, 0)
+        self.assertEqual(metrics.failed, 2)
+        self.assertEqual(OutboxEvent.objects.filter(attempts=1, last_error='sink unavailable').count(), 2)
+
+        messages = queue.Queue()
+        OutboxRelay(sink=LocalQueueSink(messages)).run()
+        self.assertEqual(messages.qsize(), 5)
+
+    def test_file_sink(self):
+        "Testing the file sink appends one JSON line per event"
+        ClearingEngine().run()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'events.jsonl'
+
+            OutboxRelay(sink=FileSink(path)).run()
+
+            lines = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[0]['type'], 'transaction.cleared')
+
+    def test_http_sink(self):
+        "Testing the HTTP sink posts each batch as a JSON array"
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        ClearingEngine().run()
+
+        OutboxRelay(sink=HttpSink(f'http://127.0.0.1:{server.server_port}/events'), batch_size=3).run()
+
+        self.assertEqual([len(batch) for batch in received], [3, 2])
+
+    def test_relay_outbox_command(self):
+        "Testing the command relays to the configured sink and reports its throughput"
+        ClearingEngine().run()
+        out = StringIO()
+
+        with override_settings(OUTBOX_SINK={'CLASS': 'transactions_api.outbox.LocalQueueSink'}):
+            call_command('relay_outbox', batch_size=10, stdout=out)
+
+        self.assertIn('Relayed 5 events (0 failed) in 1 batches', out.getvalue())
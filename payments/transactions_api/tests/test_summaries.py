@@ -0,0 +1,87 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts_api.models import Account
+from transactions_api.archival import archive_transactions
+from transactions_api.models import Transaction, DailyAccountSummary
+from transactions_api.summaries import refresh_summaries
+
+
+@override_settings(SUMMARY_REFRESH_LAG=0)
+class DailyAccountSummaryTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.account_one = Account.objects.create(account_name='Test Account 1', status=Account.Status.ACTIVE, balance=120000.00, currency='GBP')
+        cls.account_two = Account.objects.create(account_name='Test Account 2', status=Account.Status.ACTIVE, balance=250000.00, currency='GBP')
+        cls.account_three = Account.objects.create(account_name='Test Account 3', status=Account.Status.ACTIVE, balance=1000.00, currency='GBP')
+
+    def create_transaction(self, day, amount, credit_from=None, debit_to=None, currency='GBP'):
+        transaction = Transaction.objects.create(
+            credit_from=credit_from or self.account_one, debit_to=debit_to or self.account_two, amount=amount, currency=currency,
+            transaction_date=timezone.make_aware(datetime.combine(day, datetime.min.time())) + timedelta(hours=12)
+        )
+        # Changed before the last refresh, unless touched again
+        Transaction.objects.filter(id=transaction.id).update(last_updated=timezone.now() - timedelta(days=1))
+        return transaction
+
+    def summary(self, account, day, currency='GBP'):
+        return DailyAccountSummary.objects.get(account=account, day=day, currency=currency)
+
+    def test_first_refresh_summarises_everything(self):
+        "Testing the first refresh builds a summary per account, day and currency on each side of the ledger"
+        self.create_transaction(date(2024, 1, 1), '10.00')
+        self.create_transaction(date(2024, 1, 1), '2.50')
+        self.create_transaction(date(2024, 1, 1), '7.00', currency='USD')
+        self.create_transaction(date(2024, 3, 5), '1.00', credit_from=self.account_two, debit_to=self.account_three)
+
+        days, written = refresh_summaries()
+
+        self.assertEqual((days, written), (2, 6))
+        summary = self.summary(self.account_one, date(2024, 1, 1))
+        self.assertEqual((summary.credit_from_count, summary.credit_from_amount), (2, Decimal('12.50')))
+        self.assertEqual((summary.debit_to_count, summary.debit_to_amount), (0, Decimal('0')))
+        summary = self.summary(self.account_two, date(2024, 3, 5))
+        self.assertEqual((summary.credit_from_count, summary.debit_to_count), (1, 0))
+
+    def test_refresh_only_recomputes_touched_days(self):
+        "Testing an incremental refresh recomputes only the days of transactions changed since the watermark"
+        self.create_transaction(date(2024, 1, 1), '10.00')
+        changed = self.create_transaction(date(2024, 1, 2), '5.00')
+        refresh_summaries()
+
+        Transaction.objects.filter(id=changed.id).update(amount='6.00', last_updated=timezone.now())
+        self.create_transaction(date(2024, 1, 1), '1.00')
+        days, written = refresh_summaries()
+
+        self.assertEqual((days, written), (1, 2))
+        self.assertEqual(self.summary(self.account_two, date(2024, 1, 2)).debit_to_amount, Decimal('6.00'))
+        # Changed before the watermark, so left for a full refresh
+        self.assertEqual(self.summary(self.account_one, date(2024, 1, 1)).credit_from_count, 1)
+
+        call_command('refresh_summaries', '--full', stdout=StringIO())
+        self.assertEqual(self.summary(self.account_one, date(2024, 1, 1)).credit_from_count, 2)
+
+    def test_summaries_include_archive(self):
+        "Testing recomputed days include the transactions moved to the archive"
+        old_day = timezone.localdate() - timedelta(days=400)
+        archived = self.create_transaction(old_day, '3.00')
+        Transaction.objects.filter(id=archived.id).update(status=Transaction.Status.CLEARED)
+        archive_transactions()
+        self.create_transaction(old_day, '4.00')
+        refresh_summaries()
+
+        self.assertEqual(self.summary(self.account_one, old_day).credit_from_amount, Decimal('7.00'))
+
+    def test_refresh_summaries_command(self):
+        "Testing the command refreshes the summaries and reports what it wrote"
+        self.create_transaction(date(2024, 1, 1), '10.00')
+        out = StringIO()
+
+        call_command('refresh_summaries', stdout=out)
+
+        self.assertIn('Refreshed 2 summaries over 1 days', out.getvalue())
@@ -0,0 +1,98 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from transactions_api.velocity import VelocityChecker, VelocityRule, LocalWindowStore, CacheWindowStore, reset_velocity_windows
+
+
+class VelocityCheckerTest(TestCase):
+    def setUp(self):
+        reset_velocity_windows()
+
+    def transaction(self, amount='10.00', credit_from=1, debit_to=2, currency='GBP'):
+        return {'credit_from': credit_from, 'debit_to': debit_to, 'amount': Decimal(amount), 'currency': currency}
+
+    def checker(self, store=None, **rule):
+        rule = {'name': 'test', 'window': 60, **rule}
+        return VelocityChecker([VelocityRule(**rule)], store or LocalWindowStore())
+
+    def test_count_limit(self):
+        "Testing a transaction over the count limit within the window is rejected"
+        checker = self.checker(max_count=2)
+        for _ in range(2):
+            self.assertIsNone(checker.check(self.transaction(), now=1000))
+            checker.record(self.transaction(), now=1000)
+
+        self.assertEqual(checker.check(self.transaction(), now=1000).name, 'test')
+        self.assertIsNone(checker.check(self.transaction(credit_from=3), now=1000))
+
+    def test_amount_limit(self):
+        "Testing a transaction taking the total amount over the limit is rejected"
+        checker = self.checker(max_amount='100.00')
+        checker.record(self.transaction('60.00'), now=1000)
+
+        self.assertIsNone(checker.check(self.transaction('40.00'), now=1000))
+        self.assertIsNotNone(checker.check(self.transaction('40.01'), now=1000))
+
+    def test_window_slides(self):
+        "Testing transactions stop counting once their bucket leaves the window"
+        checker = self.checker(max_count=2)
+        checker.record(self.transaction(), now=1000)
+        checker.record(self.transaction(), now=1030)
+
+        self.assertIsNotNone(checker.check(self.transaction(), now=1055))
+        self.assertIsNone(checker.check(self.transaction(), now=1062))
+
+    def test_debit_side_and_currency(self):
+        "Testing a rule can count the account debited to and only one currency"
+        checker = self.checker(max_count=1, account='debit_to', currency='GBP')
+        checker.record(self.transaction(credit_from=3), now=1000)
+        checker.record(self.transaction(currency='USD'), now=1000)
+
+        self.assertIsNotNone(checker.check(self.transaction(credit_from=4), now=1000))
+        self.assertIsNone(checker.check(self.transaction(currency='USD'), now=1000))
+
+    @override_settings(CACHES={'velocity': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'velocity-test'}})
+    def test_cache_store(self):
+        "Testing windows kept in a cache are shared between checkers"
+        store = CacheWindowStore('velocity')
+        store.cache.clear()
+        self.checker(store, max_count=1).record(self.transaction(), now=1000)
+
+        self.assertIsNotNone(self.checker(CacheWindowStore('velocity'), max_count=1).check(self.transaction(), now=1000))
+
+    def test_invalid_rules(self):
+        "Testing rules without a limit, with an unknown account side or an empty window are refused"
+        for rule in ({}, {'max_count': 1, 'account': 'owner'}, {'max_count': 1, 'window': 0}):
+            with self.assertRaises(ImproperlyConfigured):
+                VelocityRule(**{'name': 'test', 'window': 60, **rule})
+
+    @override_settings(VELOCITY_RULES=[{'name': 'test', 'window': 60, 'max_count': 3}])
+    def test_from_settings(self):
+        "Testing the checker is built from the VELOCITY_RULES setting"
+        checker = VelocityChecker.from_settings()
+
+        self.assertEqual([rule.max_count for rule in checker.rules], [3])
+        self.assertIsInstance(checker.store, LocalWindowStore)
+
+    @override_settings(VELOCITY_RULES=[{'name': 'test', 'window': 60, 'max_count': 3}])
+    def test_rules_built_once_per_setting(self):
+        "Testing the rules are reused until VELOCITY_RULES is replaced"
+        rules = VelocityChecker.from_settings().rules
+
+        self.assertIs(VelocityChecker.from_settings().rules, rules)
+        with override_settings(VELOCITY_RULES=[{'name': 'test', 'window': 60, 'max_count': 5}]):
+            self.assertEqual([rule.max_count for rule in VelocityChecker.from_settings().rules], [5])
+
+    def test_local_store_evicts_least_recently_written(self):
+        "Testing the in-process store keeps at most MAX_LOCAL_WINDOWS windows, evicting the oldest write"
+        checker = self.checker(max_count=1)
+        with mock.patch('transactions_api.velocity.MAX_LOCAL_WINDOWS', 2):
+            for account in (1, 2, 1, 3):
+                checker.record(self.transaction(credit_from=account), now=1000)
+
+        self.assertIsNotNone(checker.check(self.transaction(credit_from=1), now=1000))
+        self.assertIsNotNone(checker.check(self.transaction(credit_from=3), now=1000))
+        self.assertIsNone(checker.check(self.transaction(credit_from=2), now=1000))
@@ -1,9 +1,21 @@
+from datetime import date, timedelta
+from unittest import mock
+
 from django.urls import reverse
+from django.utils import timezone
+from django.db import connection
+from django.db.models import F
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework import status
 
-from transactions_api.models import Transaction
+from transactions_api.archival import archive_transactions
+from transactions_api.models import ArchivedTransaction, DailyAccountSummary, DirtySummaryDay, Transaction
 from transactions_api.serializers import TransactionSerializer
+from transactions_api.views import TransactionDetailApiView
+from transactions_api.summaries import refresh_summaries
+from payments.utils.utils_columnar import read_columnar_json
 from payments.utils.utils_test import BaseAPITestCase, validate_response_headers
 from accounts_api.models import Account
 
@@ -79,6 +91,44 @@ class TestTransactionListView(TransactionBaseAPITestCase):
         self.assertTrue(response.data, expected_data)
 
 
+    def test_create_cleared_transaction_posts_balances(self):
+        """Tests POST request for a CLEARED transaction moves its amount between the account balances"""
+        data = {
+            "transaction_type": "CREDIT",
+            "credit_from": 1,
+            "debit_to": 2,
+            "amount": 12500.00,
+            "currency": "CAD",
+            "transaction_date": "2024-05-11",
+            "status": "CLEARED"
+        }
+
+        response = self.client.post(reverse('transactions-list'), data=data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Account.objects.get(id=1).balance, 107500)
+        self.assertEqual(Account.objects.get(id=2).balance, 192500)
+
+
+    def test_create_uncleared_transaction_leaves_balances(self):
+        """Tests POST request for an UNCLEARED transaction does not change the account balances"""
+        data = {
+            "transaction_type": "CREDIT",
+            "credit_from": 1,
+            "debit_to": 2,
+            "amount": 12500.00,
+            "currency": "CAD",
+            "transaction_date": "2024-05-11",
+            "status": "UNCLEARED"
+        }
+
+        response = self.client.post(reverse('transactions-list'), data=data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Account.objects.get(id=1).balance, 120000)
+        self.assertEqual(Account.objects.get(id=2).balance, 180000)
+
+
     def test_create_transaction_correct_headers(self):
         """Tests authenticated POST request for transactions has the correct headers"""
 
@@ -165,6 +215,45 @@ class TestTransactionListView(TransactionBaseAPITestCase):
         self.assertEqual(Transaction.objects.filter().count(), 2)
 
 
+    def test_post_request_fails_with_unknown_currency(self):
+        """Tests authenticated POST requests are not successful when the currency is not an ISO 4217 code"""
+
+        data = {
+                "transaction_type": "CREDIT",
+                "credit_from": 2,
+                "debit_to": 1,
+                "amount": 43500.00,
+                "currency": "ZZZ",
+                "transaction_date": "2024-05-03",
+                "status": "CLEARED"
+            }
+
+        response = self.client.post(reverse('transactions-list'), data=data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Transaction.objects.filter().count(), 2)
+
+
+    def test_post_request_fails_with_amount_beyond_currency_minor_units(self):
+        """Tests authenticated POST requests are not successful when the amount has more decimal places than the currency allows"""
+
+        data = {
+                "transaction_type": "CREDIT",
+                "credit_from": 2,
+                "debit_to": 1,
+                "amount": '4350.50',
+                "currency": "JPY",
+                "transaction_date": "2024-05-03",
+                "status": "CLEARED"
+            }
+
+        response = self.client.post(reverse('transactions-list'), data=data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('amount', response.data)
+        self.assertEqual(Transaction.objects.filter().count(), 2)
+
+
     def test_unsupported_method_delete_in_list_view(self):
         """Tests DELETE requests are not supported at the /transactions/api endpoint"""
 
@@ -205,6 +294,19 @@ class TestTransactionListView(TransactionBaseAPITestCase):
         self.assertEqual(Transaction.objects.filter().count(), 2)
 
 
+    def test_lists_transactions_in_compact_format(self):
+        """Tests GET request accepting the compact format returns the field names once and a row per transaction"""
+
+        response = self.client.get(reverse('transactions-list'), HTTP_ACCEPT='application/vnd.payments.compact+json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/vnd.payments.compact+json')
+        body = response.json()
+        self.assertEqual(body['fields'][:2], ['transaction_guid', 'transaction_type'])
+        self.assertEqual(len(body['rows']), 2)
+        self.assertEqual(body['rows'][0][body['fields'].index('amount')], '230.00')
+
+
     def test_create_transaction_unsuccessful_invalid_amount(self):
         """Tests POST request is unsuccessful when the amount in the field does not match the database field constraint"""
 
@@ -227,6 +329,28 @@ class TestTransactionListView(TransactionBaseAPITestCase):
         self.assertNotEqual(Transaction.objects.filter().count(), 3)
 
 
+    @override_settings(VELOCITY_RULES=[{'name': 'test_limit', 'window': 3600, 'max_count': 1}])
+    def test_post_request_fails_over_velocity_limit(self):
+        """Tests POST request is unsuccessful once the account is over a velocity limit"""
+        data = {
+            "transaction_type": "CREDIT",
+            "credit_from": 1,
+            "debit_to": 2,
+            "amount": 100.00,
+            "currency": "CAD",
+            "transaction_date": "2024-05-11",
+            "status": "UNCLEARED"
+        }
+
+        first_response = self.client.post(reverse('transactions-list'), data=data)
+        second_response = self.client.post(reverse('transactions-list'), data=data)
+
+        self.assertEqual(first_response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second_response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(second_response.data['res'], 'Transaction exceeds the test_limit velocity limit')
+        self.assertEqual(Transaction.objects.count(), 3)
+
+
 class TestTransactionDetailView(TransactionBaseAPITestCase):
     def test_view_single_transaction(self):
         """Tests GET request is successful using the transaction id"""
@@ -356,4 +480,301 @@ class TestTransactionDetailView(TransactionBaseAPITestCase):
 
         # Verify record still in database
         self.assertTrue
-        (Transaction.objects.filter(id=self.test_transaction_one.id).exists())      
+        (Transaction.objects.filter(id=self.test_transaction_one.id).exists())
+
+
+    def test_partial_update_single_transaction_successful(self):
+        """Tests PATCH request updates only the provided fields for a given transaction id"""
+
+        response = self.client.patch(reverse('transactions-detail', args=[self.test_transaction_one.id]), data={'status': 'CLEARED'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        transaction_db_record = Transaction.objects.get(id=self.test_transaction_one.id)
+        expected_data = TransactionSerializer(transaction_db_record).data
+
+        self.assertEqual(response.data, expected_data)
+        self.assertEqual(transaction_db_record.status, Transaction.Status.CLEARED)
+        self.assertEqual(transaction_db_record.currency, 'EUR')
+
+
+    def test_partial_update_to_cleared_posts_balances(self):
+        """Tests PATCH request moving a transaction from UNCLEARED to CLEARED moves its amount between the account balances"""
+
+        response = self.client.patch(reverse('transactions-detail', args=[self.test_transaction_one.id]), data={'status': 'CLEARED'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Account.objects.get(id=1).balance, 119770)
+        self.assertEqual(Account.objects.get(id=2).balance, 180230)
+
+
+    def test_partial_update_of_cleared_transaction_posts_difference(self):
+        """Tests PATCH request changing the amount and accounts of a CLEARED transaction moves only the difference"""
+
+        self.client.patch(reverse('transactions-detail', args=[self.test_transaction_one.id]), data={'status': 'CLEARED'})
+        response = self.client.patch(reverse('transactions-detail', args=[self.test_transaction_one.id]), data={'amount': '300.00', 'credit_from': 2, 'debit_to': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Account.objects.get(id=1).balance, 120300)
+        self.assertEqual(Account.objects.get(id=2).balance, 179700)
+
+
+    def test_delete_cleared_transaction_takes_amount_back(self):
+        """Tests DELETE request for a CLEARED transaction restores the account balances"""
+
+        self.client.patch(reverse('transactions-detail', args=[self.test_transaction_one.id]), data={'status': 'CLEARED'})
+        response = self.client.delete(reverse('transactions-detail', args=[self.test_transaction_one.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Account.objects.get(id=1).balance, 120000)
+        self.assertEqual(Account.objects.get(id=2).balance, 180000)
+
+
+    def test_delete_conflicts_with_concurrent_write(self):
+        """Tests DELETE request without If-Match is refused, and no posting reversed, when the transaction changed after it was read"""
+
+        self.client.patch(reverse('transactions-detail', args=[self.test_transaction_one.id]), data={'status': 'CLEARED'})
+        get_object = TransactionDetailApiView.get_object
+
+        def read_then_race(view, id, include_archived=False):
+            instance = get_object(view, id, include_archived)
+            Transaction.objects.filter(id=id).update(status=Transaction.Status.UNCLEARED, version=F('version') + 1)
+            return instance
+
+        with mock.patch.object(TransactionDetailApiView, 'get_object', read_then_race):
+            response = self.client.delete(reverse('transactions-detail', args=[self.test_transaction_one.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertTrue(Transaction.objects.filter(id=self.test_transaction_one.id).exists())
+        self.assertEqual(Account.objects.get(id=1).balance, 119770)
+        self.assertEqual(Account.objects.get(id=2).balance, 180230)
+
+
+    def test_partial_update_writes_only_changed_columns(self):
+        """Tests PATCH request issues an UPDATE restricted to the changed fields"""
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(reverse('transactions-detail', args=[self.test_transaction_one.id]), data={'debit_to': 1, 'credit_from': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"debit_to_id"', updates[0])
+        self.assertNotIn('"credit_from_id"', updates[0])
+        self.assertNotIn('"amount"', updates[0])
+
+
+    def test_partial_update_skips_write_when_nothing_changed(self):
+        """Tests PATCH request does not write to the database when no values change"""
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(reverse('transactions-detail', args=[self.test_transaction_one.id]), data={'amount': '230.00'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any(query['sql'].startswith('UPDATE') for query in queries))
+
+
+    def test_partial_update_unsuccessful_no_authentication(self):
+        """Tests PATCH request is unsuccessful for a given transaction id when there is no authentication"""
+
+        self.client.credentials()
+
+        response = self.client.patch(reverse('transactions-detail', args=[self.test_transaction_two.id]), data={'status': 'CLEARED'})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(Transaction.objects.get(id=self.test_transaction_two.id).status, Transaction.Status.UNCLEARED)
+
+
+class TestTransactionGuidViews(TransactionBaseAPITestCase):
+
+    def test_view_single_transaction_by_guid(self):
+        """Tests GET request retrieves the transaction with the given transaction_guid"""
+
+        response = self.client.get(reverse('transactions-guid-detail', args=[self.test_transaction_one.transaction_guid]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, TransactionSerializer(self.test_transaction_one).data)
+
+
+    def test_delete_transaction_by_guid(self):
+        """Tests DELETE request deletes the transaction with the given transaction_guid"""
+
+        response = self.client.delete(reverse('transactions-guid-detail', args=[self.test_transaction_two.transaction_guid]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Transaction.objects.filter(id=self.test_transaction_two.id).exists())
+
+
+    def test_view_archived_transaction_by_guid(self):
+        """Tests GET request finds an archived transaction by transaction_guid, while updates and deletes do not"""
+
+        archived = Transaction.objects.create(
+            credit_from=self.test_account_one, debit_to=self.test_account_two, amount=12.00, currency='EUR',
+            status=Transaction.Status.CLEARED, transaction_date=timezone.now() - timedelta(days=400)
+        )
+        archive_transactions()
+        url = reverse('transactions-guid-detail', args=[archived.transaction_guid])
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['transaction_guid'], str(archived.transaction_guid))
+        self.assertEqual(response['ETag'], '"1"')
+
+        self.assertEqual(self.client.patch(url, data={'status': 'UNCLEARED'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(ArchivedTransaction.objects.filter(transaction_guid=archived.transaction_guid, status=Transaction.Status.CLEARED).exists())
+
+
+    def test_guid_lookup_includes_archived_transactions(self):
+        """Tests POST request resolves transaction_guids in both the hot table and the archive"""
+
+        archived = Transaction.objects.create(
+            credit_from=self.test_account_one, debit_to=self.test_account_two, amount=12.00, currency='EUR',
+            status=Transaction.Status.CLEARED, transaction_date=timezone.now() - timedelta(days=400)
+        )
+        archive_transactions()
+        missing_guid = '00000000-0000-0000-0000-000000000000'
+        guids = [str(self.test_transaction_one.transaction_guid), str(archived.transaction_guid), missing_guid]
+
+        response = self.client.post(reverse('transactions-guid-lookup'), data={'guids': guids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results']), set(guids[:2]))
+        self.assertEqual(response.data['missing'], [missing_guid])
+
+
+    def test_guid_lookup_skips_archive_when_all_found(self):
+        """Tests POST request only queries the hot table when every transaction_guid is found there"""
+
+        guids = [str(self.test_transaction_one.transaction_guid), str(self.test_transaction_two.transaction_guid)]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('transactions-guid-lookup'), data={'guids': guids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['missing'], [])
+        self.assertFalse(any('archivedtransaction' in query['sql'] for query in context.captured_queries))
+
+
+class TestTransactionOptimisticConcurrency(TransactionBaseAPITestCase):
+
+    def test_detail_responses_carry_etag(self):
+        """Tests GET and PATCH requests return the version as the ETag"""
+
+        url = reverse('transactions-detail', args=[self.test_transaction_one.id])
+
+        self.assertEqual(self.client.get(url)['ETag'], '"1"')
+
+        response = self.client.patch(url, data={'status': 'CLEARED'}, HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assertEqual(response.data['version'], 2)
+
+
+    def test_update_with_stale_if_match(self):
+        """Tests PATCH request is rejected with 412 when If-Match names an older version"""
+
+        url = reverse('transactions-detail', args=[self.test_transaction_one.id])
+        self.client.patch(url, data={'amount': 231.00})
+
+        response = self.client.patch(url, data={'status': 'CLEARED'}, HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(response.data, {'res': 'Object has changed since the version given in If-Match'})
+        self.assertEqual(Transaction.objects.get(id=self.test_transaction_one.id).status, Transaction.Status.UNCLEARED)
+
+
+class TestTransactionExportView(TransactionBaseAPITestCase):
+
+    def test_export_includes_archived_transactions(self):
+        """Tests GET request to the export endpoint streams archived and hot transactions with dictionary encoded columns"""
+
+        Transaction.objects.filter(id=self.test_transaction_one.id).update(
+            status=Transaction.Status.CLEARED, transaction_date=timezone.now() - timedelta(days=400)
+        )
+        archive_transactions()
+
+        response = self.client.get(reverse('transactions-export'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        meta, chunks = read_columnar_json(b''.join(response.streaming_content).decode().splitlines())
+        chunks = list(chunks)
+        self.assertEqual(meta['table'], 'transactions')
+        self.assertEqual([chunk['id'] for chunk in chunks], [[self.test_transaction_one.id], [self.test_transaction_two.id]])
+        self.assertEqual([chunk['amount'] for chunk in chunks], [[23000], [870000]])
+        self.assertEqual([chunk['transaction_type'] for chunk in chunks], [['CREDIT'], ['DEBIT']])
+
+
+@override_settings(SUMMARY_REFRESH_LAG=0)
+class TestTransactionDailySummaryView(TransactionBaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        refresh_summaries()
+
+
+    def test_daily_summaries_for_account(self):
+        """Tests GET request with an account returns that account's daily summaries per currency"""
+
+        response = self.client.get(reverse('transactions-daily-summaries'), {'account': self.test_account_one.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.data['refreshed_to'])
+        results = {item['currency']: item for item in response.data['results']}
+        self.assertEqual(results['EUR']['credit_from_amount'], '230.00')
+        self.assertEqual(results['GBP']['debit_to_amount'], '8700.00')
+
+
+    def test_daily_summaries_summed_over_accounts(self):
+        """Tests GET request without an account sums the summaries of all accounts per day and currency"""
+
+        response = self.client.get(reverse('transactions-daily-summaries'), {'currency': 'GBP'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['credit_from_count'], 1)
+        self.assertEqual(response.data['results'][0]['debit_to_amount'], '8700.00')
+
+
+    def test_refresh_after_moving_transaction(self):
+        """Tests the summaries of the day and accounts a PATCH moves a transaction away from are recomputed by the next refresh"""
+
+        account_three = Account.objects.create(account_name='Test Account 3', status=Account.Status.ACTIVE, balance=100.00, currency='EUR')
+        day = timezone.localdate(self.test_transaction_one.transaction_date)
+
+        response = self.client.patch(
+            reverse('transactions-detail', args=[self.test_transaction_one.id]),
+            data={'transaction_date': '2020-01-01T12:00:00Z', 'debit_to': account_three.id}
+        )
+        refresh_summaries()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(DailyAccountSummary.objects.filter(day=day, currency='EUR').exists())
+        self.assertEqual(
+            set(DailyAccountSummary.objects.filter(currency='EUR').values_list('account_id', 'day')),
+            {(self.test_account_one.id, date(2020, 1, 1)), (account_three.id, date(2020, 1, 1))}
+        )
+        self.assertFalse(DirtySummaryDay.objects.exists())
+
+
+    def test_refresh_after_deleting_transaction(self):
+        """Tests the summaries of a deleted transaction's day and accounts are recomputed by the next refresh"""
+
+        response = self.client.delete(reverse('transactions-detail', args=[self.test_transaction_two.id]))
+        refresh_summaries()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(DailyAccountSummary.objects.filter(currency='GBP').exists())
+        self.assertTrue(DailyAccountSummary.objects.filter(currency='EUR').exists())
+
+
+    def test_daily_summaries_invalid_filters(self):
+        """Tests GET request with a reversed date range is unsuccessful"""
+
+        response = self.client.get(reverse('transactions-daily-summaries'), {'date_from': '2024-02-01', 'date_to': '2024-01-01'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
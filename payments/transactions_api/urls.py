@@ -1,10 +1,20 @@
 from django.urls import path, include
 from .views import (
     TransactionListApiView,
-    TransactionDetailApiView
+    TransactionDetailApiView,
+    TransactionGuidDetailApiView,
+    TransactionGuidLookupApiView,
+    TransactionTotalsApiView,
+    TransactionDailySummaryApiView,
+    TransactionExportApiView
 )
 
 urlpatterns = [
     path('api/', TransactionListApiView.as_view(), name='transactions-list'),
-    path('api/<int:id>/', TransactionDetailApiView.as_view(), name='transactions-detail')
+    path('api/<int:id>/', TransactionDetailApiView.as_view(), name='transactions-detail'),
+    path('api/guid/<uuid:id>/', TransactionGuidDetailApiView.as_view(), name='transactions-guid-detail'),
+    path('api/guid/lookup/', TransactionGuidLookupApiView.as_view(), name='transactions-guid-lookup'),
+    path('api/totals/', TransactionTotalsApiView.as_view(), name='transactions-totals'),
+    path('api/summaries/daily/', TransactionDailySummaryApiView.as_view(), name='transactions-daily-summaries'),
+    path('api/export/', TransactionExportApiView.as_view(), name='transactions-export')
 ]
\ No newline at end of file
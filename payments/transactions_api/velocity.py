@@ -0,0 +1,176 @@
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from payments.utils.utils_metrics import registry
+
+VELOCITY_REJECTIONS = registry.counter('payments_velocity_rejections_total', 'Transactions rejected by a velocity rule, by rule', ['rule'])
+
+DEFAULT_BUCKETS = 10
+
+ACCOUNT_SIDES = ('credit_from', 'debit_to')
+
+# In-process sliding windows, keyed by rule and account.
+# Each window is an immutable tuple of (bucket, count, amount) slots for the buckets still inside it,
+# replaced in a single assignment so no lock is taken. As with the throttle buckets, concurrent
+# transactions for the same account can race and let one or two through above a limit, which keeps the
+# check off the database and out of the way of the request.
+# Windows are kept in the order they were last written, and past MAX_LOCAL_WINDOWS the least recently
+# written one is evicted in constant time; for rules with the same window, that is the first to expire.
+_windows = OrderedDict()
+
+MAX_LOCAL_WINDOWS = 10000
+
+# The rules built from VELOCITY_RULES, with the setting value they were built from
+_rules = {}
+
+
+def reset_velocity_windows():
+    """Forget every in-process window"""
+    _windows.clear()
+
+
+def velocity_rules():
+    """The VelocityRules of the VELOCITY_RULES setting, built again only when the setting is replaced"""
+    configured = getattr(settings, 'VELOCITY_RULES', [])
+    cached = _rules.get('rules')
+    if cached is None or cached[0] is not configured:
+        cached = (configured, [VelocityRule(**rule) for rule in configured])
+        _rules['rules'] = cached
+
+    return cached[1]
+
+
+class LocalWindowStore:
+    def get(self, key):
+        return _windows.get(key)
+
+    def set(self, key, state, rule):
+        _windows.pop(key, None)
+        _windows[key] = state
+        while len(_windows) > MAX_LOCAL_WINDOWS:
+            try:
+                _windows.popitem(last=False)
+            except KeyError:
+                break
+
+
+class CacheWindowStore:
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def cache_key(self, key):
+        return ':'.join(['velocity', *map(str, key)])
+
+    def get(self, key):
+        return self.cache.get(self.cache_key(key))
+
+    def set(self, key, state, rule):
+        self.cache.set(self.cache_key(key), state, timeout=rule.window)
+
+
+class VelocityRule:
+    """
+    A limit on the transactions of one side's account within a sliding window of window seconds: at most
+    max_count transactions and at most max_amount in total, optionally only counting one currency.
+    The window is split into buckets, so it slides a bucket at a time.
+    """
+
+    def __init__(self, name, window, max_count=None, max_amount=None, account='credit_from', currency=None, buckets=DEFAULT_BUCKETS):
+        if max_count is None and max_amount is None:
+            raise ImproperlyConfigured(f'Velocity rule {name} needs max_count, max_amount or both')
+        if account not in ACCOUNT_SIDES:
+            raise ImproperlyConfigured(f'Velocity rule {name} account must be one of {", ".join(ACCOUNT_SIDES)}')
+        if window <= 0 or buckets < 1:
+            raise ImproperlyConfigured(f'Velocity rule {name} needs a positive window and at least one bucket')
+
+        self.name = name
+        self.window = window
+        self.max_count = max_count
+        self.max_amount = Decimal(str(max_amount)) if max_amount is not None else None
+        self.account = account
+        self.currency = currency
+        self.buckets = buckets
+        self.bucket_width = window / buckets
+
+    def applies_to(self, data):
+        return self.currency is None or data['currency'] == self.currency
+
+    def key(self, data):
+        account = data[self.account]
+        return (self.name, getattr(account, 'pk', account))
+
+    def totals(self, state, bucket):
+        """The count and amount of the slots still inside the window"""
+        count = 0
+        amount = Decimal(0)
+        for slot_bucket, slot_count, slot_amount in state or ():
+            if bucket - slot_bucket < self.buckets:
+                count += slot_count
+                amount += slot_amount
+
+        return count, amount
+
+    def exceeded_by(self, state, bucket, amount):
+        """Check whether one more transaction of amount would break the limits"""
+        count, total = self.totals(state, bucket)
+        return (
+            (self.max_count is not None and count + 1 > self.max_count)
+            or (self.max_amount is not None and total + amount > self.max_amount)
+        )
+
+    def added(self, state, bucket, amount):
+        """The state with a transaction of amount added to the current bucket, and expired buckets evicted"""
+        slots = [slot for slot in state or () if bucket - slot[0] < self.buckets]
+        if slots and slots[-1][0] == bucket:
+            _, count, total = slots.pop()
+            slots.append((bucket, count + 1, total + amount))
+        else:
+            slots.append((bucket, 1, amount))
+
+        return tuple(slots)
+
+
+class VelocityChecker:
+    """
+    Evaluates the VELOCITY_RULES against a new transaction with in-memory sliding window counters.
+    Call check before creating the transaction and record once it is created.
+    Set VELOCITY_CACHE_ALIAS to share the windows between processes through a Django cache.
+    """
+
+    def __init__(self, rules, store):
+        self.rules = rules
+        self.store = store
+
+    @classmethod
+    def from_settings(cls):
+        alias = getattr(settings, 'VELOCITY_CACHE_ALIAS', None)
+        return cls(velocity_rules(), CacheWindowStore(alias) if alias else LocalWindowStore())
+
+    def check(self, data, now=None):
+        """Return the first rule the transaction would break, or None"""
+        now = time.time() if now is None else now
+        for rule in self.rules:
+            if not rule.applies_to(data):
+                continue
+
+            bucket = int(now // rule.bucket_width)
+            if rule.exceeded_by(self.store.get(rule.key(data)), bucket, data['amount']):
+                VELOCITY_REJECTIONS.inc(rule=rule.name)
+                return rule
+
+        return None
+
+    def record(self, data, now=None):
+        """Count a created transaction in the windows of the rules it falls under"""
+        now = time.time() if now is None else now
+        for rule in self.rules:
+            if not rule.applies_to(data):
+                continue
+
+            key = rule.key(data)
+            self.store.set(key, rule.added(self.store.get(key), int(now // rule.bucket_width), data['amount']), rule)
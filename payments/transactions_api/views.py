@@ -1,12 +1,36 @@
+from collections import defaultdict
+from itertools import chain
+
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample, OpenApiResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import permissions
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import Transaction, ArchivedTransaction, OutboxEvent, DailyAccountSummary
+from .outbox import record_event, record_status_change
+from .archival import transaction_querysets
+from .summaries import mark_summaries_dirty, refreshed_to, summary_days, SUMMARY_FIELDS
+from .velocity import VelocityChecker
+from .export import TRANSACTION_COLUMNS, transaction_chunks
+from .serializers import (
+    TransactionSerializer,
+    TransactionFilterSerializer,
+    TransactionTotalsSerializer,
+    TransactionGuidLookupResultSerializer,
+    DailySummaryFilterSerializer,
+    DailySummariesSerializer
+)
+from accounts_api.balances import post_transaction, transaction_posting
+from fx_api.rates import convert_expression, convert_totals, MissingRateError
+from payments.utils.utils_columnar import columnar_json_response
+from payments.utils.utils_concurrency import check_if_match, delete_if_match, etag, save_changes
+from payments.utils.utils_serializers import GuidLookupSerializer
 
-from .models import Transaction
-from .serializers import TransactionSerializer
 
 # Create your views here.
 @extend_schema_view(
@@ -14,6 +38,7 @@ from .serializers import TransactionSerializer
             operation_id='Get All Transactions',
             description='Get a list of all transactions',
             summary='Get a list of all transactions',
+            parameters=[TransactionFilterSerializer],
             responses={
                 200: OpenApiResponse(
                     response=TransactionSerializer(many=True),
@@ -40,6 +65,10 @@ from .serializers import TransactionSerializer
                     OpenApiExample('Serializer Error: Transaction Type',
                     description='Null value provided for required transaction_type field',
                     value={'transaction_type': "['This field is required.']"}
+                    ),
+                    OpenApiExample('Velocity Limit Exceeded',
+                    description='The transaction would break one of the VELOCITY_RULES',
+                    value={'res': 'Transaction exceeds the daily_debits velocity limit'}
                     )
                 ]
             )
@@ -50,13 +79,25 @@ from .serializers import TransactionSerializer
 class TransactionListApiView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = {'GET': 'list', 'POST': 'detail'}
 
     # List all transactions
     def get(self, request, *args, **kwargs):
         """
-        List all transactions
+        List all transactions, including archived transactions when the date range reaches into the archive
         """
-        transactions = Transaction.objects.filter()
+        filters = TransactionFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        convert_to = filters.validated_data.pop('convert_to', None)
+        querysets = transaction_querysets(**filters.validated_data)
+        if convert_to:
+            querysets = [
+                queryset.annotate(converted_amount=convert_expression('amount', convert_to)) for queryset in querysets
+            ]
+
+        transactions = chain(*querysets)
         serializer = TransactionSerializer(transactions, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -77,7 +118,20 @@ class TransactionListApiView(APIView):
         serializer = TransactionSerializer(data=data)
 
         if serializer.is_valid():
-            serializer.save()
+            velocity = VelocityChecker.from_settings()
+            rule = velocity.check(serializer.validated_data)
+            if rule:
+                return Response(
+                    {"res": f"Transaction exceeds the {rule.name} velocity limit"}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+            with transaction.atomic():
+                transaction_instance = serializer.save()
+                record_event(OutboxEvent.EventType.TRANSACTION_CREATED, transaction_instance)
+                if transaction_instance.status == Transaction.Status.CLEARED:
+                    record_event(OutboxEvent.EventType.TRANSACTION_CLEARED, transaction_instance)
+                post_transaction(transaction_instance)
+            velocity.record(serializer.validated_data)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
                             
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -125,6 +179,28 @@ class TransactionListApiView(APIView):
     )
 )
 
+@extend_schema_view(
+    patch=extend_schema(
+        operation_id='Partially Update a Transaction',
+        summary='Partially update a single transaction based on the provided ID',
+        responses={
+            200: OpenApiResponse(
+                response=TransactionSerializer
+            ),
+            400: OpenApiResponse(
+                response={'Currency must be a 3 character ISO code'},
+                examples=[
+                    OpenApiExample(
+                        'Currency code Bad Request',
+                        description='Currency code validation fails',
+                        value={'detail': 'Currency must be a 3 character ISO code'}
+                    )
+                ]
+            )
+        }
+    )
+)
+
 @extend_schema_view(
     delete=extend_schema(
         operation_id='Delete a Transaction',
@@ -157,15 +233,28 @@ class TransactionListApiView(APIView):
 class TransactionDetailApiView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'detail'
+    lookup_field = 'id'
+    # Whether GET falls back to the archive table. Archived transactions are read-only, so updates and
+    # deletes only look in the hot table and answer not found for them
+    reads_archive = False
 
-    def get_object(self, id):
+    def get_object(self, id, include_archived=False):
         """
         Helper method to retrieve the object with a given id
         """
         try:
-            return Transaction.objects.get(id=id) 
+            return Transaction.objects.get(**{self.lookup_field: id})
         except Transaction.DoesNotExist:
-            return None
+            pass
+
+        if include_archived:
+            try:
+                return ArchivedTransaction.objects.get(**{self.lookup_field: id})
+            except ArchivedTransaction.DoesNotExist:
+                pass
+
+        return None
 
     # Get a single transaction
     def get(self, request, id, *args, **kwargs):
@@ -173,14 +262,14 @@ class TransactionDetailApiView(APIView):
         Retrieves the Transaction with the given id
         """
 
-        transaction_instance = self.get_object(id)
+        transaction_instance = self.get_object(id, include_archived=self.reads_archive)
         if not transaction_instance:
             return Response(
                 {"res": "Object with transaction id does not exist"}, status=status.HTTP_400_BAD_REQUEST
             )
         
         serializer = TransactionSerializer(transaction_instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers={'ETag': etag(transaction_instance)})
 
     # Update a single transaction
     def put(self, request, id, *args, **kwargs):
@@ -202,12 +291,53 @@ class TransactionDetailApiView(APIView):
             'date': request.data.get('date'),
             'status': request.data.get('status')
         }
+        check_if_match(request, transaction_instance)
         serializer = TransactionSerializer(instance=transaction_instance, data=data)
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            previous_status = transaction_instance.status
+            previous_posting = transaction_posting(transaction_instance)
+            previous_days = summary_days(transaction_instance)
+            with transaction.atomic():
+                changed_fields = save_changes(request, transaction_instance, serializer.validated_data)
+                if changed_fields:
+                    post_transaction(transaction_instance, previous_posting)
+                if SUMMARY_FIELDS.intersection(changed_fields):
+                    mark_summaries_dirty(previous_days)
+                record_status_change(transaction_instance, previous_status)
+            serializer = TransactionSerializer(transaction_instance)
+            return Response(serializer.data, status=status.HTTP_200_OK, headers={'ETag': etag(transaction_instance)})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    # Partially update a single transaction
+    def patch(self, request, id, *args, **kwargs):
+        """
+        Partially updates the transaction with the given id, writing only the fields that changed
+        """
+        transaction_instance = self.get_object(id)
+        if not transaction_instance:
+            return Response(
+                {"res": "Object with given transaction id does not exist"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        check_if_match(request, transaction_instance)
+        serializer = TransactionSerializer(instance=transaction_instance, data=request.data, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        previous_status = transaction_instance.status
+        previous_posting = transaction_posting(transaction_instance)
+        previous_days = summary_days(transaction_instance)
+        with transaction.atomic():
+            changed_fields = save_changes(request, transaction_instance, serializer.validated_data)
+            if changed_fields:
+                post_transaction(transaction_instance, previous_posting)
+            if SUMMARY_FIELDS.intersection(changed_fields):
+                mark_summaries_dirty(previous_days)
+            record_status_change(transaction_instance, previous_status)
+
+        serializer = TransactionSerializer(transaction_instance)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers={'ETag': etag(transaction_instance)})
+
     # Delete a single transaction
     def delete(self, request, id, *args, **kwargs):
         """
@@ -219,8 +349,218 @@ class TransactionDetailApiView(APIView):
                 {"res": "Object with given transaction id does not exist"}, status=status.HTTP_400_BAD_REQUEST
             )
         
-        transaction_instance.delete()
+        with transaction.atomic():
+            delete_if_match(request, transaction_instance)
+            post_transaction(transaction_instance, transaction_posting(transaction_instance), deleted=True)
+            mark_summaries_dirty(summary_days(transaction_instance))
         return Response(
             {"res": "Transaction deleted"},
             status=status.HTTP_200_OK
-        )    
\ No newline at end of file
+        )
+
+
+@extend_schema_view(
+    get=extend_schema(operation_id='Get a Transaction by GUID', summary='Get a single transaction based on the provided transaction_guid'),
+    put=extend_schema(operation_id='Update a Transaction by GUID', summary='Update a single transaction based on the provided transaction_guid'),
+    patch=extend_schema(operation_id='Partially Update a Transaction by GUID', summary='Partially update a single transaction based on the provided transaction_guid'),
+    delete=extend_schema(operation_id='Delete a Transaction by GUID', summary='Delete a transaction based on the provided transaction_guid')
+)
+
+class TransactionGuidDetailApiView(TransactionDetailApiView):
+    lookup_field = 'transaction_guid'
+    reads_archive = True
+
+
+@extend_schema_view(
+    post=extend_schema(
+        operation_id='Look Up Transactions by GUID',
+        summary='Get many transactions based on their transaction_guid in a single request',
+        request=GuidLookupSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=TransactionGuidLookupResultSerializer,
+                description='Returns the transactions keyed by transaction_guid, and the GUIDs that were not found'
+            )
+        }
+    )
+)
+
+class TransactionGuidLookupApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'list'
+
+    # Look up many transactions
+    def post(self, request, *args, **kwargs):
+        """
+        Resolves a batch of transaction GUIDs with a single query, then a single archive query for any not found
+        """
+        serializer = GuidLookupSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        guids = list(dict.fromkeys(serializer.validated_data['guids']))
+        transactions = Transaction.objects.in_bulk(guids, field_name='transaction_guid')
+        not_found = [guid for guid in guids if guid not in transactions]
+        if not_found:
+            transactions.update(ArchivedTransaction.objects.in_bulk(not_found, field_name='transaction_guid'))
+
+        serializer = TransactionGuidLookupResultSerializer({
+            'results': {str(guid): transactions[guid] for guid in guids if guid in transactions},
+            'missing': [guid for guid in guids if guid not in transactions]
+        })
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        operation_id='Get Transaction Totals',
+        summary='Get the total transaction amount per currency, optionally converted into one currency',
+        parameters=[TransactionFilterSerializer],
+        responses={
+            200: OpenApiResponse(
+                response=TransactionTotalsSerializer,
+                description='Returns the count and total amount of transactions per currency'
+            ),
+            400: OpenApiResponse(
+                response={'Missing Exchange Rate'},
+                examples=[
+                    OpenApiExample(
+                        'Missing exchange rate',
+                        description='There is no exchange rate from one of the currencies to convert_to',
+                        value={'res': 'No exchange rate from JMD to GBP'}
+                    )
+                ]
+            )
+        }
+    )
+)
+
+class TransactionTotalsApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'list'
+
+    # Totals per currency
+    def get(self, request, *args, **kwargs):
+        """
+        Aggregates the transactions per currency in SQL and converts each currency total with the cached rates
+        """
+        filters = TransactionFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        convert_to = filters.validated_data.pop('convert_to', None)
+
+        counts = defaultdict(int)
+        amounts = defaultdict(int)
+        for queryset in transaction_querysets(**filters.validated_data):
+            for row in queryset.order_by().values('currency').annotate(count=Count('id'), amount=Sum('amount')):
+                counts[row['currency']] += row['count']
+                amounts[row['currency']] += row['amount']
+
+        totals = [
+            {'currency': currency, 'count': counts[currency], 'amount': amounts[currency]}
+            for currency in sorted(amounts)
+        ]
+        data = {'totals': totals}
+
+        if convert_to:
+            try:
+                converted = convert_totals(amounts, convert_to)
+            except MissingRateError as error:
+                return Response({"res": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+            for total in totals:
+                total['converted_amount'] = converted[total['currency']]
+
+            data['convert_to'] = convert_to
+            data['converted_total'] = sum(converted.values())
+
+        serializer = TransactionTotalsSerializer(data)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        operation_id='Get Daily Summaries',
+        summary='Get the daily transaction counts and amounts per currency, for one account or all of them',
+        parameters=[DailySummaryFilterSerializer],
+        responses={
+            200: OpenApiResponse(
+                response=DailySummariesSerializer,
+                description=(
+                    'Returns a row per day and currency from the pre-computed summaries, and the time they are '
+                    'refreshed up to. Without an account the rows are summed over all accounts'
+                )
+            )
+        }
+    )
+)
+
+class TransactionDailySummaryApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'list'
+
+    # List the daily summaries
+    def get(self, request, *args, **kwargs):
+        """
+        Reads the daily summaries kept by the refresh_summaries command, so the cost grows with the number
+        of days rather than the number of transactions
+        """
+        filters = DailySummaryFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        options = filters.validated_data
+        summaries = DailyAccountSummary.objects.all()
+        if 'date_from' in options:
+            summaries = summaries.filter(day__gte=options['date_from'])
+        if 'date_to' in options:
+            summaries = summaries.filter(day__lte=options['date_to'])
+        if 'currency' in options:
+            summaries = summaries.filter(currency=options['currency'])
+
+        if 'account' in options:
+            summaries = summaries.filter(account_id=options['account'])
+        else:
+            summaries = summaries.values('day', 'currency').annotate(
+                credit_from_count=Sum('credit_from_count'), credit_from_amount=Sum('credit_from_amount'),
+                debit_to_count=Sum('debit_to_count'), debit_to_amount=Sum('debit_to_amount')
+            )
+
+        serializer = DailySummariesSerializer({
+            'refreshed_to': refreshed_to(),
+            'results': summaries.order_by('day', 'currency')
+        })
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        operation_id='Export Transactions',
+        summary='Download every transaction in the columnar JSON lines format, for offline analysis',
+        responses={
+            (200, 'application/x-ndjson'): OpenApiResponse(
+                response=OpenApiTypes.STR,
+                description=(
+                    'A header line describing the columns, then one line per chunk of rows with currency, status'
+                    ' and transaction_type dictionary encoded, amounts as integers scaled by 10 ** scale and timestamps as epoch microseconds'
+                )
+            )
+        }
+    )
+)
+
+class TransactionExportApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'list'
+
+    # Export all
+    def get(self, request, *args, **kwargs):
+        """
+        Streams every transaction a chunk at a time, so the response is never held in memory
+        """
+        return columnar_json_response('transactions', TRANSACTION_COLUMNS, transaction_chunks())
@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import hmac
+import ssl
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+SIGNATURE_HEADER = 'X-Webhook-Signature'
+
+
+def sign(secret, body, timestamp=None):
+    """
+    Signature header value for a request body: t=<unix time>,v1=<hex HMAC-SHA256 of "<t>.<body>">.
+    Subscribers recompute it with their secret and reject stale timestamps to prevent replays.
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+
+class HTTPStatusError(Exception):
+    """Raised when the endpoint answers with a non-2xx status"""
+
+    def __init__(self, status):
+        self.status = status
+        super().__init__(f'Endpoint responded with HTTP {status}')
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """
+    Minimal asyncio HTTP/1.1 client keeping connections alive per host, so repeated batches to the
+    same endpoint skip the TCP and TLS handshakes. At most max_per_host requests run at once per host.
+    """
+
+    def __init__(self, max_per_host=4, timeout=10):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._idle = defaultdict(list)
+        self._limits = {}
+        self.connections_opened = 0
+
+    def _limit(self, key):
+        if key not in self._limits:
+            self._limits[key] = asyncio.Semaphore(self.max_per_host)
+        return self._limits[key]
+
+    async def _open(self, scheme, host, port):
+        context = ssl.create_default_context() if scheme == 'https' else None
+        reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def post(self, url, body, headers=None):
+        """POST the body and return the response status, raising HTTPStatusError for non-2xx statuses"""
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+
+        head = [
+            f'POST {path} HTTP/1.1',
+            f'Host: {parts.netloc}',
+            'Content-Type: application/json',
+            f'Content-Length: {len(body)}',
+            'Connection: keep-alive',
+            *[f'{name}: {value}' for name, value in (headers or {}).items()]
+        ]
+        request = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+        async with self._limit(key):
+            while True:
+                reused = bool(self._idle[key])
+                connection = self._idle[key].pop() if reused else await self._open(*key)
+                try:
+                    status, keep_alive = await asyncio.wait_for(self._exchange(connection, request), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError) as error:
+                    connection.close()
+                    # The server may have closed an idle pooled connection, so retry once on a fresh one
+                    if reused:
+                        continue
+                    raise ConnectionError(f'Connection to {parts.netloc} failed: {error}') from error
+                except BaseException:
+                    connection.close()
+                    raise
+                break
+
+        if keep_alive:
+            self._idle[key].append(connection)
+        else:
+            connection.close()
+
+        if not 200 <= status < 300:
+            raise HTTPStatusError(status)
+
+        return status
+
+    async def _exchange(self, connection, request):
+        """Send a request and read the whole response, returning (status, keep_alive)"""
+        connection.writer.write(request)
+        await connection.writer.drain()
+
+        status_line = await connection.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Connection closed before the response')
+        version, status = status_line.decode('latin-1').split(None, 2)[:2]
+        status = int(status)
+
+        headers = {}
+        while True:
+            line = await connection.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        if status in (204, 304) or 100 <= status < 200:
+            pass
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await connection.reader.readline()).split(b';')[0], 16)
+                await connection.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await connection.reader.readexactly(int(headers['content-length']))
+        else:
+            await connection.reader.read()
+            keep_alive = False
+
+        return status, keep_alive
+
+    def close(self):
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
@@ -0,0 +1,110 @@
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import WebhookSubscription, WebhookDelivery
+
+STATUS_CHANGED = 'transaction.status_changed'
+
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_BACKOFF_BASE = 2
+DEFAULT_BACKOFF_MAX = 3600
+DEFAULT_BATCH_SIZE = 100
+
+# How long claimed deliveries are hidden from other dispatchers while they are being sent
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def webhook_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_status_changes(payloads):
+    """
+    Queue a status change delivery per payload for every active subscription. Call inside the atomic
+    block that changes the status, so the deliveries are committed or rolled back with it.
+    """
+    subscription_ids = list(WebhookSubscription.objects.filter(is_active=True).values_list('id', flat=True))
+    if not subscription_ids or not payloads:
+        return
+
+    WebhookDelivery.objects.bulk_create([
+        WebhookDelivery(
+            subscription_id=subscription_id, event_type=STATUS_CHANGED,
+            transaction_guid=payload['transaction_guid'], payload=payload
+        )
+        for payload in payloads
+        for subscription_id in subscription_ids
+    ])
+
+
+def backoff_delay(attempts, rng=random):
+    """
+    Seconds to wait before the next attempt, using exponential backoff with full jitter:
+    uniform between zero and base * 2 ** (attempts - 1), capped at WEBHOOK_BACKOFF_MAX
+    """
+    base = webhook_setting('WEBHOOK_BACKOFF_BASE', DEFAULT_BACKOFF_BASE)
+    cap = webhook_setting('WEBHOOK_BACKOFF_MAX', DEFAULT_BACKOFF_MAX)
+    return rng.uniform(0, min(cap, base * 2 ** (attempts - 1)))
+
+
+def claim_due_deliveries(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Claim the pending deliveries that are due, grouped by subscription, oldest first. Deliveries of paused
+    subscriptions are held, attempts and all, until the subscription is resumed.
+    Claimed deliveries are leased by moving next_attempt_at forward, so other dispatchers skip them
+    and a dispatcher that dies mid-send has them retried once the lease expires.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = WebhookDelivery.objects.filter(
+            status=WebhookDelivery.Status.PENDING, next_attempt_at__lte=now, subscription__is_active=True
+        ).order_by('next_attempt_at', 'id')
+
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+
+        deliveries = list(queryset.select_related('subscription')[:batch_size])
+        WebhookDelivery.objects.filter(id__in=[delivery.id for delivery in deliveries]).update(next_attempt_at=now + CLAIM_LEASE)
+
+    batches = defaultdict(list)
+    for delivery in deliveries:
+        batches[delivery.subscription].append(delivery)
+
+    return batches
+
+
+def record_results(results, rng=random):
+    """
+    Store the outcome of each sent batch, given as (deliveries, error) pairs with error None on success.
+    Failed deliveries are rescheduled with backoff, or marked FAILED after WEBHOOK_MAX_ATTEMPTS.
+    """
+    max_attempts = webhook_setting('WEBHOOK_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    now = timezone.now()
+    delivered = []
+    failed = []
+
+    for deliveries, error in results:
+        for delivery in deliveries:
+            delivery.attempts += 1
+            if error is None:
+                delivery.status = WebhookDelivery.Status.DELIVERED
+                delivery.delivered_on = now
+                delivery.last_error = ''
+                delivered.append(delivery)
+            else:
+                delivery.last_error = str(error) or type(error).__name__
+                if delivery.attempts >= max_attempts:
+                    delivery.status = WebhookDelivery.Status.FAILED
+                else:
+                    delivery.next_attempt_at = now + timedelta(seconds=backoff_delay(delivery.attempts, rng))
+                failed.append(delivery)
+
+    WebhookDelivery.objects.bulk_update(
+        delivered + failed, ['status', 'attempts', 'next_attempt_at', 'last_error', 'delivered_on']
+    )
+    return len(delivered), len(failed)
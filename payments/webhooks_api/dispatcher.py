@@ -0,0 +1,99 @@
+import asyncio
+import json
+import logging
+import random
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from payments.utils.utils_metrics import ThroughputMetrics, registry
+
+from .client import ConnectionPool, SIGNATURE_HEADER, sign
+from .deliveries import claim_due_deliveries, record_results, webhook_setting, DEFAULT_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_CONCURRENCY = 10
+
+DELIVERIES = registry.counter('payments_webhook_deliveries_total', 'Webhook delivery attempts, by result', ['result'])
+
+
+def delivery_body(deliveries):
+    """A batch of deliveries for one subscription as a JSON array of events"""
+    return json.dumps([
+        {
+            'id': delivery.id,
+            'type': delivery.event_type,
+            'occurred_on': delivery.created_on,
+            'attempt': delivery.attempts + 1,
+            'data': delivery.payload
+        }
+        for delivery in deliveries
+    ], cls=DjangoJSONEncoder).encode()
+
+
+class WebhookDispatcher:
+    """
+    Sends due webhook deliveries from an asyncio event loop.
+
+    Each cycle claims up to batch_size due deliveries, POSTs one signed batch per subscription
+    concurrently over pooled keep-alive connections, and records the outcomes. The dispatcher keeps
+    one event loop and connection pool for its lifetime and only runs the loop for the network part
+    of a cycle, so the database work stays synchronous in the calling thread.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, concurrency=DEFAULT_CONCURRENCY, timeout=None, rng=random):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.rng = rng
+        self.metrics = ThroughputMetrics()
+        self.loop = asyncio.new_event_loop()
+        self.pool = ConnectionPool(timeout=timeout or webhook_setting('WEBHOOK_TIMEOUT', DEFAULT_TIMEOUT))
+
+    async def send_batch(self, semaphore, subscription, deliveries):
+        """POST one subscription's batch, returning (deliveries, error) with error None on success"""
+        body = delivery_body(deliveries)
+        async with semaphore:
+            try:
+                await self.pool.post(subscription.url, body, {SIGNATURE_HEADER: sign(subscription.secret, body)})
+            except Exception as error:
+                logger.info('Webhook batch of %s deliveries to %s failed: %r', len(deliveries), subscription.url, error)
+                return deliveries, error
+
+        return deliveries, None
+
+    async def send_batches(self, batches):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*[
+            self.send_batch(semaphore, subscription, deliveries) for subscription, deliveries in batches.items()
+        ])
+
+    def dispatch_cycle(self):
+        """Claim, send and record a single cycle of deliveries, returning the number of deliveries attempted"""
+        batches = claim_due_deliveries(self.batch_size)
+        if not batches:
+            return 0
+
+        results = self.loop.run_until_complete(self.send_batches(batches))
+        delivered, failed = record_results(results, self.rng)
+
+        self.metrics.record_batch(delivered, failed)
+        DELIVERIES.inc(delivered, result='delivered')
+        DELIVERIES.inc(failed, result='failed')
+        return delivered + failed
+
+    def run(self, max_cycles=None):
+        """Dispatch cycles until nothing is due or max_cycles is reached"""
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            if not self.dispatch_cycle():
+                break
+            cycles += 1
+
+        return self.metrics
+
+    def close(self):
+        """Close the pooled connections and the event loop"""
+        self.pool.close()
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.loop.close()
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from webhooks_api.deliveries import DEFAULT_BATCH_SIZE
+from webhooks_api.dispatcher import WebhookDispatcher, DEFAULT_CONCURRENCY
+
+
+class Command(BaseCommand):
+    help = 'Sends the due webhook deliveries, batched per endpoint, retrying failures with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Number of deliveries claimed per cycle')
+        parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Number of endpoints sent to at once')
+        parser.add_argument('--max-cycles', type=int, default=None, help='Stop after this many cycles')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling for due deliveries')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to wait between polls when running with --loop')
+
+    def handle(self, *args, **options):
+        dispatcher = WebhookDispatcher(batch_size=options['batch_size'], concurrency=options['concurrency'])
+
+        try:
+            while True:
+                batches = dispatcher.metrics.batches
+                dispatcher.run(max_cycles=options['max_cycles'])
+                if not options['loop'] or dispatcher.metrics.batches > batches:
+                    self.report(dispatcher.metrics)
+
+                if not options['loop']:
+                    break
+
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.report(dispatcher.metrics)
+        finally:
+            dispatcher.close()
+
+    def report(self, metrics):
+        """Write the throughput of the dispatcher so far"""
+        self.stdout.write(
+            f'Delivered {metrics.processed} webhooks ({metrics.failed} failed attempts) in {metrics.batches} cycles, '
+            f'{metrics.rate:.1f} webhooks/s'
+        )
@@ -0,0 +1,43 @@
+import secrets
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+def generate_secret():
+    return secrets.token_hex(32)
+
+
+class WebhookSubscription(models.Model):
+    url = models.URLField(max_length=500)
+    # Shared with the subscriber to sign every request, see webhooks_api.client.sign
+    secret = models.CharField(max_length=64, default=generate_secret, editable=False)
+    is_active = models.BooleanField(default=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+
+class WebhookDelivery(models.Model):
+    """An event waiting to be POSTed to a subscription, retried with backoff until it is delivered or gives up"""
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING"
+        DELIVERED = "DELIVERED"
+        FAILED = "FAILED"
+
+    subscription = models.ForeignKey(WebhookSubscription, on_delete=models.CASCADE, related_name='deliveries')
+    event_type = models.CharField(max_length=32)
+    # Referenced by GUID rather than a foreign key, so archiving or deleting the transaction keeps its deliveries
+    transaction_guid = models.UUIDField()
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=9, choices=Status, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    delivered_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_attempt_at', 'id'], condition=models.Q(status='PENDING'), name='webhook_delivery_due_idx'),
+        ]
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+from .models import WebhookSubscription
+
+
+class WebhookSubscriptionSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = WebhookSubscription
+        fields = ["id", "url", "is_active", "created_on"]
+        read_only_fields = ["id", "created_on"]
+
+
+class WebhookSubscriptionCreatedSerializer(WebhookSubscriptionSerializer):
+    """Includes the signing secret, which is only returned when the subscription is created"""
+
+    class Meta(WebhookSubscriptionSerializer.Meta):
+        fields = WebhookSubscriptionSerializer.Meta.fields + ["secret"]
+        read_only_fields = WebhookSubscriptionSerializer.Meta.read_only_fields + ["secret"]
@@ -0,0 +1,182 @@
+import hashlib
+import hmac
+import json
+import random
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts_api.models import Account
+from transactions_api.clearing import ClearingEngine
+from transactions_api.models import Transaction
+from webhooks_api.deliveries import backoff_delay, enqueue_status_changes
+from webhooks_api.dispatcher import WebhookDispatcher
+from webhooks_api.models import WebhookSubscription, WebhookDelivery
+
+
+class StandInServer:
+    """Local HTTP/1.1 endpoint recording the webhook requests it receives"""
+
+    def __init__(self, status=204):
+        self.requests = []
+        self.status = status
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                recorder.requests.append({
+                    'path': self.path, 'body': body, 'headers': dict(self.headers), 'client': self.client_address
+                })
+                self.send_response(recorder.status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server.server_port}{path}'
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class WebhookDispatcherTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.account_one = Account.objects.create(account_name='Test Account 1', status=Account.Status.ACTIVE, balance=120000.00, currency='GBP')
+        cls.account_two = Account.objects.create(account_name='Test Account 2', status=Account.Status.ACTIVE, balance=250000.00, currency='GBP')
+
+    def setUp(self):
+        self.endpoint = StandInServer()
+        self.addCleanup(self.endpoint.stop)
+        self.dispatcher = WebhookDispatcher(rng=random.Random(7))
+        self.addCleanup(self.dispatcher.close)
+
+    def clear_transactions(self, count):
+        for _ in range(count):
+            Transaction.objects.create(credit_from=self.account_one, debit_to=self.account_two, amount=100.00, currency='GBP')
+        ClearingEngine().run()
+
+    def test_status_changes_enqueue_deliveries(self):
+        "Testing clearing queues a delivery per active subscription and none for paused ones"
+        WebhookSubscription.objects.create(url=self.endpoint.url('/hook'))
+        WebhookSubscription.objects.create(url=self.endpoint.url('/paused'), is_active=False)
+
+        self.clear_transactions(2)
+
+        deliveries = WebhookDelivery.objects.all()
+        self.assertEqual(deliveries.count(), 2)
+        self.assertEqual(deliveries[0].payload['previous_status'], 'UNCLEARED')
+        self.assertEqual(deliveries[0].payload['status'], 'CLEARED')
+
+    def test_deliveries_batched_per_endpoint_and_signed(self):
+        "Testing each endpoint gets one signed request per cycle carrying all its due deliveries"
+        subscription = WebhookSubscription.objects.create(url=self.endpoint.url('/one'))
+        WebhookSubscription.objects.create(url=self.endpoint.url('/two'))
+        self.clear_transactions(3)
+
+        metrics = self.dispatcher.run()
+
+        self.assertEqual(metrics.processed, 6)
+        self.assertEqual(sorted(request['path'] for request in self.endpoint.requests), ['/one', '/two'])
+        request = next(request for request in self.endpoint.requests if request['path'] == '/one')
+        self.assertEqual(len(json.loads(request['body'])), 3)
+
+        signature = dict(part.split('=') for part in request['headers']['X-Webhook-Signature'].split(','))
+        expected = hmac.new(subscription.secret.encode(), f"{signature['t']}.".encode() + request['body'], hashlib.sha256).hexdigest()
+        self.assertEqual(signature['v1'], expected)
+        self.assertEqual(WebhookDelivery.objects.filter(status=WebhookDelivery.Status.DELIVERED).count(), 6)
+
+    def test_paused_subscription_deliveries_are_held(self):
+        "Testing a paused subscription receives no requests, and its queued deliveries are sent once it is resumed"
+        subscription = WebhookSubscription.objects.create(url=self.endpoint.url('/hook'))
+        self.clear_transactions(2)
+        WebhookSubscription.objects.filter(id=subscription.id).update(is_active=False)
+
+        metrics = self.dispatcher.run()
+
+        self.assertEqual(metrics.processed, 0)
+        self.assertEqual(self.endpoint.requests, [])
+        self.assertEqual(WebhookDelivery.objects.filter(status=WebhookDelivery.Status.PENDING, attempts=0).count(), 2)
+
+        WebhookSubscription.objects.filter(id=subscription.id).update(is_active=True)
+        metrics = self.dispatcher.run()
+
+        self.assertEqual(metrics.processed, 2)
+        self.assertEqual(len(self.endpoint.requests), 1)
+
+    def test_connections_are_reused(self):
+        "Testing later cycles to the same endpoint reuse the pooled keep-alive connection"
+        WebhookSubscription.objects.create(url=self.endpoint.url('/hook'))
+        for _ in range(3):
+            self.clear_transactions(1)
+            self.dispatcher.run()
+
+        self.assertEqual(len(self.endpoint.requests), 3)
+        self.assertEqual(self.dispatcher.pool.connections_opened, 1)
+        self.assertEqual(len({request['client'] for request in self.endpoint.requests}), 1)
+
+    def test_failed_deliveries_back_off(self):
+        "Testing failed deliveries are rescheduled with jittered backoff and give up after the maximum attempts"
+        self.endpoint.status = 500
+        WebhookSubscription.objects.create(url=self.endpoint.url('/hook'))
+        self.clear_transactions(1)
+
+        with self.settings(WEBHOOK_MAX_ATTEMPTS=2, WEBHOOK_BACKOFF_BASE=60):
+            metrics = self.dispatcher.run()
+
+            delivery = WebhookDelivery.objects.get()
+            self.assertEqual(metrics.failed, 1)
+            self.assertEqual(delivery.status, WebhookDelivery.Status.PENDING)
+            self.assertEqual(delivery.attempts, 1)
+            self.assertIn('HTTP 500', delivery.last_error)
+            self.assertLessEqual(delivery.next_attempt_at, timezone.now() + timedelta(seconds=60))
+
+            WebhookDelivery.objects.update(next_attempt_at=timezone.now())
+            self.dispatcher.run()
+
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, WebhookDelivery.Status.FAILED)
+        self.assertEqual(delivery.attempts, 2)
+
+    def test_unreachable_endpoint(self):
+        "Testing a refused connection counts as a failed attempt"
+        self.endpoint.stop()
+        WebhookSubscription.objects.create(url=self.endpoint.url('/hook'))
+        self.clear_transactions(1)
+
+        metrics = self.dispatcher.run()
+
+        self.assertEqual(metrics.failed, 1)
+        self.assertEqual(WebhookDelivery.objects.get().attempts, 1)
+
+    def test_backoff_delay_is_capped_full_jitter(self):
+        "Testing the backoff delay is between zero and the capped exponential delay"
+        rng = random.Random(1)
+        with self.settings(WEBHOOK_BACKOFF_BASE=2, WEBHOOK_BACKOFF_MAX=30):
+            delays = [backoff_delay(attempts, rng) for attempts in range(1, 10) for _ in range(20)]
+            self.assertTrue(all(0 <= delay <= 30 for delay in delays))
+            self.assertTrue(all(backoff_delay(1, rng) <= 2 for _ in range(20)))
+
+    def test_dispatch_webhooks_command(self):
+        "Testing the command sends the due deliveries and reports its throughput"
+        WebhookSubscription.objects.create(url=self.endpoint.url('/hook'))
+        enqueue_status_changes([{'transaction_guid': '00000000-0000-0000-0000-000000000001', 'status': 'CLEARED'}])
+        out = StringIO()
+
+        call_command('dispatch_webhooks', stdout=out)
+
+        self.assertIn('Delivered 1 webhooks (0 failed attempts) in 1 cycles', out.getvalue())
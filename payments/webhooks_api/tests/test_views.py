@@ -0,0 +1,55 @@
+from rest_framework import status
+from django.urls import reverse
+
+from webhooks_api.models import WebhookSubscription
+from payments.utils.utils_test import BaseAPITestCase
+
+
+class TestWebhookSubscriptionViews(BaseAPITestCase):
+
+    def test_create_subscription_returns_secret_once(self):
+        """Tests POST request creates a subscription and only returns its secret on creation"""
+
+        response = self.client.post(reverse('webhooks-list'), data={'url': 'https://example.com/hooks'})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['secret'], WebhookSubscription.objects.get().secret)
+
+        response = self.client.get(reverse('webhooks-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('secret', response.data[0])
+
+
+    def test_create_subscription_fails_with_invalid_url(self):
+        """Tests POST request is unsuccessful when the url is not valid"""
+
+        response = self.client.post(reverse('webhooks-list'), data={'url': 'not a url'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_pause_and_delete_subscription(self):
+        """Tests PATCH request pauses a subscription and DELETE request removes it"""
+
+        subscription = WebhookSubscription.objects.create(url='https://example.com/hooks')
+
+        response = self.client.patch(reverse('webhooks-detail', args=[subscription.id]), data={'is_active': False})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(WebhookSubscription.objects.get(id=subscription.id).is_active)
+
+        response = self.client.delete(reverse('webhooks-detail', args=[subscription.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(WebhookSubscription.objects.exists())
+
+
+    def test_subscriptions_unsuccessful_no_authentication(self):
+        """Tests GET request is unsuccessful when there are no credentials provided"""
+
+        self.client.credentials()
+
+        response = self.client.get(reverse('webhooks-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import (
+    WebhookSubscriptionListApiView,
+    WebhookSubscriptionDetailApiView
+)
+
+urlpatterns = [
+    path('api/', WebhookSubscriptionListApiView.as_view(), name='webhooks-list'),
+    path('api/<int:id>/', WebhookSubscriptionDetailApiView.as_view(), name='webhooks-detail')
+]
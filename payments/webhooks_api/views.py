@@ -0,0 +1,148 @@
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample, OpenApiResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .models import WebhookSubscription
+from .serializers import WebhookSubscriptionSerializer, WebhookSubscriptionCreatedSerializer
+
+# Create your views here.
+@extend_schema_view(
+    get=extend_schema(
+        operation_id='Get All Webhook Subscriptions',
+        summary='Get a list of all webhook subscriptions',
+        responses={
+            200: OpenApiResponse(
+                response=WebhookSubscriptionSerializer(many=True),
+                description='Returns a list of webhook subscriptions'
+            )
+        }
+    ),
+    post=extend_schema(
+        operation_id='Create a Webhook Subscription',
+        summary='Subscribe a URL to transaction status changes',
+        request=WebhookSubscriptionSerializer,
+        responses={
+            201: OpenApiResponse(
+                response=WebhookSubscriptionCreatedSerializer,
+                description='Creates a webhook subscription and returns the secret its requests are signed with'
+            )
+        }
+    )
+)
+
+class WebhookSubscriptionListApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = {'GET': 'list', 'POST': 'detail'}
+
+    # List all webhook subscriptions
+    def get(self, request, *args, **kwargs):
+        """
+        List all the webhook subscriptions
+        """
+        subscriptions = WebhookSubscription.objects.order_by('id')
+        serializer = WebhookSubscriptionSerializer(subscriptions, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    # Create a webhook subscription
+    def post(self, request, *args, **kwargs):
+        """
+        Create a webhook subscription, returning its signing secret once
+        """
+        serializer = WebhookSubscriptionCreatedSerializer(data=request.data)
+
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@extend_schema_view(
+    patch=extend_schema(
+        operation_id='Partially Update a Webhook Subscription',
+        summary='Pause or resume a webhook subscription, or change its URL',
+        responses={
+            200: OpenApiResponse(
+                response=WebhookSubscriptionSerializer
+            )
+        }
+    ),
+    delete=extend_schema(
+        operation_id='Delete a Webhook Subscription',
+        summary='Delete a webhook subscription and its pending deliveries',
+        responses={
+            200: OpenApiResponse(
+                response={'Success'},
+                examples=[
+                    OpenApiExample(
+                        'Deletion Success',
+                        description='Custom delete response for Webhook Subscription',
+                        value={'res': 'Webhook subscription deleted'}
+                    )
+                ]
+            ),
+            400: OpenApiResponse(
+                response={'Webhook Subscription Not Found'},
+                examples=[
+                    OpenApiExample(
+                        'Webhook subscription does not exist',
+                        description='Custom delete bad request response for Webhook Subscription',
+                        value={'res': 'Object with given webhook subscription id does not exist'}
+                    )
+                ]
+            )
+        }
+    )
+)
+
+class WebhookSubscriptionDetailApiView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'detail'
+
+    def get_object(self, id):
+        """
+        Helper method to retrieve the object with a given id
+        """
+        try:
+            return WebhookSubscription.objects.get(id=id)
+        except WebhookSubscription.DoesNotExist:
+            return None
+
+    # Partially update a webhook subscription
+    def patch(self, request, id, *args, **kwargs):
+        """
+        Partially updates the webhook subscription with the given id
+        """
+        subscription = self.get_object(id)
+        if not subscription:
+            return Response(
+                {"res": "Object with given webhook subscription id does not exist"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = WebhookSubscriptionSerializer(instance=subscription, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    # Delete a webhook subscription
+    def delete(self, request, id, *args, **kwargs):
+        """
+        Deletes the webhook subscription with the given id if it exists
+        """
+        subscription = self.get_object(id)
+        if not subscription:
+            return Response(
+                {"res": "Object with given webhook subscription id does not exist"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        subscription.delete()
+        return Response(
+            {"res": "Webhook subscription deleted"},
+            status=status.HTTP_200_OK
+        )